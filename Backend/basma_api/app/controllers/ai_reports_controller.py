@@ -1,16 +1,32 @@
 from __future__ import annotations
 
-from typing import Optional, Tuple, Dict, Any, TYPE_CHECKING
+from typing import Optional, Tuple, Dict, Any, List, TYPE_CHECKING
+import math
+import threading
 import traceback
 
 import httpx
-from fastapi import HTTPException, status, UploadFile, File, Depends
+from fastapi import HTTPException, Response, status, UploadFile, File, Depends
 from pydantic import BaseModel, Field
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import SQLAlchemyError
 
 from app.db import get_db  # returns a database Session
+from app.ml.inference import classify_image, hash_image
+from app.metrics import RequestTimer, request_timing, timed, timing_header
+from app.settings import (
+    AI_INFERENCE_REMOTE_URL,
+    AI_MODEL_PATH,
+    GEOCODER_FALLBACK_DISTANCE_M,
+    GEOCODER_OFFLINE_ENABLED,
+)
+from app.ml.near_duplicates import get_report_hash_index
+from app.ml.inference_executor import InferenceQueueFull
+from app.ml.model_registry import get_model_registry
 from app import models      # SQLAlchemy models
+from app.services.geocoding import GeocoderUnavailable, lookup_address
+from app.services.offline_geocoder import KnownLocation, get_location_index, haversine_m
+from app.services.boundaries import get_boundary_index
 from app.services.db_helpers import (
     get_or_create_government,
     get_or_create_district,
@@ -20,14 +36,15 @@ from app.services.db_helpers import (
 if TYPE_CHECKING:
     # Imported only for type-checkers (avoids heavy runtime import)
     from app.ml.report_classifier import ReportClassifierService
-# Singleton instance (type declared as Any to avoid importing heavy ML modules at import-time)
+# Remote client singleton (AI_INFERENCE_REMOTE_URL); the local model lives in the model registry
 classifier_service: Optional[object] = None
+_classifier_lock = threading.Lock()
 
 # عتبة الثقة على مستوى الـ API:
 CONFIDENCE_THRESHOLD = 0.25
 
-# مسار ملف نموذج التشوّه البصري (YOLOv5 .pt)
-MODEL_PATH = "app/models/vp.pt"
+# مسار ملف نموذج التشوّه البصري (YOLOv5 .pt أو .onnx) — من AI_MODEL_PATH
+MODEL_PATH = AI_MODEL_PATH
 
 # قيم خاصة بفئة "OTHERS" في قاعدة البيانات
 OTHERS_REPORT_TYPE_ID = 11
@@ -36,22 +53,36 @@ OTHERS_NAME_AR = "أخرى"
 
 
 def get_classifier_service():
-    """Lazily import and return the ReportClassifierService instance.
+    """Return the active ReportClassifierService.
 
     Import is deferred to runtime to avoid requiring heavy ML deps during app import/startup.
+    The model lives in the model registry (app/ml/model_registry.py), shared by
+    the router, the startup preload and the request handlers; it loads lazily on
+    first use and can be swapped at runtime (hot reload). Each request keeps the
+    instance it got here, so in-flight predictions finish on the old model.
+
+    When AI_INFERENCE_REMOTE_URL is set this returns a RemoteClassifier that
+    forwards images to the inference worker instead of loading the model.
     """
     global classifier_service
+    if not AI_INFERENCE_REMOTE_URL:
+        return get_model_registry().get()
     if classifier_service is None:
-        # local import to avoid heavy dependency at module import time
-        from app.ml.report_classifier import ReportClassifierService
+        with _classifier_lock:
+            if classifier_service is None:
+                from app.ml.remote_client import RemoteClassifier
 
-        classifier_service = ReportClassifierService(
-            model_path=MODEL_PATH,
-            model_conf_threshold=0.1,
-        )
+                classifier_service = RemoteClassifier(AI_INFERENCE_REMOTE_URL)
     return classifier_service
 
 
+async def close_classifier_service() -> None:
+    """Close the remote client's connections (no-op for the in-process model)."""
+    close = getattr(classifier_service, "aclose", None)
+    if close is not None:
+        await close()
+
+
 class ResolveLocationRequest(BaseModel):
     latitude: float
     longitude: float
@@ -75,6 +106,9 @@ class ResolveLocationResponse(BaseModel):
     district: LocationInfo
     area: LocationInfo
     location: Optional[LocationPoint] = None
+    # approximate: nearest known location (geocoder unavailable), distance_m metres away
+    approximate: bool = False
+    distance_m: Optional[float] = None
 
 
 class AnalyzeImageResponse(BaseModel):
@@ -85,27 +119,21 @@ class AnalyzeImageResponse(BaseModel):
     class_name: Optional[str] = Field(None, alias="class")
     suggested_title: str
     suggested_description: str
+    # بلاغات سابقة بصور شبه مطابقة (بلاغ مكرر محتمل)
+    duplicate_report_ids: List[int] = Field(default_factory=list)
+    # إصدار النموذج الذي أنتج هذا التصنيف (بصمة ملف الأوزان)
+    model_version: Optional[str] = None
 
 
 async def reverse_geocode(lat: float, lon: float) -> Dict[str, Any]:
-    url = "https://nominatim.openstreetmap.org/reverse"
-    params = {
-        "format": "json",
-        "lat": lat,
-        "lon": lon,
-        "zoom": 16,
-        "addressdetails": 1,
-        "accept-language": "ar,en",
-    }
-    headers = {
-        "User-Agent": "basma-app/1.0",
-        "Accept-Language": "ar,en",
-    }
     try:
-        async with httpx.AsyncClient(timeout=10) as client:
-            resp = await client.get(url, params=params, headers=headers)
-            resp.raise_for_status()
-            return resp.json()
+        return await lookup_address(lat, lon)
+    except GeocoderUnavailable as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="خدمة تحديد الموقع الجغرافي مشغولة حالياً، يرجى المحاولة بعد قليل.",
+            headers={"Retry-After": str(max(1, math.ceil(e.retry_after)))},
+        ) from e
     except httpx.HTTPError as e:
         raise HTTPException(
             status_code=status.HTTP_502_BAD_GATEWAY,
@@ -147,6 +175,25 @@ def extract_components(geo: Dict[str, Any]) -> Tuple[str, str, str, str]:
     return gov_name, dist_name, area_name, loc_name
 
 
+def _known_location_response(
+    gov: models.Government,
+    dist: models.District,
+    area: models.Area,
+    location_obj: models.Location,
+) -> ResolveLocationResponse:
+    return ResolveLocationResponse(
+        government=LocationInfo(id=gov.id, name_ar=gov.name_ar, name_en=getattr(gov, "name_en", None)),
+        district=LocationInfo(id=dist.id, name_ar=dist.name_ar, name_en=getattr(dist, "name_en", None)),
+        area=LocationInfo(id=area.id, name_ar=area.name_ar, name_en=getattr(area, "name_en", None)),
+        location=LocationPoint(
+            id=location_obj.id,
+            name_ar=location_obj.name_ar,
+            latitude=location_obj.latitude,
+            longitude=location_obj.longitude,
+        ),
+    )
+
+
 async def ai_resolve_location(payload: ResolveLocationRequest, db: Session = Depends(get_db)) -> ResolveLocationResponse:
     try:
         lat = payload.latitude
@@ -159,7 +206,44 @@ async def ai_resolve_location(payload: ResolveLocationRequest, db: Session = Dep
         except Exception:
             pass
 
-        geo = await reverse_geocode(lat, lon)
+        # Nearest known location first (no external call)
+        known = None
+        if GEOCODER_OFFLINE_ENABLED:
+            try:
+                known = get_location_index().resolve(db, lat, lon)
+            except SQLAlchemyError:
+                db.rollback()
+        if known is not None:
+            return _known_location_response(*known)
+
+        # Governorate/district from boundary polygons when configured;
+        # the remote geocoder then only names the area/location
+        boundary = None
+        try:
+            boundary = get_boundary_index().resolve(db, lat, lon)
+        except SQLAlchemyError:
+            db.rollback()
+
+        try:
+            geo = await reverse_geocode(lat, lon)
+        except HTTPException:
+            # Geocoder unavailable: nearest known location within a wider radius
+            fallback = None
+            if GEOCODER_OFFLINE_ENABLED and GEOCODER_FALLBACK_DISTANCE_M:
+                try:
+                    fallback = get_location_index().resolve(
+                        db, lat, lon, max_distance_m=GEOCODER_FALLBACK_DISTANCE_M
+                    )
+                except SQLAlchemyError:
+                    db.rollback()
+            if fallback is None:
+                raise
+            response = _known_location_response(*fallback)
+            response.approximate = True
+            point = response.location
+            if point.latitude is not None and point.longitude is not None:
+                response.distance_m = round(haversine_m(lat, lon, point.latitude, point.longitude), 1)
+            return response
         try:
             with open("ai_resolve_location_debug.log", "a", encoding="utf-8") as fh:
                 fh.write("AFTER_REVERSE_GEOCODE\n")
@@ -226,23 +310,26 @@ async def ai_resolve_location(payload: ResolveLocationRequest, db: Session = Dep
         if not area_name:
             area_name = "منطقة بدون اسم"
 
-        try:
-            gov = get_or_create_government(db, gov_name)
-        except SQLAlchemyError as e:
-            db.rollback()
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="حدث خطأ أثناء حفظ بيانات المحافظة.",
-            ) from e
+        if boundary is not None:
+            gov, dist = boundary
+        else:
+            try:
+                gov = get_or_create_government(db, gov_name)
+            except SQLAlchemyError as e:
+                db.rollback()
+                raise HTTPException(
+                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                    detail="حدث خطأ أثناء حفظ بيانات المحافظة.",
+                ) from e
 
-        try:
-            dist = get_or_create_district(db, gov.id, dist_name)
-        except SQLAlchemyError as e:
-            db.rollback()
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="حدث خطأ أثناء حفظ بيانات اللواء/القضاء.",
-            ) from e
+            try:
+                dist = get_or_create_district(db, gov.id, dist_name)
+            except SQLAlchemyError as e:
+                db.rollback()
+                raise HTTPException(
+                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                    detail="حدث خطأ أثناء حفظ بيانات اللواء/القضاء.",
+                ) from e
 
         try:
             area = get_or_create_area(db, gov.id, dist.id, area_name)
@@ -269,6 +356,9 @@ async def ai_resolve_location(payload: ResolveLocationRequest, db: Session = Dep
                     db.add(location_obj)
                     db.commit()
                     db.refresh(location_obj)
+                    get_location_index().add(
+                        KnownLocation(location_obj.id, area.id, dist.id, gov.id, float(lat), float(lon))
+                    )
             except SQLAlchemyError:
                 db.rollback()
                 location_obj = None
@@ -381,14 +471,17 @@ def generate_text_suggestions(
 
 
 async def ai_analyze_image(
+    response: Response,
     file: UploadFile = File(...),
     gov_id: int = 0,
     dist_id: int = 0,
     area_id: int = 0,
     db: Session = Depends(get_db),
     clf: ReportClassifierService = Depends(get_classifier_service),
+    timer: Optional[RequestTimer] = Depends(request_timing),
 ) -> AnalyzeImageResponse:
-    image_bytes = await file.read()
+    with timed("upload_read"):
+        image_bytes = await file.read()
     if not image_bytes:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -396,16 +489,41 @@ async def ai_analyze_image(
         )
 
     try:
-        report_type_id, confidence, info = clf.predict(image_bytes)
+        with timed("phash"):
+            image_hash = await hash_image(image_bytes)
+        with timed("classify"):
+            report_type_id, confidence, info = await classify_image(
+                clf,
+                image_bytes,
+                confidence_threshold=CONFIDENCE_THRESHOLD,
+                image_hash=image_hash,
+            )
+    except InferenceQueueFull as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="خدمة تحليل الصور مشغولة حالياً، يرجى المحاولة بعد قليل.",
+            headers={"Retry-After": str(e.retry_after)},
+        ) from e
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="حدث خطأ أثناء تحليل الصورة.",
         ) from e
 
-    gov = db.get(models.Government, gov_id) if gov_id else None
-    dist = db.get(models.District, dist_id) if dist_id else None
-    area = db.get(models.Area, area_id) if area_id else None
+    duplicate_report_ids: List[int] = []
+    if image_hash is not None:
+        try:
+            with timed("duplicate_lookup"):
+                duplicate_report_ids = get_report_hash_index().find(
+                    db, image_hash, area_id=area_id or None
+                )
+        except SQLAlchemyError:
+            db.rollback()
+
+    with timed("db_lookup"):
+        gov = db.get(models.Government, gov_id) if gov_id else None
+        dist = db.get(models.District, dist_id) if dist_id else None
+        area = db.get(models.Area, area_id) if area_id else None
 
     gov_name_ar = gov.name_ar if gov else "غير محدد"
     dist_name_ar = dist.name_ar if dist else "غير محدد"
@@ -428,6 +546,10 @@ async def ai_analyze_image(
         area_name_ar,
     )
 
+    server_timing = timing_header(timer)
+    if server_timing:
+        response.headers["Server-Timing"] = server_timing
+
     return AnalyzeImageResponse(
         report_type_id=report_type_id,
         report_type_name_ar=report_type_name_ar,
@@ -436,6 +558,8 @@ async def ai_analyze_image(
         class_name=report_type_code,
         suggested_title=suggested_title,
         suggested_description=suggested_description,
+        duplicate_report_ids=duplicate_report_ids,
+        model_version=getattr(clf, "model_version", None),
     )
 
 
@@ -26,7 +26,10 @@ from ..schemas import (
     ReportPublicOut,
 )
 from ..security import get_current_user_payload
-from ..utils import generate_report_code
+from ..utils import generate_report_code, local_static_path
+from ..ml.phash import dhash_file, to_hex
+from ..ml.near_duplicates import get_report_hash_index
+from ..settings import AI_PHASH_ENABLED
 
 
 # Local request models kept here to avoid import cycles
@@ -306,7 +309,14 @@ def create_report(
         except (TypeError, ValueError):
             user_id = None
 
-    # 3) create report
+    # 3) perceptual hash of the "before" photo (for duplicate detection)
+    image_phash: Optional[int] = None
+    if AI_PHASH_ENABLED:
+        image_path = local_static_path(payload.image_before_url)
+        if image_path is not None:
+            image_phash = dhash_file(str(image_path))
+
+    # 4) create report
     rp = Report(
         report_code=generate_report_code(prefix="UF"),
         report_type_id=payload.report_type_id,
@@ -322,10 +332,16 @@ def create_report(
         user_id=user_id,
         reported_by_name=payload.reported_by_name,
     )
+    if image_phash is not None:
+        # only sent when enabled: databases without the phash ALTER lack the column
+        rp.image_before_phash = to_hex(image_phash)
 
     db.add(rp)
     db.commit()
     db.refresh(rp)
+
+    if image_phash is not None:
+        get_report_hash_index().add(rp.id, rp.report_type_id, rp.area_id, image_phash)
     return rp
 
 
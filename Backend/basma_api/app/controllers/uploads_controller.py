@@ -69,16 +69,43 @@ def _public_url(saved_path: Path) -> str:
     return f"/static/{rel.as_posix()}"
 
 
-async def upload_image_endpoint(file: UploadFile = File(...)) -> JSONResponse:
+async def save_upload(file: UploadFile, keep_bytes: bool = False) -> Tuple[str, bytes]:
+    """
+    Stream an upload to static/uploads in 1 MiB chunks and return its
+    public URL. With ``keep_bytes`` the chunks are also kept and returned,
+    so callers that process the image do not read the file back. A failed
+    or cancelled upload leaves no partial file behind.
+    """
     ext, _ = _validate_file(file)
     dest = _save_path(ext)
-    with dest.open("wb") as f:
-        while True:
-            chunk = await file.read(1024 * 1024)
-            if not chunk:
-                break
-            f.write(chunk)
-    return JSONResponse({"url": _public_url(dest)})
+    chunks = []
+    try:
+        with dest.open("wb") as f:
+            while True:
+                chunk = await file.read(1024 * 1024)
+                if not chunk:
+                    break
+                f.write(chunk)
+                if keep_bytes:
+                    chunks.append(chunk)
+    except BaseException:
+        # client disconnect, disk full, cancelled request: drop the partial file
+        dest.unlink(missing_ok=True)
+        raise
+    return _public_url(dest), b"".join(chunks)
+
+
+def delete_upload(url: str) -> None:
+    """Remove a file saved by ``save_upload`` (given its public URL)."""
+    rel = url[len("/static/"):] if url.startswith("/static/") else ""
+    path = (STATIC_DIR / rel).resolve()
+    if rel and path.parent == UPLOADS_DIR.resolve():
+        path.unlink(missing_ok=True)
+
+
+async def upload_image_endpoint(file: UploadFile = File(...)) -> JSONResponse:
+    url, _ = await save_upload(file)
+    return JSONResponse({"url": url})
 
 
 async def upload_image_legacy_endpoint(file: UploadFile = File(...)) -> JSONResponse:
@@ -1,4 +1,5 @@
 from __future__ import annotations
+import asyncio
 import os
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
@@ -6,7 +7,7 @@ from fastapi.staticfiles import StaticFiles
 from .middlewares.logging_middleware import RequestLoggingMiddleware
 from .middlewares.error_middleware import ErrorHandlingMiddleware
 
-from .routers import admin_auth, admin_users, admin_accounts, admin_reports ,  report_lookups
+from .routers import admin_auth, admin_users, admin_accounts, admin_reports ,  report_lookups, admin_model
 
 from .db import engine
 from .models import Base
@@ -17,7 +18,13 @@ from .routers.reports import router as reports_router
 from .routers.uploads import uploads_router, files_router
 
 from app.routers import accounts, auth
-from app.routers import ai_reports
+from app.routers import ai_reports, health, metrics
+from app.controllers.ai_reports_controller import close_classifier_service, get_classifier_service
+from app.ml.inference_executor import shutdown_inference_executor
+from app.ml.warmup import preload_classifier, readiness
+from app.ml.model_registry import get_model_registry
+from app.services.geocoding import close_geocoder, start_geocoder
+from app.settings import AI_INFERENCE_REMOTE_URL, AI_MODEL_WATCH
 
 
 Base.metadata.create_all(bind=engine)
@@ -58,7 +65,34 @@ app.include_router(admin_auth.router)
 app.include_router(admin_users.router)
 app.include_router(admin_accounts.router)
 app.include_router(admin_reports.router)
+app.include_router(admin_model.router)
 app.include_router(report_lookups.router)
+app.include_router(health.router)
+app.include_router(metrics.router)
+
+
+@app.on_event("startup")
+async def preload_ai_services():
+    # Pooled keep-alive client for reverse geocoding (one per worker)
+    await start_geocoder()
+    # Load + warm the model in the background so the worker can answer
+    # /health/live immediately while /health/ready stays 503 until done.
+    if readiness.preload:
+        app.state.preload_task = asyncio.create_task(preload_classifier(get_classifier_service))
+    # Hot reload: swap in a new model file without restarting the worker
+    if AI_MODEL_WATCH and not AI_INFERENCE_REMOTE_URL:
+        app.state.model_watch_task = asyncio.create_task(get_model_registry().watch())
+
+
+@app.on_event("shutdown")
+async def shutdown_ai_services():
+    watch_task = getattr(app.state, "model_watch_task", None)
+    if watch_task is not None:
+        watch_task.cancel()
+    await close_classifier_service()
+    await close_geocoder()
+    shutdown_inference_executor()
+
 
 @app.get("/")
 def root():
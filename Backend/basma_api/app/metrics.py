@@ -0,0 +1,209 @@
+# app/metrics.py
+"""
+Per-stage latency histograms exposed in Prometheus text format.
+
+Code under measurement wraps a stage in ``timed("decode")``. Each sample
+goes into the process-wide ``basma_stage_seconds`` histogram and, when a
+``RequestTimer`` is active in the current context (the ``request_timing``
+dependency), into that request's
+timings too (used for the Server-Timing header). ``InferenceExecutor.run``
+copies the context into the pool thread, so stages timed inside
+``predict`` are attributed to the request that submitted them (micro-batches
+run in the batcher's own context and only feed the histogram).
+
+With ``AI_METRICS_ENABLED=0`` ``timed`` returns a shared no-op context
+manager and nothing is recorded.
+"""
+from __future__ import annotations
+
+import bisect
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from typing import AsyncIterator, Callable, ContextManager, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from app.settings import AI_METRICS_ENABLED, AI_TIMING_HEADER
+
+DEFAULT_BUCKETS: Tuple[float, ...] = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+
+class Histogram:
+    """Cumulative-bucket histogram keyed by one label (e.g. ``stage``)."""
+
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        label: str,
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> None:
+        self.name = name
+        self.help_text = help_text
+        self.label = label
+        self.buckets = tuple(sorted(buckets))
+        # label value -> [bucket counts..., +Inf count], sum
+        self._series: Dict[str, Tuple[List[int], List[float]]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, label_value: str, value: float) -> None:
+        idx = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_value)
+            if series is None:
+                series = ([0] * (len(self.buckets) + 1), [0.0])
+                self._series[label_value] = series
+            series[0][idx] += 1
+            series[1][0] += value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            snapshot = {k: (list(c), s[0]) for k, (c, s) in self._series.items()}
+        for label_value in sorted(snapshot):
+            counts, total = snapshot[label_value]
+            labels = f'{self.label}="{label_value}"'
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{{{labels},le="{bound:g}"}} {cumulative}')
+            cumulative += counts[-1]
+            lines.append(f'{self.name}_bucket{{{labels},le="+Inf"}} {cumulative}')
+            lines.append(f"{self.name}_sum{{{labels}}} {total:.6f}")
+            lines.append(f"{self.name}_count{{{labels}}} {cumulative}")
+        return lines
+
+
+STAGE_SECONDS = Histogram(
+    "basma_stage_seconds",
+    "Latency of each analyze-image / classifier stage in seconds.",
+    "stage",
+)
+
+
+class RequestTimer:
+    """Stage timings of one request, rendered as a Server-Timing header."""
+
+    def __init__(self) -> None:
+        self.started = time.perf_counter()
+        self.stages: List[Tuple[str, float]] = []
+        self._lock = threading.Lock()
+
+    def add(self, stage: str, seconds: float) -> None:
+        with self._lock:
+            self.stages.append((stage, seconds))
+
+    def header(self) -> str:
+        with self._lock:
+            stages = list(self.stages)
+        stages.append(("total", time.perf_counter() - self.started))
+        return ", ".join(f"{stage};dur={seconds * 1000.0:.1f}" for stage, seconds in stages)
+
+
+_current_timer: ContextVar[Optional[RequestTimer]] = ContextVar("basma_request_timer", default=None)
+_NOOP: ContextManager[None] = nullcontext()
+
+
+def record(stage: str, seconds: float) -> None:
+    STAGE_SECONDS.observe(stage, seconds)
+    timer = _current_timer.get()
+    if timer is not None:
+        timer.add(stage, seconds)
+
+
+def record_profile(
+    stages: Sequence[str],
+    values: Optional[Sequence[float]],
+    scale: float = 1.0,
+) -> None:
+    """Record timings measured elsewhere (e.g. yolov5's ``results.t``)."""
+    if not AI_METRICS_ENABLED or not values:
+        return
+    for stage, value in zip(stages, values):
+        try:
+            record(stage, float(value) * scale)
+        except (TypeError, ValueError):
+            continue
+
+
+@contextmanager
+def _timed(stage: str) -> Iterator[None]:
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(stage, time.perf_counter() - start)
+
+
+def timed(stage: str) -> ContextManager[None]:
+    """``with timed("forward"): ...`` — no-op when metrics are disabled."""
+    if not AI_METRICS_ENABLED:
+        return _NOOP
+    return _timed(stage)
+
+
+async def request_timing() -> AsyncIterator[Optional[RequestTimer]]:
+    """
+    FastAPI dependency: collect the stages of one request and record its
+    ``total`` when the request is done. Yields ``None`` when metrics are
+    disabled.
+    """
+    if not AI_METRICS_ENABLED:
+        yield None
+        return
+    timer = RequestTimer()
+    token = _current_timer.set(timer)
+    try:
+        yield timer
+    finally:
+        try:
+            _current_timer.reset(token)
+        except ValueError:
+            # exit ran in a different context; nothing to restore
+            pass
+        STAGE_SECONDS.observe("total", time.perf_counter() - timer.started)
+
+
+def timing_header(timer: Optional[RequestTimer]) -> Optional[str]:
+    """Server-Timing value for ``timer`` if the header is enabled."""
+    if timer is None or not AI_TIMING_HEADER:
+        return None
+    return timer.header() or None
+
+
+def metric_lines(
+    name: str,
+    kind: str,
+    help_text: str,
+    samples: Sequence[Tuple[Dict[str, str], float]],
+) -> List[str]:
+    """Exposition lines for a counter/gauge with ``(labels, value)`` samples."""
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+    for labels, value in samples:
+        if labels:
+            rendered = ",".join(f'{k}="{v}"' for k, v in labels.items())
+            lines.append(f"{name}{{{rendered}}} {value:g}")
+        else:
+            lines.append(f"{name} {value:g}")
+    return lines
+
+
+# Extra exposition providers: callables returning ready-made text lines
+# (counters/gauges owned by other modules).
+_collectors: List[Callable[[], List[str]]] = []
+
+
+def register_collector(fn: Callable[[], List[str]]) -> None:
+    _collectors.append(fn)
+
+
+def render_metrics() -> str:
+    lines = STAGE_SECONDS.render()
+    for collect in _collectors:
+        try:
+            lines.extend(collect())
+        except Exception:
+            continue
+    return "\n".join(lines) + "\n"
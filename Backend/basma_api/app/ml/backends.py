@@ -0,0 +1,282 @@
+# app/ml/backends.py
+from __future__ import annotations
+
+import ast
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from PIL import Image
+
+from app.metrics import record_profile, timed
+from app.ml.threads import apply_torch_threads, configure_ort_session
+
+# Defaults of yolov5 AutoShape / non_max_suppression
+DEFAULT_IOU_THRESHOLD = 0.45
+DEFAULT_MAX_DET = 1000
+MAX_NMS_CANDIDATES = 30000
+MAX_WH = 7680  # per-class box offset used for batched (class-aware) NMS
+
+
+def _names_to_dict(names: Any) -> Dict[int, str]:
+    if isinstance(names, dict):
+        return {int(k): str(v) for k, v in names.items()}
+    if isinstance(names, (list, tuple)):
+        return {i: str(v) for i, v in enumerate(names)}
+    return {}
+
+
+class InferenceBackend(ABC):
+    """
+    Minimal interface the classifier needs from a detection model.
+
+    ``infer`` takes RGB PIL images and returns one ``(N, 6)`` float array per
+    image: ``[x1, y1, x2, y2, conf, cls]`` in that image's pixel coordinates,
+    after confidence filtering and NMS.
+    """
+
+    name = "base"
+    names: Dict[int, str]
+
+    @abstractmethod
+    def set_conf(self, conf: float) -> None:
+        """Confidence threshold applied by ``infer`` from now on."""
+
+    @abstractmethod
+    def infer(self, images: Sequence[Image.Image], size: int = 640) -> List[np.ndarray]:
+        """One ``(N, 6)`` detection array per image."""
+
+
+class YoloV5Backend(InferenceBackend):
+    """The original path: ``yolov5.load`` (PyTorch + AutoShape)."""
+
+    name = "yolov5"
+
+    def __init__(
+        self,
+        model_path: str,
+        conf: float,
+        intra_op_threads: int = 0,
+        inter_op_threads: int = 0,
+    ) -> None:
+        import yolov5  # heavy import, only when this backend is selected
+
+        # before loading: torch's inter-op pool can only be sized up front
+        self.threads = apply_torch_threads(intra_op_threads, inter_op_threads)
+        self.model = yolov5.load(model_path)
+        self.set_conf(conf)
+        self.names = _names_to_dict(getattr(self.model, "names", None))
+
+    def set_conf(self, conf: float) -> None:
+        # إعداد عتبة الثقة داخل النموذج (إن وُجدت الخاصية)
+        try:
+            self.model.conf = float(conf)
+        except Exception:
+            pass
+
+    def infer(self, images: Sequence[Image.Image], size: int = 640) -> List[np.ndarray]:
+        batch = images[0] if len(images) == 1 else list(images)
+        results = self.model(batch, size=size)
+        # AutoShape already profiles its steps (ms per image)
+        record_profile(
+            ("preprocess", "model", "nms"),
+            getattr(results, "t", None),
+            scale=len(images) / 1000.0,
+        )
+        names = _names_to_dict(getattr(results, "names", None))
+        if names:
+            self.names = names
+        out: List[np.ndarray] = []
+        for idx in range(len(images)):
+            try:
+                det = results.xyxy[idx]
+            except Exception:
+                det = None
+            if det is None or len(det) == 0:
+                out.append(np.zeros((0, 6), dtype=np.float64))
+            else:
+                out.append(det.detach().cpu().numpy().astype(np.float64))
+        return out
+
+
+def letterbox(image: Image.Image, size: int) -> Tuple[np.ndarray, float, Tuple[float, float]]:
+    """Resize keeping aspect ratio and pad to ``size x size`` (value 114)."""
+    width, height = image.size
+    gain = min(size / width, size / height)
+    new_w, new_h = int(round(width * gain)), int(round(height * gain))
+    if (new_w, new_h) != (width, height):
+        image = image.resize((new_w, new_h), Image.BILINEAR)
+    canvas = np.full((size, size, 3), 114, dtype=np.uint8)
+    pad_x = (size - new_w) / 2.0
+    pad_y = (size - new_h) / 2.0
+    left, top = int(round(pad_x - 0.1)), int(round(pad_y - 0.1))
+    canvas[top:top + new_h, left:left + new_w] = np.asarray(image, dtype=np.uint8)
+    return canvas, gain, (left, top)
+
+
+def nms(boxes: np.ndarray, scores: np.ndarray, iou_threshold: float) -> np.ndarray:
+    """Greedy NMS; returns kept indices ordered by descending score."""
+    if boxes.size == 0:
+        return np.zeros((0,), dtype=np.int64)
+    x1, y1, x2, y2 = boxes[:, 0], boxes[:, 1], boxes[:, 2], boxes[:, 3]
+    areas = np.clip(x2 - x1, 0, None) * np.clip(y2 - y1, 0, None)
+    order = np.argsort(-scores, kind="stable")
+    keep: List[int] = []
+    while order.size:
+        i = int(order[0])
+        keep.append(i)
+        if order.size == 1:
+            break
+        rest = order[1:]
+        xx1 = np.maximum(x1[i], x1[rest])
+        yy1 = np.maximum(y1[i], y1[rest])
+        xx2 = np.minimum(x2[i], x2[rest])
+        yy2 = np.minimum(y2[i], y2[rest])
+        inter = np.clip(xx2 - xx1, 0, None) * np.clip(yy2 - yy1, 0, None)
+        iou = inter / np.maximum(areas[i] + areas[rest] - inter, 1e-9)
+        order = rest[iou <= iou_threshold]
+    return np.asarray(keep, dtype=np.int64)
+
+
+def postprocess_yolo_output(
+    pred: np.ndarray,
+    conf_threshold: float,
+    iou_threshold: float = DEFAULT_IOU_THRESHOLD,
+    max_det: int = DEFAULT_MAX_DET,
+) -> np.ndarray:
+    """
+    Same steps as yolov5 ``non_max_suppression`` (single label per box,
+    class-aware NMS) on one image's raw ``(anchors, 5 + nc)`` output.
+    """
+    pred = pred[pred[:, 4] > conf_threshold]
+    if not pred.shape[0]:
+        return np.zeros((0, 6), dtype=np.float64)
+
+    cls_scores = pred[:, 5:] * pred[:, 4:5]
+    cls_idx = cls_scores.argmax(axis=1)
+    conf = cls_scores[np.arange(cls_scores.shape[0]), cls_idx]
+
+    xywh = pred[:, :4]
+    boxes = np.empty_like(xywh)
+    boxes[:, 0] = xywh[:, 0] - xywh[:, 2] / 2
+    boxes[:, 1] = xywh[:, 1] - xywh[:, 3] / 2
+    boxes[:, 2] = xywh[:, 0] + xywh[:, 2] / 2
+    boxes[:, 3] = xywh[:, 1] + xywh[:, 3] / 2
+
+    mask = conf > conf_threshold
+    boxes, conf, cls_idx = boxes[mask], conf[mask], cls_idx[mask]
+    if not boxes.shape[0]:
+        return np.zeros((0, 6), dtype=np.float64)
+
+    if boxes.shape[0] > MAX_NMS_CANDIDATES:
+        top = np.argsort(-conf, kind="stable")[:MAX_NMS_CANDIDATES]
+        boxes, conf, cls_idx = boxes[top], conf[top], cls_idx[top]
+
+    offsets = cls_idx[:, None].astype(boxes.dtype) * MAX_WH
+    keep = nms(boxes + offsets, conf, iou_threshold)[:max_det]
+    return np.concatenate(
+        [boxes[keep], conf[keep, None], cls_idx[keep, None].astype(boxes.dtype)],
+        axis=1,
+    ).astype(np.float64)
+
+
+def scale_boxes(
+    det: np.ndarray,
+    gain: float,
+    pad: Tuple[float, float],
+    image_size: Tuple[int, int],
+) -> np.ndarray:
+    """Map boxes from letterboxed input space back to the image and clip."""
+    if not det.shape[0]:
+        return det
+    det = det.copy()
+    det[:, [0, 2]] = (det[:, [0, 2]] - pad[0]) / gain
+    det[:, [1, 3]] = (det[:, [1, 3]] - pad[1]) / gain
+    width, height = image_size
+    det[:, [0, 2]] = det[:, [0, 2]].clip(0, width)
+    det[:, [1, 3]] = det[:, [1, 3]].clip(0, height)
+    return det
+
+
+class OnnxBackend(InferenceBackend):
+    """
+    YOLOv5 exported to ONNX (``python -m app.ml.export_onnx``) and run on
+    ONNX Runtime's CPU provider. Letterboxing, NMS and box rescaling are done
+    here with NumPy, so neither torch nor the yolov5 package is needed.
+    """
+
+    name = "onnx"
+
+    def __init__(
+        self,
+        model_path: str,
+        conf: float,
+        iou: float = DEFAULT_IOU_THRESHOLD,
+        intra_op_threads: int = 0,
+        inter_op_threads: int = 0,
+    ) -> None:
+        import onnxruntime as ort
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        configure_ort_session(options, intra_op_threads, inter_op_threads)
+        self.threads = {"intra_op": intra_op_threads or None, "inter_op": inter_op_threads or None}
+        self.session = ort.InferenceSession(
+            model_path,
+            sess_options=options,
+            providers=["CPUExecutionProvider"],
+        )
+        self.input_name = self.session.get_inputs()[0].name
+        input_shape = self.session.get_inputs()[0].shape
+        # Static exports fix the batch dimension (usually 1)
+        self.fixed_batch: Optional[int] = input_shape[0] if isinstance(input_shape[0], int) else None
+        self.input_size: Optional[int] = input_shape[2] if isinstance(input_shape[2], int) else None
+        self.iou = float(iou)
+        self.set_conf(conf)
+
+        meta = self.session.get_modelmeta().custom_metadata_map or {}
+        names: Dict[int, str] = {}
+        if "names" in meta:
+            try:
+                names = _names_to_dict(ast.literal_eval(meta["names"]))
+            except (ValueError, SyntaxError):
+                names = {}
+        self.names = names
+
+    def set_conf(self, conf: float) -> None:
+        self.conf = float(conf)
+
+    def _run(self, batch: np.ndarray) -> np.ndarray:
+        return self.session.run(None, {self.input_name: batch})[0]
+
+    def infer(self, images: Sequence[Image.Image], size: int = 640) -> List[np.ndarray]:
+        size = self.input_size or size
+        tensors, meta = [], []
+        with timed("preprocess"):
+            for image in images:
+                canvas, gain, pad = letterbox(image, size)
+                tensors.append(canvas.transpose(2, 0, 1))
+                meta.append((gain, pad, image.size))
+            batch = np.ascontiguousarray(np.stack(tensors), dtype=np.float32) / 255.0
+
+        with timed("model"):
+            if self.fixed_batch == 1 and batch.shape[0] > 1:
+                raw = np.concatenate([self._run(batch[i:i + 1]) for i in range(batch.shape[0])])
+            else:
+                raw = self._run(batch)
+
+        out: List[np.ndarray] = []
+        with timed("nms"):
+            for idx, (gain, pad, image_size) in enumerate(meta):
+                det = postprocess_yolo_output(raw[idx].astype(np.float32), self.conf, self.iou)
+                out.append(scale_boxes(det, gain, pad, image_size))
+        return out
+
+
+def create_backend(kind: str, model_path: str, conf: float, **kwargs: Any) -> InferenceBackend:
+    kind = (kind or "yolov5").strip().lower()
+    if kind == "onnx":
+        return OnnxBackend(model_path, conf, **kwargs)
+    if kind in ("yolov5", "torch", "pt"):
+        return YoloV5Backend(model_path, conf, **kwargs)
+    raise ValueError(f"unknown inference backend: {kind!r}")
@@ -0,0 +1,140 @@
+# app/ml/batching.py
+from __future__ import annotations
+
+import asyncio
+from typing import Any, Dict, List, Optional, Tuple, TYPE_CHECKING
+
+from app.ml.inference_executor import InferenceExecutor
+from app.settings import AI_BATCH_MAX_SIZE, AI_BATCH_MAX_WAIT_MS
+
+if TYPE_CHECKING:
+    from app.ml.report_classifier import ReportClassifierService
+
+Prediction = Tuple[int, float, Dict[str, Any]]
+
+
+class MicroBatcher:
+    """
+    Collects images that arrive within ``max_wait_ms`` of each other and runs
+    them through ``ReportClassifierService.predict_batch`` as one model call.
+
+    Each caller awaits its own future; results are fanned back in order.
+    If a whole batch fails (e.g. one corrupt image), every image in it is
+    retried on its own so a bad upload only fails its own request.
+    """
+
+    def __init__(
+        self,
+        executor: InferenceExecutor,
+        max_batch_size: int = AI_BATCH_MAX_SIZE,
+        max_wait_ms: float = AI_BATCH_MAX_WAIT_MS,
+    ) -> None:
+        self.executor = executor
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait = max(0.0, float(max_wait_ms)) / 1000.0
+        self.batches = 0
+        self.images = 0
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def _ensure_started(self) -> asyncio.Queue:
+        if self._task is None or self._task.done():
+            self._queue = asyncio.Queue()
+            self._task = asyncio.get_running_loop().create_task(self._run())
+        assert self._queue is not None
+        return self._queue
+
+    async def submit(
+        self,
+        clf: "ReportClassifierService",
+        image_bytes: bytes,
+    ) -> Prediction:
+        queue = self._ensure_started()
+        fut: asyncio.Future = asyncio.get_running_loop().create_future()
+        await queue.put((clf, image_bytes, fut))
+        return await fut
+
+    async def _collect(self, queue: asyncio.Queue) -> List[Tuple[Any, bytes, asyncio.Future]]:
+        first = await queue.get()
+        batch = [first]
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self) -> None:
+        assert self._queue is not None
+        queue = self._queue
+        # At most one batch per inference thread is in flight; while they run,
+        # new arrivals keep accumulating into the next (larger) batch.
+        busy = asyncio.Semaphore(self.executor.max_workers)
+        loop = asyncio.get_running_loop()
+        while True:
+            await busy.acquire()
+            try:
+                batch = await self._collect(queue)
+            except BaseException:
+                busy.release()
+                raise
+            # Requests could come from different service instances (model
+            # reload); only images of the same instance share a model call.
+            groups: Dict[int, List[Tuple[Any, bytes, asyncio.Future]]] = {}
+            for item in batch:
+                groups.setdefault(id(item[0]), []).append(item)
+            task = loop.create_task(self._dispatch_groups(list(groups.values())))
+            task.add_done_callback(lambda _t: busy.release())
+
+    async def _dispatch_groups(
+        self,
+        groups: List[List[Tuple[Any, bytes, asyncio.Future]]],
+    ) -> None:
+        for items in groups:
+            await self._dispatch(items)
+
+    async def _dispatch(self, items: List[Tuple[Any, bytes, asyncio.Future]]) -> None:
+        clf = items[0][0]
+        self.batches += 1
+        self.images += len(items)
+        try:
+            results = await self.executor.run(clf.predict_batch, [b for _, b, _ in items])
+        except Exception as exc:
+            if len(items) == 1:
+                self._set_exception(items[0][2], exc)
+                return
+            for _, image_bytes, fut in items:
+                try:
+                    result = await self.executor.run(clf.predict, image_bytes)
+                except Exception as single_exc:
+                    self._set_exception(fut, single_exc)
+                else:
+                    self._set_result(fut, result)
+            return
+
+        for (_, _, fut), result in zip(items, results):
+            self._set_result(fut, result)
+
+    @staticmethod
+    def _set_result(fut: asyncio.Future, result: Prediction) -> None:
+        if not fut.done():
+            fut.set_result(result)
+
+    @staticmethod
+    def _set_exception(fut: asyncio.Future, exc: BaseException) -> None:
+        if not fut.done():
+            fut.set_exception(exc)
+
+    def stats(self) -> dict:
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000.0,
+            "batches": self.batches,
+            "images": self.images,
+            "avg_batch_size": (self.images / self.batches) if self.batches else 0.0,
+        }
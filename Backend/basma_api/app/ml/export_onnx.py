@@ -0,0 +1,43 @@
+# app/ml/export_onnx.py
+"""
+Export the YOLOv5 weights (vp.pt) to ONNX for ``AI_MODEL_BACKEND=onnx``.
+
+    python -m app.ml.export_onnx --weights app/models/vp.pt --imgsz 640
+
+The exported file keeps the class names in its metadata, which
+``OnnxBackend`` reads back. Requires torch, yolov5 and onnx (dev only).
+"""
+from __future__ import annotations
+
+import argparse
+from pathlib import Path
+
+
+def export(weights: str, imgsz: int = 640, dynamic: bool = True, opset: int = 12) -> Path:
+    from yolov5 import export as yolo_export
+
+    yolo_export.run(
+        weights=weights,
+        imgsz=(imgsz, imgsz),
+        include=("onnx",),
+        device="cpu",
+        dynamic=dynamic,  # dynamic batch so micro-batches run as one call
+        simplify=False,
+        opset=opset,
+    )
+    return Path(weights).with_suffix(".onnx")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--weights", default="app/models/vp.pt")
+    parser.add_argument("--imgsz", type=int, default=640)
+    parser.add_argument("--static", action="store_true", help="fixed batch size of 1")
+    parser.add_argument("--opset", type=int, default=12)
+    args = parser.parse_args()
+    out = export(args.weights, args.imgsz, dynamic=not args.static, opset=args.opset)
+    print(f"exported: {out}")
+
+
+if __name__ == "__main__":
+    main()
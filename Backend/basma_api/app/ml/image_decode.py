@@ -0,0 +1,71 @@
+# app/ml/image_decode.py
+from __future__ import annotations
+
+import io
+from typing import Tuple
+
+from PIL import Image, ImageOps
+
+# EXIF orientations that rotate the image by 90/270 degrees
+_TRANSPOSED_ORIENTATIONS = {5, 6, 7, 8}
+_EXIF_ORIENTATION_TAG = 0x0112
+
+
+def decode_full(image_bytes: bytes) -> Image.Image:
+    """Legacy decode path: full-resolution RGB, EXIF orientation ignored."""
+    image = Image.open(io.BytesIO(image_bytes))
+    if image.mode != "RGB":
+        image = image.convert("RGB")
+    return image
+
+
+def probe_size(image_bytes: bytes) -> Tuple[int, int]:
+    """Size after EXIF orientation, read from the header only (no decode)."""
+    image = Image.open(io.BytesIO(image_bytes))
+    width, height = image.size
+    try:
+        orientation = image.getexif().get(_EXIF_ORIENTATION_TAG, 1)
+    except Exception:
+        orientation = 1
+    if orientation in _TRANSPOSED_ORIENTATIONS:
+        width, height = height, width
+    return width, height
+
+
+def decode_for_inference(
+    image_bytes: bytes,
+    target_size: int = 640,
+) -> Tuple[Image.Image, Tuple[int, int]]:
+    """
+    Decode straight to roughly ``target_size`` on the long side.
+
+    - JPEGs use draft mode, so libjpeg does a reduced-scale (1/2, 1/4, 1/8)
+      IDCT and the full-resolution bitmap is never allocated.
+    - EXIF orientation is applied, so phone photos reach the model upright.
+    - The remaining downscale to ``target_size`` is a cheap resize of an
+      already small image.
+
+    Returns ``(rgb_image, (original_width, original_height))`` where the
+    original size is after orientation. Box area ratios computed on the
+    returned image equal those on the original frame (same aspect ratio).
+    """
+    image = Image.open(io.BytesIO(image_bytes))
+    width, height = image.size
+    try:
+        orientation = image.getexif().get(_EXIF_ORIENTATION_TAG, 1)
+    except Exception:
+        orientation = 1
+    if orientation in _TRANSPOSED_ORIENTATIONS:
+        width, height = height, width
+
+    if target_size > 0 and image.format == "JPEG":
+        image.draft("RGB", (target_size, target_size))
+
+    image = ImageOps.exif_transpose(image)
+    if image.mode != "RGB":
+        image = image.convert("RGB")
+
+    if target_size > 0 and max(image.size) > target_size:
+        image.thumbnail((target_size, target_size), Image.BILINEAR)
+
+    return image, (width, height)
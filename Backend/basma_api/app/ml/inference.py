@@ -0,0 +1,99 @@
+# app/ml/inference.py
+from __future__ import annotations
+
+from typing import Any, Dict, Optional, Tuple, TYPE_CHECKING
+
+from app.ml.batching import MicroBatcher
+from app.ml.inference_executor import get_inference_executor
+from app.ml.near_duplicates import get_classification_index
+from app.ml.phash import dhash_bytes
+from app.ml.result_cache import get_prediction_cache, make_cache_key
+from app.settings import AI_BATCH_MAX_SIZE, AI_PHASH_ENABLED
+
+if TYPE_CHECKING:
+    from app.ml.report_classifier import ReportClassifierService
+
+# Singleton batcher (created on first use when batching is enabled)
+_batcher: Optional[MicroBatcher] = None
+
+
+def get_batcher() -> Optional[MicroBatcher]:
+    global _batcher
+    if AI_BATCH_MAX_SIZE <= 1:
+        return None
+    if _batcher is None:
+        _batcher = MicroBatcher(get_inference_executor())
+    return _batcher
+
+
+async def hash_image(image_bytes: bytes) -> Optional[int]:
+    """Perceptual hash (dHash) of the image, computed off the event loop."""
+    if not AI_PHASH_ENABLED:
+        return None
+    return await get_inference_executor().run(dhash_bytes, image_bytes)
+
+
+async def classify_image(
+    clf: "ReportClassifierService",
+    image_bytes: bytes,
+    confidence_threshold: float = 0.0,
+    image_hash: Optional[int] = None,
+) -> Tuple[int, float, Dict[str, Any]]:
+    """
+    Run ``clf.predict`` for one image without blocking the event loop.
+
+    - Results are cached by content hash; ``confidence_threshold`` (the
+      API-level threshold) is part of the cache key together with the model
+      version and the model's own threshold.
+    - If ``image_hash`` (see ``hash_image``) is identical to that of an
+      image already classified by the same model, that answer is reused.
+    - When micro-batching is enabled the image joins the current batch
+      instead of getting its own model call.
+    - A ``RemoteClassifier`` (``AI_INFERENCE_REMOTE_URL``) sends the image
+      to the inference worker process instead, bypassing both caches here:
+      the worker caches its own results and knows when its model changes.
+
+    Raises ``InferenceQueueFull`` when too many analyses are already in
+    flight; callers translate that into 503 + Retry-After.
+    """
+    remote = getattr(clf, "remote", False)
+    model_version = getattr(clf, "model_version", "unknown")
+    # a remote worker may reload its model at any time, so its version seen
+    # from here can be stale: only the worker caches remote answers
+    cacheable = not remote and model_version != "unknown"
+    cache = get_prediction_cache()
+    key = make_cache_key(
+        image_bytes,
+        model_version,
+        getattr(clf, "model_conf_threshold", 0.0),
+        confidence_threshold,
+    )
+    if cacheable:
+        cached = await cache.get(key)
+        if cached is not None:
+            return cached
+
+    near_index = get_classification_index() if image_hash is not None and cacheable else None
+    if near_index is not None:
+        reused = near_index.lookup(image_hash, model_version)
+        if reused is not None:
+            cache.put(key, reused)
+            return reused
+
+    if remote:
+        # out-of-process worker: admission control and batching happen there
+        result = await clf.apredict(image_bytes)
+    else:
+        executor = get_inference_executor()
+        batcher = get_batcher()
+        async with executor.slot():
+            if batcher is not None:
+                result = await batcher.submit(clf, image_bytes)
+            else:
+                result = await executor.run(clf.predict, image_bytes)
+
+    if cacheable:
+        cache.put(key, result)
+    if near_index is not None:
+        near_index.add(image_hash, model_version, result)
+    return result
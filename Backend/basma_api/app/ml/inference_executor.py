@@ -0,0 +1,113 @@
+# app/ml/inference_executor.py
+from __future__ import annotations
+
+import asyncio
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from functools import partial
+from typing import Any, AsyncIterator, Callable, Optional, TypeVar
+
+from app.settings import (
+    AI_INFERENCE_MAX_PENDING,
+    AI_INFERENCE_RETRY_AFTER,
+    AI_INFERENCE_WORKERS,
+)
+
+T = TypeVar("T")
+
+
+class InferenceQueueFull(Exception):
+    """Raised when the executor already holds ``max_pending`` requests."""
+
+    def __init__(self, retry_after: int) -> None:
+        super().__init__("inference queue is full")
+        self.retry_after = retry_after
+
+
+class InferenceExecutor:
+    """
+    Bounded executor that keeps CPU-heavy model calls off the event loop.
+
+    - ``max_workers`` threads run the actual inference (PyTorch releases the
+      GIL inside its kernels, so threads give real parallelism here).
+    - ``max_pending`` caps how many requests may be admitted at once
+      (running + waiting). Extra requests fail fast with
+      ``InferenceQueueFull`` so the API can answer 503 + Retry-After
+      instead of piling up unbounded work.
+
+    Admission bookkeeping only happens on the event loop thread, so no lock
+    is needed around ``pending``.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = AI_INFERENCE_WORKERS,
+        max_pending: int = AI_INFERENCE_MAX_PENDING,
+        retry_after: int = AI_INFERENCE_RETRY_AFTER,
+    ) -> None:
+        self.max_workers = max(1, int(max_workers))
+        self.max_pending = max(1, int(max_pending))
+        self.retry_after = max(1, int(retry_after))
+        self.pending = 0
+        self.rejected = 0
+        self._pool = ThreadPoolExecutor(
+            max_workers=self.max_workers,
+            thread_name_prefix="inference",
+        )
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """Reserve one admission slot or raise ``InferenceQueueFull``."""
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            raise InferenceQueueFull(self.retry_after)
+        self.pending += 1
+        try:
+            yield
+        finally:
+            self.pending -= 1
+
+    async def run(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """Run ``fn`` on the inference pool without taking an admission slot.
+
+        The caller's context variables (e.g. the request's stage timer) are
+        visible inside ``fn``, as with ``asyncio.to_thread``.
+        """
+        loop = asyncio.get_running_loop()
+        ctx = contextvars.copy_context()
+        return await loop.run_in_executor(self._pool, partial(ctx.run, fn, *args, **kwargs))
+
+    async def submit(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """Admit the call (or fail fast) and run it on the inference pool."""
+        async with self.slot():
+            return await self.run(fn, *args, **kwargs)
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.max_workers,
+            "max_pending": self.max_pending,
+            "pending": self.pending,
+            "rejected": self.rejected,
+        }
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._pool.shutdown(wait=wait)
+
+
+# Singleton instance (one pool per API worker process)
+_executor: Optional[InferenceExecutor] = None
+
+
+def get_inference_executor() -> InferenceExecutor:
+    global _executor
+    if _executor is None:
+        _executor = InferenceExecutor()
+    return _executor
+
+
+def shutdown_inference_executor() -> None:
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False)
+        _executor = None
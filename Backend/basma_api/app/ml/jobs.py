@@ -0,0 +1,277 @@
+# app/ml/jobs.py
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import sqlite3
+import time
+import uuid
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from app.ml.inference_executor import InferenceQueueFull
+from app.settings import (
+    AI_JOB_CONCURRENCY,
+    AI_JOB_MAX_QUEUED,
+    AI_JOB_STALE_SECONDS,
+    AI_JOB_STORE_PATH,
+    AI_JOB_TTL,
+)
+from app.sqlite_store import SQLiteStore
+
+logger = logging.getLogger("basma.ml")
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+ACTIVE = (QUEUED, RUNNING)
+
+# how often (at most) expired rows are purged
+CLEANUP_INTERVAL = 60.0
+# a job that keeps hitting a full inference queue gives up after this many waits
+MAX_BUSY_RETRIES = 30
+ABANDONED_ERROR = "worker stopped before the job finished"
+
+SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS jobs ("
+    " id TEXT PRIMARY KEY,"
+    " status TEXT NOT NULL,"
+    " result TEXT,"
+    " error TEXT,"
+    " created_at REAL NOT NULL,"
+    " updated_at REAL NOT NULL)",
+    "CREATE INDEX IF NOT EXISTS jobs_updated_at ON jobs (updated_at)",
+)
+
+
+class JobStore:
+    """
+    State of asynchronous analyze jobs in a local SQLite file.
+
+    The file is shared by every API worker on the host, so a poll can land
+    on any worker; the job itself runs in the worker that accepted it.
+    All statements run on an ``SQLiteStore`` thread, never on the event loop.
+
+    - The worker running a job refreshes its ``updated_at`` (``touch``);
+      a queued/running job not refreshed for ``stale_seconds`` belonged to a
+      worker that died and is marked failed (its image is gone, so it
+      cannot be requeued).
+    - Rows older than ``ttl_seconds`` are purged lazily on writes.
+    """
+
+    def __init__(
+        self,
+        path: str = AI_JOB_STORE_PATH,
+        ttl_seconds: float = AI_JOB_TTL,
+        stale_seconds: float = AI_JOB_STALE_SECONDS,
+    ) -> None:
+        self.path = path
+        self.ttl = float(ttl_seconds)
+        self.stale = float(stale_seconds)
+        self._last_cleanup = 0.0
+        self._db = SQLiteStore(path, name="ai-jobs", timeout=5.0, schema=SCHEMA, row_factory=sqlite3.Row)
+
+    # -------------------------
+    # Statements (run on the store thread)
+    # -------------------------
+
+    def _insert(self, conn: sqlite3.Connection, job_id: str, now: float) -> None:
+        with conn:
+            conn.execute(
+                "INSERT INTO jobs (id, status, created_at, updated_at) VALUES (?, ?, ?, ?)",
+                (job_id, QUEUED, now, now),
+            )
+
+    def _update(
+        self,
+        conn: sqlite3.Connection,
+        job_id: str,
+        status: str,
+        result: Optional[str],
+        error: Optional[str],
+    ) -> None:
+        with conn:
+            conn.execute(
+                "UPDATE jobs SET status = ?, result = ?, error = ?, updated_at = ? WHERE id = ?",
+                (status, result, error, time.time(), job_id),
+            )
+
+    def _touch(self, conn: sqlite3.Connection, job_ids: List[str]) -> None:
+        with conn:
+            conn.executemany(
+                "UPDATE jobs SET updated_at = ? WHERE id = ? AND status IN (?, ?)",
+                [(time.time(), job_id, *ACTIVE) for job_id in job_ids],
+            )
+
+    def _fail_abandoned(self, conn: sqlite3.Connection, now: float) -> int:
+        with conn:
+            cur = conn.execute(
+                "UPDATE jobs SET status = ?, error = ?, updated_at = ?"
+                " WHERE status IN (?, ?) AND updated_at < ?",
+                (FAILED, ABANDONED_ERROR, now, *ACTIVE, now - self.stale),
+            )
+        return cur.rowcount
+
+    def _select(self, conn: sqlite3.Connection, job_id: str) -> Optional[Dict[str, Any]]:
+        row = conn.execute(
+            "SELECT id, status, result, error, created_at, updated_at FROM jobs WHERE id = ?",
+            (job_id,),
+        ).fetchone()
+        if row is None:
+            return None
+        job = dict(row)
+        now = time.time()
+        if self.ttl and now - job["updated_at"] > self.ttl:
+            return None
+        if job["status"] in ACTIVE and now - job["updated_at"] > self.stale:
+            self._fail_abandoned(conn, now)
+            job.update(status=FAILED, error=ABANDONED_ERROR, result=None, updated_at=now)
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        return job
+
+    def _purge(self, conn: sqlite3.Connection, now: float) -> int:
+        self._fail_abandoned(conn, now)
+        with conn:
+            cur = conn.execute("DELETE FROM jobs WHERE updated_at < ?", (now - self.ttl,))
+        return cur.rowcount
+
+    # -------------------------
+    # Public API
+    # -------------------------
+
+    async def create(self) -> Dict[str, Any]:
+        job_id = uuid.uuid4().hex
+        await self._db.run(self._insert, job_id, time.time())
+        await self.cleanup()
+        return await self.get(job_id) or {}
+
+    async def update(
+        self,
+        job_id: str,
+        status: str,
+        result: Optional[Dict[str, Any]] = None,
+        error: Optional[str] = None,
+    ) -> None:
+        payload = json.dumps(result, ensure_ascii=False) if result is not None else None
+        await self._db.run(self._update, job_id, status, payload, error)
+
+    async def touch(self, job_ids: List[str]) -> None:
+        """Heartbeat for jobs this worker is still working on."""
+        if job_ids:
+            await self._db.run(self._touch, job_ids)
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        return await self._db.run(self._select, job_id)
+
+    async def cleanup(self, force: bool = False) -> int:
+        now = time.time()
+        if not force and now - self._last_cleanup < CLEANUP_INTERVAL:
+            return 0
+        self._last_cleanup = now
+        return await self._db.run(self._purge, now)
+
+
+class JobRunner:
+    """
+    Runs accepted jobs as background tasks of this worker's event loop.
+
+    - At most ``concurrency`` jobs classify at once, so background work
+      cannot take every inference slot from synchronous requests.
+    - ``full()`` is true once ``max_queued`` jobs are waiting or running;
+      the API then answers 503 instead of accepting more.
+    - A job that hits ``InferenceQueueFull`` waits ``retry_after`` and tries
+      again instead of failing.
+    - While jobs are active their rows are touched every
+      ``heartbeat_seconds`` so other workers do not take them for abandoned.
+    """
+
+    def __init__(
+        self,
+        store: JobStore,
+        concurrency: int = AI_JOB_CONCURRENCY,
+        max_queued: int = AI_JOB_MAX_QUEUED,
+        heartbeat_seconds: Optional[float] = None,
+    ) -> None:
+        self.store = store
+        self.concurrency = max(1, int(concurrency))
+        self.max_queued = max(1, int(max_queued))
+        self.heartbeat = heartbeat_seconds or max(1.0, store.stale / 4)
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._tasks: Dict[asyncio.Task, str] = {}
+        self._heartbeat_task: Optional[asyncio.Task] = None
+
+    def full(self) -> bool:
+        return len(self._tasks) >= self.max_queued
+
+    def submit(self, job_id: str, work: Callable[[], Awaitable[Dict[str, Any]]]) -> None:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+        loop = asyncio.get_running_loop()
+        task = loop.create_task(self._run(job_id, work))
+        # keep a reference until done (the loop only holds weak references)
+        self._tasks[task] = job_id
+        task.add_done_callback(self._forget)
+        if self._heartbeat_task is None or self._heartbeat_task.done():
+            self._heartbeat_task = loop.create_task(self._beat())
+
+    def _forget(self, task: asyncio.Task) -> None:
+        self._tasks.pop(task, None)
+
+    async def _beat(self) -> None:
+        while self._tasks:
+            await asyncio.sleep(self.heartbeat)
+            try:
+                await self.store.touch(list(self._tasks.values()))
+            except sqlite3.Error as e:
+                logger.warning("Job heartbeat failed: %s", e)
+
+    async def _run(self, job_id: str, work: Callable[[], Awaitable[Dict[str, Any]]]) -> None:
+        assert self._semaphore is not None
+        async with self._semaphore:
+            await self.store.update(job_id, RUNNING)
+            result: Optional[Dict[str, Any]] = None
+            error: Optional[str] = None
+            for attempt in range(MAX_BUSY_RETRIES + 1):
+                try:
+                    result = await work()
+                    break
+                except InferenceQueueFull as e:
+                    if attempt == MAX_BUSY_RETRIES:
+                        error = "inference queue is full"
+                        break
+                    await asyncio.sleep(e.retry_after)
+                except Exception as e:  # noqa: BLE001 - stored on the job
+                    error = str(getattr(e, "detail", None) or e) or type(e).__name__
+                    break
+
+        if error is None:
+            await self.store.update(job_id, DONE, result=result)
+        else:
+            await self.store.update(job_id, FAILED, error=error)
+
+    def stats(self) -> dict:
+        return {
+            "active": len(self._tasks),
+            "concurrency": self.concurrency,
+            "max_queued": self.max_queued,
+        }
+
+
+# Singleton instances (per API worker; the SQLite file is shared on the host)
+_store: Optional[JobStore] = None
+_runner: Optional[JobRunner] = None
+
+
+def get_job_store() -> JobStore:
+    global _store
+    if _store is None:
+        _store = JobStore()
+    return _store
+
+
+def get_job_runner() -> JobRunner:
+    global _runner
+    if _runner is None:
+        _runner = JobRunner(get_job_store())
+    return _runner
@@ -0,0 +1,247 @@
+# app/ml/model_registry.py
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from typing import Any, Callable, Deque, Dict, Optional, Tuple
+
+from app.ml.quantize import INT8_SUFFIX
+from app.settings import (
+    AI_MODEL_DIR,
+    AI_MODEL_PATH,
+    AI_MODEL_WATCH_INTERVAL,
+    AI_WARMUP_RUNS,
+)
+
+logger = logging.getLogger("basma.ml")
+
+Fingerprint = Tuple[str, int, int]  # (path, mtime_ns, size)
+
+# API-side confidence threshold kept inside the model (see ReportClassifierService)
+MODEL_CONF_THRESHOLD = 0.1
+
+
+def load_classifier(model_path: str):
+    """Build a ReportClassifierService in this process (heavy: loads the model)."""
+    # local import to avoid heavy dependency at module import time
+    from app.ml.report_classifier import ReportClassifierService
+
+    return ReportClassifierService(
+        model_path=model_path,
+        model_conf_threshold=MODEL_CONF_THRESHOLD,
+    )
+
+
+def _fingerprint(path: str) -> Optional[Fingerprint]:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return path, st.st_mtime_ns, st.st_size
+
+
+class ModelRegistry:
+    """
+    Holds the active ReportClassifierService and swaps it without a restart.
+
+    - ``get()`` returns the active service (loaded lazily on first use).
+    - ``reload(path)`` loads and warms a new service *next to* the active
+      one and then replaces the reference in one assignment. Requests that
+      already got the old service finish on it; it is freed once the last
+      of them drops its reference.
+    - ``watch()`` polls ``model_dir`` (newest file with the model's
+      extension) or ``model_path`` and reloads when the file changes. A
+      change is only picked up once the file looks the same on two polls,
+      so a half-copied file is never loaded.
+    """
+
+    def __init__(
+        self,
+        factory: Callable[[str], Any] = load_classifier,
+        model_path: str = AI_MODEL_PATH,
+        model_dir: Optional[str] = AI_MODEL_DIR,
+        warmup_runs: int = AI_WARMUP_RUNS,
+        poll_seconds: float = AI_MODEL_WATCH_INTERVAL,
+    ) -> None:
+        self.factory = factory
+        self.model_path = model_path
+        self.model_dir = model_dir
+        self.warmup_runs = max(0, int(warmup_runs))
+        self.poll_seconds = max(1.0, float(poll_seconds))
+        self.reloads = 0
+        self.failures = 0
+        self.last_error: Optional[str] = None
+        self.history: Deque[Dict[str, Any]] = deque(maxlen=10)
+        self._current: Optional[Any] = None
+        self._loaded: Optional[Fingerprint] = None
+        self._pending: Optional[Fingerprint] = None
+        self._init_lock = threading.Lock()
+        self._reload_lock = threading.Lock()
+
+    # -------------------------
+    # Active model
+    # -------------------------
+
+    def candidate_path(self) -> str:
+        """The file that should be active: newest in ``model_dir`` or ``model_path``."""
+        if not self.model_dir:
+            return self.model_path
+        suffix = Path(self.model_path).suffix or ".pt"
+        newest: Optional[Tuple[int, str]] = None
+        try:
+            entries = list(os.scandir(self.model_dir))
+        except OSError:
+            return self.model_path
+        for entry in entries:
+            if not entry.is_file() or not entry.name.endswith(suffix) or entry.name.endswith(INT8_SUFFIX):
+                continue
+            mtime = entry.stat().st_mtime_ns
+            if newest is None or mtime > newest[0]:
+                newest = (mtime, entry.path)
+        return newest[1] if newest else self.model_path
+
+    def check_path(self, path: str) -> str:
+        """
+        Resolved ``path`` if it is ``model_path`` itself or a file inside
+        ``model_dir``; raises ``ValueError`` otherwise. Loading a model
+        unpickles it, so a caller may only pick among the files an operator
+        put in those places.
+        """
+        real = os.path.realpath(path)
+        if os.path.isfile(real):
+            if real == os.path.realpath(self.model_path):
+                return real
+            if self.model_dir:
+                root = os.path.realpath(self.model_dir)
+                if os.path.commonpath([root, real]) == root:
+                    return real
+        raise ValueError("model path must be AI_MODEL_PATH or a file inside AI_MODEL_DIR")
+
+    def get(self) -> Any:
+        if self._current is None:
+            with self._init_lock:
+                if self._current is None:
+                    path = self.candidate_path()
+                    start = time.perf_counter()
+                    service = self.factory(path)
+                    self._activate(service, path, time.perf_counter() - start)
+        return self._current
+
+    @property
+    def loaded(self) -> bool:
+        return self._current is not None
+
+    def _activate(self, service: Any, path: str, load_seconds: float) -> None:
+        self._loaded = _fingerprint(path)
+        self._pending = None
+        # single reference assignment: new requests see the new model at once
+        self._current = service
+        self.history.appendleft(
+            {
+                "version": getattr(service, "model_version", "unknown"),
+                "path": path,
+                "loaded_at": time.time(),
+                "load_seconds": round(load_seconds, 3),
+            }
+        )
+
+    # -------------------------
+    # Reload
+    # -------------------------
+
+    @property
+    def reloading(self) -> bool:
+        return self._reload_lock.locked()
+
+    def reload(self, path: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Load + warm ``path`` (default: the current candidate) and swap it in.
+        Raises ``ValueError`` for a path ``check_path`` rejects and
+        ``RuntimeError`` if another reload is running; load errors are
+        re-raised and the active model stays in place.
+        """
+        path = self.check_path(path) if path else None
+        if not self._reload_lock.acquire(blocking=False):
+            raise RuntimeError("a model reload is already in progress")
+        try:
+            path = path or self.candidate_path()
+            start = time.perf_counter()
+            try:
+                service = self.factory(path)
+                if self.warmup_runs and hasattr(service, "warmup"):
+                    service.warmup(self.warmup_runs)
+            except Exception as exc:
+                self.failures += 1
+                self.last_error = f"{type(exc).__name__}: {exc}"
+                # do not retry the same broken file on every poll
+                self._loaded = _fingerprint(path)
+                raise
+            self._activate(service, path, time.perf_counter() - start)
+            self.reloads += 1
+            self.last_error = None
+            logger.info("Model reloaded: %s (%s)", getattr(service, "model_version", "?"), path)
+            return self.status()
+        finally:
+            self._reload_lock.release()
+
+    async def reload_async(self, path: Optional[str] = None) -> Dict[str, Any]:
+        """``reload`` on a plain thread, so the event loop and the inference pool keep serving."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.reload, path)
+
+    def changed_path(self) -> Optional[str]:
+        """Path to load if the model file changed and has been stable for one poll."""
+        path = self.candidate_path()
+        current = _fingerprint(path)
+        if current is None or current == self._loaded:
+            self._pending = None
+            return None
+        if current != self._pending:
+            self._pending = current
+            return None
+        return path
+
+    async def watch(self) -> None:
+        while True:
+            await asyncio.sleep(self.poll_seconds)
+            if not self.loaded or self.reloading:
+                continue
+            path = self.changed_path()
+            if path is None:
+                continue
+            try:
+                await self.reload_async(path)
+            except Exception:
+                logger.exception("Model reload from %s failed; keeping the active model", path)
+
+    def status(self) -> Dict[str, Any]:
+        current = self._current
+        return {
+            "loaded": current is not None,
+            "version": getattr(current, "model_version", None),
+            "path": getattr(current, "model_path", None),
+            "backend": getattr(current, "backend_name", None),
+            "variant": getattr(current, "variant", None),
+            "model_dir": self.model_dir,
+            "reloading": self.reloading,
+            "reloads": self.reloads,
+            "failures": self.failures,
+            "last_error": self.last_error,
+            "history": list(self.history),
+        }
+
+
+# Singleton instance (per process)
+_registry: Optional[ModelRegistry] = None
+
+
+def get_model_registry() -> ModelRegistry:
+    global _registry
+    if _registry is None:
+        _registry = ModelRegistry()
+    return _registry
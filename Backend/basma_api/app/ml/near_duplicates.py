@@ -0,0 +1,171 @@
+# app/ml/near_duplicates.py
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from sqlalchemy.orm import Session
+
+from app import models
+from app.ml.phash import BKTree, from_hex
+from app.settings import (
+    AI_PHASH_INDEX_SIZE,
+    AI_PHASH_RADIUS,
+    AI_PHASH_REFRESH_SECONDS,
+)
+
+Prediction = Tuple[int, float, Dict[str, Any]]
+
+
+class ClassificationIndex:
+    """
+    Bounded LRU of recently classified images by perceptual hash.
+
+    Only an image with exactly the same hash as one already classified by
+    the same model version reuses that answer instead of running YOLO
+    again. A Hamming radius is not safe here: with no location or time
+    constraint, nearby 64-bit dHashes can belong to different scenes (the
+    radius is only used for duplicate-report hints, see ``ReportHashIndex``).
+    """
+
+    def __init__(self, max_entries: int = AI_PHASH_INDEX_SIZE) -> None:
+        self.max_entries = max(1, int(max_entries))
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Tuple[int, str], Prediction]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def lookup(self, image_hash: int, model_version: str) -> Optional[Prediction]:
+        key = (image_hash, model_version)
+        with self._lock:
+            prediction = self._entries.get(key)
+            if prediction is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return prediction
+
+    def add(self, image_hash: int, model_version: str, prediction: Prediction) -> None:
+        key = (image_hash, model_version)
+        with self._lock:
+            self._entries[key] = prediction
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+class ReportHashIndex:
+    """
+    BK-tree of ``reports.image_before_phash`` used to flag likely duplicate
+    reports. Loaded lazily from the database and refreshed incrementally
+    (rows with ``id`` above the last seen one) at most every
+    ``refresh_seconds``; reports created by this worker are added directly
+    and skipped when a later refresh reaches them.
+    """
+
+    def __init__(
+        self,
+        radius: int = AI_PHASH_RADIUS,
+        refresh_seconds: float = AI_PHASH_REFRESH_SECONDS,
+    ) -> None:
+        self.radius = max(0, int(radius))
+        self.refresh_seconds = max(0.0, float(refresh_seconds))
+        self._tree: BKTree[Tuple[int, int, int]] = BKTree()
+        self._last_id = 0
+        self._last_refresh = 0.0
+        # ids added directly that a refresh has not passed yet
+        self._added: Set[int] = set()
+        self._lock = threading.Lock()
+
+    def add(self, report_id: int, report_type_id: int, area_id: int, image_hash: int) -> None:
+        with self._lock:
+            if report_id <= self._last_id or report_id in self._added:
+                return
+            self._tree.add(image_hash, (report_id, report_type_id, area_id))
+            self._added.add(report_id)
+            # no gap below it (nothing from other workers to fetch): advance
+            while self._last_id + 1 in self._added:
+                self._last_id += 1
+                self._added.discard(self._last_id)
+
+    def refresh(self, db: Session, force: bool = False) -> None:
+        now = time.monotonic()
+        if not force and now - self._last_refresh < self.refresh_seconds:
+            return
+        rows = (
+            db.query(
+                models.Report.id,
+                models.Report.report_type_id,
+                models.Report.area_id,
+                models.Report.image_before_phash,
+            )
+            .filter(
+                models.Report.id > self._last_id,
+                models.Report.image_before_phash.isnot(None),
+                models.Report.is_active == 1,
+            )
+            .order_by(models.Report.id)
+            .all()
+        )
+        with self._lock:
+            for report_id, report_type_id, area_id, phash_hex in rows:
+                if report_id <= self._last_id:
+                    continue
+                value = from_hex(phash_hex)
+                if value is not None and report_id not in self._added:
+                    self._tree.add(value, (report_id, report_type_id, area_id))
+                self._last_id = report_id
+            self._added = {i for i in self._added if i > self._last_id}
+            self._last_refresh = now
+
+    def find(
+        self,
+        db: Session,
+        image_hash: int,
+        area_id: Optional[int] = None,
+        limit: int = 5,
+    ) -> List[int]:
+        """IDs of reports whose photo is within ``radius`` (same area if given)."""
+        self.refresh(db)
+        with self._lock:
+            matches = self._tree.search(image_hash, self.radius)
+        ids: List[int] = []
+        for _, _, (report_id, _type_id, report_area_id) in matches:
+            if area_id and report_area_id != area_id:
+                continue
+            if report_id not in ids:
+                ids.append(report_id)
+            if len(ids) >= limit:
+                break
+        return ids
+
+
+# Singleton instances (per API worker)
+_classification_index: Optional[ClassificationIndex] = None
+_report_index: Optional[ReportHashIndex] = None
+
+
+def get_classification_index() -> ClassificationIndex:
+    global _classification_index
+    if _classification_index is None:
+        _classification_index = ClassificationIndex()
+    return _classification_index
+
+
+def get_report_hash_index() -> ReportHashIndex:
+    global _report_index
+    if _report_index is None:
+        _report_index = ReportHashIndex()
+    return _report_index
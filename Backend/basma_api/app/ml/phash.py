@@ -0,0 +1,124 @@
+# app/ml/phash.py
+from __future__ import annotations
+
+import io
+from typing import Any, Generic, List, Optional, Tuple, TypeVar
+
+from PIL import Image, ImageOps
+
+P = TypeVar("P")
+
+HASH_BITS = 64
+
+
+def dhash(image: Image.Image, hash_size: int = 8) -> int:
+    """
+    Difference hash (dHash): 64-bit fingerprint that survives re-encoding,
+    resizing and small crops/lighting changes of the same scene.
+    """
+    gray = image.convert("L").resize((hash_size + 1, hash_size), Image.LANCZOS)
+    pixels = list(gray.getdata())
+    value = 0
+    width = hash_size + 1
+    for row in range(hash_size):
+        offset = row * width
+        for col in range(hash_size):
+            value = (value << 1) | (1 if pixels[offset + col] < pixels[offset + col + 1] else 0)
+    return value
+
+
+def dhash_bytes(image_bytes: bytes) -> Optional[int]:
+    """dHash of an encoded image; ``None`` if the bytes cannot be decoded."""
+    try:
+        image = Image.open(io.BytesIO(image_bytes))
+        # JPEG: decode at a reduced scale, the hash only needs 9x8 pixels
+        image.draft("L", (64, 64))
+        image = ImageOps.exif_transpose(image)
+        return dhash(image)
+    except Exception:
+        return None
+
+
+def dhash_file(path: str) -> Optional[int]:
+    try:
+        with open(path, "rb") as fh:
+            return dhash_bytes(fh.read())
+    except OSError:
+        return None
+
+
+def hamming(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+def to_hex(value: int) -> str:
+    return f"{value:016x}"
+
+
+def from_hex(value: Optional[str]) -> Optional[int]:
+    if not value:
+        return None
+    try:
+        return int(value, 16)
+    except ValueError:
+        return None
+
+
+class BKTree(Generic[P]):
+    """
+    Burkhard-Keller tree over Hamming distance.
+
+    ``search(h, radius)`` only visits subtrees whose edge distance lies in
+    ``[d - radius, d + radius]``, so small-radius lookups touch a small
+    fraction of the stored hashes.
+    """
+
+    __slots__ = ("_root", "_size")
+
+    def __init__(self) -> None:
+        # node = [hash, payloads, {distance: child}]
+        self._root: Optional[list] = None
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def add(self, value: int, payload: P) -> None:
+        self._size += 1
+        if self._root is None:
+            self._root = [value, [payload], {}]
+            return
+        node = self._root
+        while True:
+            dist = hamming(value, node[0])
+            if dist == 0:
+                node[1].append(payload)
+                return
+            child = node[2].get(dist)
+            if child is None:
+                node[2][dist] = [value, [payload], {}]
+                return
+            node = child
+
+    def search(self, value: int, radius: int) -> List[Tuple[int, int, P]]:
+        """Return ``(distance, hash, payload)`` within ``radius``, nearest first."""
+        found: List[Tuple[int, int, Any]] = []
+        if self._root is None:
+            return found
+        stack = [self._root]
+        while stack:
+            node = stack.pop()
+            dist = hamming(value, node[0])
+            if dist <= radius:
+                for payload in node[1]:
+                    found.append((dist, node[0], payload))
+            low, high = dist - radius, dist + radius
+            for edge, child in node[2].items():
+                if low <= edge <= high:
+                    stack.append(child)
+        found.sort(key=lambda item: item[0])
+        return found
+
+    def clear(self) -> None:
+        self._root = None
+        self._size = 0
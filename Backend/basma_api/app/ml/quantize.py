@@ -0,0 +1,62 @@
+# app/ml/quantize.py
+"""
+Build the INT8 variant of the classifier from its ONNX export.
+
+    python -m app.ml.export_onnx --weights app/models/vp.pt
+    python -m app.ml.quantize --model app/models/vp.onnx
+
+Writes ``vp.int8.onnx`` next to the input. Weights are quantized to INT8
+ahead of time and activations are quantized dynamically at run time, so
+no calibration set is needed. Select it with ``AI_MODEL_VARIANT=int8``.
+"""
+from __future__ import annotations
+
+import argparse
+from pathlib import Path
+
+INT8_SUFFIX = ".int8.onnx"
+
+
+def int8_path_for(model_path: str) -> str:
+    """``app/models/vp.onnx`` -> ``app/models/vp.int8.onnx``."""
+    path = Path(model_path)
+    if path.name.endswith(INT8_SUFFIX):
+        return str(path)
+    return str(path.with_suffix("")) + INT8_SUFFIX
+
+
+def quantize(
+    model_path: str,
+    output_path: str | None = None,
+    exclude_nodes: list[str] | None = None,
+) -> str:
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    output_path = output_path or int8_path_for(model_path)
+    quantize_dynamic(
+        model_input=model_path,
+        model_output=output_path,
+        weight_type=QuantType.QUInt8,
+        per_channel=True,
+        # e.g. the detection-head Conv nodes, if agreement with FP32 drops
+        nodes_to_exclude=list(exclude_nodes or []),
+    )
+    return output_path
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default="app/models/vp.onnx")
+    parser.add_argument("--output", default=None)
+    parser.add_argument(
+        "--exclude",
+        default="",
+        help="comma-separated ONNX node names to keep in FP32",
+    )
+    args = parser.parse_args()
+    exclude = [n.strip() for n in args.exclude.split(",") if n.strip()]
+    print(f"quantized: {quantize(args.model, args.output, exclude)}")
+
+
+if __name__ == "__main__":
+    main()
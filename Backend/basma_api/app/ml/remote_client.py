@@ -0,0 +1,129 @@
+# app/ml/remote_client.py
+from __future__ import annotations
+
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+import httpx
+
+from app.ml.inference_executor import InferenceQueueFull
+from app.settings import AI_INFERENCE_REMOTE_TIMEOUT, AI_INFERENCE_RETRY_AFTER
+
+Prediction = Tuple[int, float, Dict[str, Any]]
+
+UDS_PREFIX = "unix://"
+
+
+def _transport_args(url: str) -> Tuple[str, Optional[str]]:
+    """``(base_url, uds_path)`` for ``http://host:port`` or ``unix:///path``."""
+    if url.startswith(UDS_PREFIX):
+        return "http://inference", url[len(UDS_PREFIX):]
+    return url.rstrip("/"), None
+
+
+class RemoteClassifier:
+    """
+    Stand-in for ``ReportClassifierService`` that forwards images to the
+    inference worker (``python -m app.ml.worker_server``).
+
+    ``classify_image`` detects it through ``remote = True`` and awaits
+    ``apredict`` directly: admission control and micro-batching then
+    happen in the worker, which answers 503 + Retry-After when it is full
+    (re-raised here as ``InferenceQueueFull``).
+    """
+
+    remote = True
+
+    def __init__(self, url: str, timeout: float = AI_INFERENCE_REMOTE_TIMEOUT) -> None:
+        self.url = url
+        self.timeout = float(timeout)
+        self.base_url, self.uds = _transport_args(url)
+        self.model_conf_threshold = 0.0
+        self.backend_name = "remote"
+        self._model_version: Optional[str] = None
+        self._client: Optional[httpx.AsyncClient] = None
+        self._lock = threading.Lock()
+
+    # -------------------------
+    # Worker metadata
+    # -------------------------
+
+    def _sync_client(self) -> httpx.Client:
+        transport = httpx.HTTPTransport(uds=self.uds) if self.uds else None
+        return httpx.Client(base_url=self.base_url, transport=transport, timeout=self.timeout)
+
+    def _apply_info(self, info: Dict[str, Any]) -> Dict[str, Any]:
+        self._model_version = str(info.get("model_version") or "unknown")
+        self.model_conf_threshold = float(info.get("model_conf_threshold") or 0.0)
+        return info
+
+    def refresh_info(self) -> Dict[str, Any]:
+        """Fetch model version/threshold from the worker (raises if unreachable)."""
+        with self._sync_client() as client:
+            resp = client.get("/info")
+            resp.raise_for_status()
+            return self._apply_info(resp.json())
+
+    @property
+    def model_version(self) -> str:
+        # Informational only (the API side does not cache remote answers).
+        # Never does I/O (it is read on the event loop): filled by
+        # warmup/refresh_info and by the X-Model-Version header of every
+        # /predict answer.
+        return self._model_version or "unknown"
+
+    def warmup(self, runs: int = 0, size: int = 640) -> None:
+        """The worker warms its own model; here we only check it is reachable."""
+        self.refresh_info()
+
+    # -------------------------
+    # Prediction
+    # -------------------------
+
+    def _async_client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    transport = httpx.AsyncHTTPTransport(uds=self.uds) if self.uds else None
+                    self._client = httpx.AsyncClient(
+                        base_url=self.base_url,
+                        transport=transport,
+                        timeout=self.timeout,
+                    )
+        return self._client
+
+    def _parse(self, resp: httpx.Response) -> Prediction:
+        if resp.status_code == 503:
+            try:
+                retry_after = int(resp.headers.get("Retry-After", ""))
+            except ValueError:
+                retry_after = AI_INFERENCE_RETRY_AFTER
+            raise InferenceQueueFull(retry_after)
+        resp.raise_for_status()
+        version = resp.headers.get("X-Model-Version")
+        if version:
+            self._model_version = version
+        data = resp.json()
+        return int(data["report_type_id"]), float(data["confidence"]), dict(data.get("info") or {})
+
+    async def apredict(self, image_bytes: bytes) -> Prediction:
+        resp = await self._async_client().post(
+            "/predict",
+            content=image_bytes,
+            headers={"Content-Type": "application/octet-stream"},
+        )
+        return self._parse(resp)
+
+    def predict(self, image_bytes: bytes) -> Prediction:
+        with self._sync_client() as client:
+            resp = client.post(
+                "/predict",
+                content=image_bytes,
+                headers={"Content-Type": "application/octet-stream"},
+            )
+            return self._parse(resp)
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
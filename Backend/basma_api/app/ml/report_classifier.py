@@ -1,11 +1,30 @@
 # app/ml/report_classifier.py
 from __future__ import annotations
 
-import io
-from typing import Tuple, Dict, Any, Optional, List
+import hashlib
+from typing import Tuple, Dict, Any, Optional, List, NamedTuple
 
+import numpy as np
 from PIL import Image
-import yolov5
+
+from app.metrics import timed
+from app.ml.backends import InferenceBackend, create_backend
+from app.ml.image_decode import decode_for_inference, decode_full, probe_size
+from app.ml.quantize import int8_path_for
+from app.ml.tiling import crop_tiles, merge_detections, tile_grid
+from app.settings import (
+    AI_DECODE_TARGET_SIZE,
+    AI_FAST_DECODE,
+    AI_INTER_OP_THREADS,
+    AI_INTRA_OP_THREADS,
+    AI_MODEL_BACKEND,
+    AI_MODEL_VARIANT,
+    AI_TILED_INFERENCE,
+    AI_TILE_MAX_SIDE,
+    AI_TILE_MIN_SIDE,
+    AI_TILE_OVERLAP,
+    AI_TILE_SIZE,
+)
 
 # ============================================================
 # ثابتات تعريف أنواع البلاغ كما هي في قاعدة البيانات
@@ -85,9 +104,32 @@ BASE_IMPACT_BIAS = 0.3
 GARBAGE_DOMINANCE_FACTOR = 1.5
 
 
+class DetectionArrays(NamedTuple):
+    """تنبؤات صورة واحدة كمصفوفات NumPy (عنصر لكل صندوق)."""
+
+    labels: List[str]
+    label_idx: np.ndarray
+    class_id: np.ndarray
+    confidence: np.ndarray
+    area_ratio: np.ndarray
+    impact_score: np.ndarray
+
+    @classmethod
+    def empty(cls) -> "DetectionArrays":
+        return cls(
+            [],
+            np.zeros(0, dtype=np.int64),
+            np.zeros(0, dtype=np.int64),
+            np.zeros(0),
+            np.zeros(0),
+            np.zeros(0),
+        )
+
+
 class ReportClassifierService:
     """
-    خدمة تصنيف البلاغات باستخدام نموذج YOLOv5 (ملف vp.pt) عبر حزمة yolov5.
+    خدمة تصنيف البلاغات باستخدام نموذج YOLOv5 (ملف vp.pt) عبر حزمة yolov5،
+    أو عبر نسخة ONNX من نفس النموذج على ONNX Runtime (انظر app/ml/backends.py).
 
     واجهة الاستخدام:
         predict(image_bytes: bytes) -> (report_type_id: int, confidence: float, info: dict)
@@ -104,19 +146,51 @@ class ReportClassifierService:
 
     OTHERS_CODE = "OTHERS"
 
-    def __init__(self, model_path: str, model_conf_threshold: float = 0.1) -> None:
+    def __init__(
+        self,
+        model_path: str,
+        model_conf_threshold: float = 0.1,
+        backend: Optional[str] = None,
+        variant: Optional[str] = None,
+        tiled: Optional[bool] = None,
+        intra_op_threads: Optional[int] = None,
+        inter_op_threads: Optional[int] = None,
+    ) -> None:
         """
-        :param model_path: مسار ملف YOLOv5 .pt (مثل app/models/vp.pt)
+        :param model_path: مسار ملف النموذج (YOLOv5 .pt مثل app/models/vp.pt، أو .onnx)
         :param model_conf_threshold: أقل قيمة ثقة يحتفظ بها YOLO لكل كائن مكتشف
+        :param backend: محرك الاستدلال ("yolov5" أو "onnx")، الافتراضي من AI_MODEL_BACKEND
+        :param variant: "fp32" (الأصلي) أو "int8" (نسخة مُكمّمة، انظر app/ml/quantize.py)،
+                        الافتراضي من AI_MODEL_VARIANT
+        :param tiled: تفعيل الاستدلال المُجزّأ (tiles) للصور الكبيرة، الافتراضي من AI_TILED_INFERENCE
+        :param intra_op_threads / inter_op_threads: عدد خيوط المعالجة للنموذج
+                        (0 = الافتراضي)، الافتراضي من AI_INTRA_OP_THREADS / AI_INTER_OP_THREADS
         """
-        # ✅ تحميل النموذج من ملف .pt باستخدام حزمة yolov5
-        self.model = yolov5.load(model_path)
-
-        # إعداد عتبة الثقة داخل النموذج (إن وُجدت الخاصية)
-        try:
-            self.model.conf = float(model_conf_threshold)
-        except Exception:
-            pass
+        self.variant = (variant or AI_MODEL_VARIANT).strip().lower()
+        self.backend_name = (backend or AI_MODEL_BACKEND).strip().lower()
+        if self.variant == "int8":
+            # النسخة المُكمّمة متاحة فقط كملف ONNX بجانب الأوزان الأصلية (vp.int8.onnx)
+            self.backend_name = "onnx"
+            model_path = int8_path_for(model_path)
+        elif self.variant != "fp32":
+            raise ValueError(f"unknown model variant: {self.variant!r}")
+
+        self.intra_op_threads = AI_INTRA_OP_THREADS if intra_op_threads is None else int(intra_op_threads)
+        self.inter_op_threads = AI_INTER_OP_THREADS if inter_op_threads is None else int(inter_op_threads)
+
+        # ✅ تحميل النموذج عبر المحرك المختار (yolov5 / ONNX Runtime)
+        self.backend: InferenceBackend = create_backend(
+            self.backend_name,
+            model_path,
+            float(model_conf_threshold),
+            intra_op_threads=self.intra_op_threads,
+            inter_op_threads=self.inter_op_threads,
+        )
+        self.model_path = model_path
+        self.tiled = AI_TILED_INFERENCE if tiled is None else bool(tiled)
+        # بصمة ملف الأوزان: تُستخدم كإصدار للنموذج (مثلاً في مفاتيح الكاش)؛
+        # وضع الـ tiles يغيّر النتائج لنفس الصورة لذلك يُضاف إلى الإصدار
+        self.model_version = self._file_digest(model_path) + ("-tiled" if self.tiled else "")
 
         self.model_conf_threshold = float(model_conf_threshold)
 
@@ -135,6 +209,17 @@ class ReportClassifierService:
     # Helpers
     # -------------------------
 
+    @staticmethod
+    def _file_digest(path: str, length: int = 12) -> str:
+        h = hashlib.sha256()
+        try:
+            with open(path, "rb") as fh:
+                for chunk in iter(lambda: fh.read(1024 * 1024), b""):
+                    h.update(chunk)
+        except OSError:
+            return "unknown"
+        return h.hexdigest()[:length]
+
     def _normalize_label_to_code(self, label: str) -> str:
         """
         نحاول تحويل اسم الكلاس القادم من YOLO إلى كود موحّد
@@ -149,90 +234,69 @@ class ReportClassifierService:
 
     def _extract_predictions(
         self,
-        results: Any,
+        det: Any,
+        names: Optional[Dict[int, str]],
         image_width: int,
         image_height: int,
-    ) -> List[Dict[str, Any]]:
+    ) -> DetectionArrays:
         """
-        تحويل مخرجات YOLOv5 إلى قائمة بسيطة من التنبؤات:
-
-        يمثل كل عنصر في القائمة:
-        {
-          "class": str,         # كود التصنيف الموحّد إن أمكن (مثل CONSTRUCTION_ROAD, GARBAGE, ...)
-          "raw_class": str,     # اسم الكلاس كما أخرجه YOLO مباشرةً
-          "class_id": int,
-          "confidence": float,
-          "area_ratio": float,
-          "impact_score": float
-        }
+        تحويل مخرجات النموذج (مصفوفة (N,6): [x1, y1, x2, y2, conf, cls])
+        إلى مصفوفات NumPy (بدون إنشاء dict لكل صندوق):
+
+          - labels: قائمة أكواد التصنيف الموحّدة بترتيب أول ظهور
+                    (مثل CONSTRUCTION_ROAD, GARBAGE, ...)
+          - label_idx: رقم الكود (داخل labels) لكل صندوق
+          - class_id: رقم الكلاس داخل النموذج لكل صندوق
+          - confidence / area_ratio / impact_score: لكل صندوق
         """
-        predictions: List[Dict[str, Any]] = []
-        if results is None:
-            return predictions
+        arr = np.asarray(det if det is not None else (), dtype=np.float64)
+        if arr.ndim != 2 or arr.shape[0] == 0 or arr.shape[1] < 6:
+            return DetectionArrays.empty()
 
-        try:
-            # النتائج كـ Tensor (N,6): [x1, y1, x2, y2, conf, cls]
-            det = results.xyxy[0]
-        except Exception:
-            return predictions
+        arr = arr[arr[:, 4] >= 1e-3]
+        if arr.shape[0] == 0:
+            return DetectionArrays.empty()
 
-        if det is None or len(det) == 0:
-            return predictions
+        conf = arr[:, 4]
+        class_id = arr[:, 5].astype(np.int64)
 
         image_area = float(max(1, image_width * image_height))
-        names = getattr(results, "names", None)
-
-        for row in det.tolist():
-            if len(row) < 6:
-                continue
-
-            x1, y1, x2, y2, conf, cls_idx = row
-            conf = float(conf)
-            cls_idx = int(cls_idx)
-
-            if conf < 1e-3:
-                continue
-
-            w = max(0.0, x2 - x1)
-            h = max(0.0, y2 - y1)
-            box_area = max(0.0, w * h)
-            area_ratio = 0.0
-            if image_area > 0:
-                area_ratio = max(0.0, min(1.0, box_area / image_area))
-
-            # اسم الكلاس كما هو في النموذج
+        w = np.maximum(0.0, arr[:, 2] - arr[:, 0])
+        h = np.maximum(0.0, arr[:, 3] - arr[:, 1])
+        box_area = np.maximum(0.0, w * h)
+        area_ratio = np.clip(box_area / image_area, 0.0, 1.0)
+
+        # اسم الكلاس → كود موحّد (مرة واحدة لكل كلاس وليس لكل صندوق)
+        unique_ids, first_pos, inverse = np.unique(
+            class_id, return_index=True, return_inverse=True
+        )
+        labels: List[str] = []
+        label_pos: Dict[str, int] = {}
+        id_to_label = np.empty(len(unique_ids), dtype=np.int64)
+        for k in np.argsort(first_pos, kind="stable"):
+            cls_idx = int(unique_ids[k])
             if isinstance(names, dict) and cls_idx in names:
                 raw_label = str(names[cls_idx])
             else:
                 raw_label = str(cls_idx)
+            code = self._normalize_label_to_code(raw_label)
+            if code not in label_pos:
+                label_pos[code] = len(labels)
+                labels.append(code)
+            id_to_label[k] = label_pos[code]
+        label_idx = id_to_label[inverse.reshape(-1)]
 
-            # تحويل الاسم الخام إلى كود تصنيف موحّد إن أمكن
-            label_code = self._normalize_label_to_code(raw_label)
+        # حساب impact_score مع تقليل تأثير الحجم لفئة القمامة
+        area_weight = np.full(len(labels), DEFAULT_AREA_WEIGHT)
+        if GARBAGE_CLASS_CODE in label_pos:
+            area_weight[label_pos[GARBAGE_CLASS_CODE]] = GARBAGE_AREA_WEIGHT
+        impact = conf * (BASE_IMPACT_BIAS + area_weight[label_idx] * area_ratio)
 
-            # حساب impact_score مع تقليل تأثير الحجم لفئة القمامة
-            if label_code == GARBAGE_CLASS_CODE:
-                area_weight = GARBAGE_AREA_WEIGHT
-            else:
-                area_weight = DEFAULT_AREA_WEIGHT
-
-            impact_score = conf * (BASE_IMPACT_BIAS + area_weight * area_ratio)
-
-            predictions.append(
-                {
-                    "class": label_code,
-                    "raw_class": raw_label,
-                    "class_id": cls_idx,
-                    "confidence": conf,
-                    "area_ratio": area_ratio,
-                    "impact_score": impact_score,
-                }
-            )
-
-        return predictions
+        return DetectionArrays(labels, label_idx, class_id, conf, area_ratio, impact)
 
     @staticmethod
     def _aggregate_predictions(
-        predictions: List[Dict[str, Any]],
+        predictions: DetectionArrays,
     ) -> Tuple[str, float, Optional[int]]:
         """
         اختيار النوع "الأكثر تأثيراً" (Dominant Type) من بين التنبؤات.
@@ -247,124 +311,141 @@ class ReportClassifierService:
                  → نختار القمامة.
         - إذا لم توجد إلا فئة واحدة (سواء كانت القمامة أو غيرها):
             → نختار هذه الفئة بشكل طبيعي بناءً على قيمة التأثير.
+
+        الإحصائيات لكل كلاس تُحسب بعمليات NumPy على كل الصناديق مرة واحدة؛
+        عند التساوي تفوز الفئة الأسبق ظهوراً.
         """
-        if not predictions:
+        labels = predictions.labels
+        # الأكواد الفارغة لا تُحتسب
+        valid = np.array([bool(lbl) for lbl in labels], dtype=bool)
+        if not valid.any():
             return "OTHERS", 0.0, None
 
-        stats: Dict[str, Dict[str, Any]] = {}
+        n_labels = len(labels)
+        label_idx = predictions.label_idx
 
         # تجميع الإحصائيات لكل كلاس متوقع
-        for p in predictions:
-            label = p.get("class")
-            if not label:
-                continue
-
-            conf = float(p.get("confidence", 0.0))
-            impact = float(p.get("impact_score", 0.0))
-            model_class_id = p.get("class_id")
-
-            if label not in stats:
-                stats[label] = {
-                    "count": 0,
-                    "best_conf": 0.0,
-                    "best_class_id": None,
-                    "total_impact": 0.0,
-                }
-
-            s = stats[label]
-            s["count"] += 1
-            s["total_impact"] += impact
-            if conf > s["best_conf"]:
-                s["best_conf"] = conf
-                s["best_class_id"] = model_class_id
-
-        if not stats:
-            return "OTHERS", 0.0, None
+        count = np.bincount(label_idx, minlength=n_labels)
+        total_impact = np.bincount(
+            label_idx, weights=predictions.impact_score, minlength=n_labels
+        )
+        # أعلى ثقة لكل كلاس (وأول صندوق وصل إليها) → best_conf / best_class_id
+        order = np.lexsort(
+            (np.arange(len(label_idx)), -predictions.confidence, label_idx)
+        )
+        sorted_labels = label_idx[order]
+        group_start = np.flatnonzero(
+            np.r_[True, sorted_labels[1:] != sorted_labels[:-1]]
+        )
+        best_box = np.full(n_labels, -1, dtype=np.int64)
+        best_box[sorted_labels[group_start]] = order[group_start]
+
+        def pick(candidates: np.ndarray) -> int:
+            # الأعلى حسب (total_impact, best_conf, count) والأسبق عند التساوي
+            best_conf = predictions.confidence[best_box[candidates]]
+            ranked = np.lexsort(
+                (-candidates, count[candidates], best_conf, total_impact[candidates])
+            )
+            return int(candidates[ranked[-1]])
+
+        def answer(pos: int) -> Tuple[str, float, Optional[int]]:
+            box = best_box[pos]
+            return (
+                labels[pos],
+                float(predictions.confidence[box]),
+                int(predictions.class_id[box]),
+            )
 
-        has_garbage = GARBAGE_CLASS_CODE in stats
-        non_garbage_labels = [lbl for lbl in stats.keys() if lbl != GARBAGE_CLASS_CODE]
+        present = np.flatnonzero(valid & (count > 0))
+        garbage_pos = labels.index(GARBAGE_CLASS_CODE) if GARBAGE_CLASS_CODE in labels else -1
+        non_garbage = present[present != garbage_pos]
 
         # ✅ حالة وجود القمامة + فئات أخرى
-        if has_garbage and non_garbage_labels:
+        if garbage_pos in present and non_garbage.size:
             # 1) قاعدة خاصة: إذا كانت FADED_SIGNAGE موجودة مع GARBAGE → اختر FADED_SIGNAGE فوراً
-            if FADED_SIGNAGE_CLASS_CODE in stats:
-                chosen_stats = stats[FADED_SIGNAGE_CLASS_CODE]
-                return (
-                    FADED_SIGNAGE_CLASS_CODE,
-                    float(chosen_stats["best_conf"]),
-                    chosen_stats["best_class_id"],
-                )
+            if FADED_SIGNAGE_CLASS_CODE in labels:
+                faded_pos = labels.index(FADED_SIGNAGE_CLASS_CODE)
+                if faded_pos in present:
+                    return answer(faded_pos)
 
             # 2) اختيار أفضل فئة غير القمامة حسب التأثير الكلي
-            best_label: Optional[str] = None
-            best_tuple = (-1.0, -1.0, -1)  # (total_impact, best_conf, count)
-
-            for label in non_garbage_labels:
-                s = stats[label]
-                candidate = (s["total_impact"], s["best_conf"], s["count"])
-                if candidate > best_tuple:
-                    best_tuple = candidate
-                    best_label = label
-
-            if best_label is None:
-                # احتياطاً لو حدث شيء غير متوقع
-                best_label = GARBAGE_CLASS_CODE
+            best_pos = pick(non_garbage)
 
             # مقارنة تأثير القمامة بأفضل فئة أخرى
-            garbage_impact = stats[GARBAGE_CLASS_CODE]["total_impact"]
-            best_non_impact = stats.get(best_label, {}).get("total_impact", 0.0)
-
-            if garbage_impact > GARBAGE_DOMINANCE_FACTOR * best_non_impact:
+            if total_impact[garbage_pos] > GARBAGE_DOMINANCE_FACTOR * total_impact[best_pos]:
                 # إذا كان تأثير القمامة أعلى بكثير → نختار القمامة
-                best_label = GARBAGE_CLASS_CODE
+                best_pos = garbage_pos
 
-            chosen_stats = stats[best_label]
-            return (
-                best_label,
-                float(chosen_stats["best_conf"]),
-                chosen_stats["best_class_id"],
-            )
+            return answer(best_pos)
 
         # ⬅️ لا توجد إلا فئة واحدة (أو لا يوجد GARBAGE + فئات أخرى)
-        best_label: Optional[str] = None
-        best_tuple = (-1.0, -1.0, -1)
+        return answer(pick(present))
 
-        for label, s in stats.items():
-            candidate = (s["total_impact"], s["best_conf"], s["count"])
-            if candidate > best_tuple:
-                best_tuple = candidate
-                best_label = label
-
-        if best_label is None:
-            return "OTHERS", 0.0, None
-
-        best_conf = float(stats[best_label]["best_conf"])
-        best_class_id = stats[best_label]["best_class_id"]
-        return best_label, best_conf, best_class_id
-
-    # -------------------------
-    # Public API
-    # -------------------------
+    def _wants_tiles(self, image_bytes: bytes) -> bool:
+        """الصور الكبيرة فقط (الضلع الأطول >= AI_TILE_MIN_SIDE) تمر بوضع الـ tiles."""
+        if not self.tiled:
+            return False
+        try:
+            return max(probe_size(image_bytes)) >= AI_TILE_MIN_SIDE
+        except Exception:
+            return False
 
-    def predict(self, image_bytes: bytes) -> Tuple[int, float, Dict[str, Any]]:
+    def _load_image(self, image_bytes: bytes) -> Tuple[Image.Image, bool]:
         """
-        تصنيف صورة واحدة باستخدام نموذج YOLOv5 (vp.pt).
-
-        يعيد:
-          - report_type_id: رقم نوع التشوه البصري (من 1 إلى 11)
-          - confidence: أعلى درجة ثقة للتصنيف النهائي
-          - info: يحتوي على التفاصيل (code, name_ar, name_en, model_class_id)
+        فك ترميز الصورة قبل الاستدلال، ويعيد (الصورة، هل تمر بوضع الـ tiles).
+        المسار السريع يفك JPEG مباشرة إلى ~640 بكسل (draft mode) ويطبّق اتجاه EXIF،
+        لأن YOLO سيصغّر الصورة إلى 640 على أي حال.
+        في وضع الـ tiles تُفك الصور الكبيرة بدقة أعلى (حتى AI_TILE_MAX_SIDE).
         """
-        image = Image.open(io.BytesIO(image_bytes))
-        if image.mode != "RGB":
-            image = image.convert("RGB")
-
-        width, height = image.size
+        if self._wants_tiles(image_bytes):
+            image, _original_size = decode_for_inference(image_bytes, AI_TILE_MAX_SIDE)
+            return image, True
+        if AI_FAST_DECODE:
+            image, _original_size = decode_for_inference(image_bytes, AI_DECODE_TARGET_SIZE)
+            return image, False
+        return decode_full(image_bytes), False
+
+    def _infer(
+        self,
+        images: List[Image.Image],
+        tiles: Optional[List[bool]] = None,
+    ) -> List[np.ndarray]:
+        """
+        استدلال على عدة صور في استدعاء واحد للنموذج.
 
-        # استدلال YOLOv5 – بحسب الإعدادات (حجم الإدخال 640)
-        results = self.model(image, size=640)
+        الصور المعلَّمة في ``tiles`` (حسب _wants_tiles، كما يعيدها _load_image)
+        والأكبر من حجم الـ tile تُقسّم إلى نوافذ متداخلة
+        بحجم AI_TILE_SIZE تُرسل مع الصورة الكاملة في نفس الدفعة،
+        ثم تُدمج الصناديق بـ NMS عبر الـ tiles (حسب الكلاس).
+        """
+        tiles = tiles or [False] * len(images)
+        inputs: List[Image.Image] = []
+        plans: List[Tuple[int, List[Tuple[int, int, int, int]]]] = []
+        for image, tiled in zip(images, tiles):
+            grid: List[Tuple[int, int, int, int]] = []
+            if tiled and max(image.size) > AI_TILE_SIZE:
+                grid = tile_grid(image.width, image.height, AI_TILE_SIZE, AI_TILE_OVERLAP)
+            plans.append((len(inputs), grid))
+            inputs.append(image)
+            inputs.extend(crop_tiles(image, grid))
+
+        with timed("forward"):
+            raw = self.backend.infer(inputs, size=640)
+
+        detections: List[np.ndarray] = []
+        for start, grid in plans:
+            if grid:
+                with timed("tile_merge"):
+                    det = merge_detections(raw[start], raw[start + 1:start + 1 + len(grid)], grid)
+            else:
+                det = raw[start]
+            detections.append(det)
+        return detections
 
-        raw_predictions = self._extract_predictions(results, width, height)
+    def _build_result(
+        self,
+        raw_predictions: DetectionArrays,
+    ) -> Tuple[int, float, Dict[str, Any]]:
         class_code, confidence, model_class_id = self._aggregate_predictions(
             raw_predictions
         )
@@ -386,3 +467,61 @@ class ReportClassifierService:
         }
 
         return report_type_id, float(confidence), info
+
+    # -------------------------
+    # Public API
+    # -------------------------
+
+    def warmup(self, runs: int = 2, size: int = 640) -> None:
+        """
+        تشغيل عدة استدلالات وهمية (صورة رمادية) لتسخين النموذج
+        قبل وصول أول طلب حقيقي (تهيئة الذاكرة والـ kernels).
+        """
+        dummy = Image.new("RGB", (size, size * 3 // 4), (114, 114, 114))
+        for _ in range(max(0, runs)):
+            self.backend.infer([dummy], size=size)
+
+    def predict(self, image_bytes: bytes) -> Tuple[int, float, Dict[str, Any]]:
+        """
+        تصنيف صورة واحدة باستخدام نموذج YOLOv5 (vp.pt).
+
+        يعيد:
+          - report_type_id: رقم نوع التشوه البصري (من 1 إلى 11)
+          - confidence: أعلى درجة ثقة للتصنيف النهائي
+          - info: يحتوي على التفاصيل (code, name_ar, name_en, model_class_id)
+        """
+        with timed("decode"):
+            image, tiled = self._load_image(image_bytes)
+        width, height = image.size
+
+        # استدلال YOLOv5 – بحسب الإعدادات (حجم الإدخال 640، أو tiles للصور الكبيرة)
+        det = self._infer([image], [tiled])[0]
+
+        with timed("postprocess"):
+            raw_predictions = self._extract_predictions(det, self.backend.names, width, height)
+            return self._build_result(raw_predictions)
+
+    def predict_batch(
+        self,
+        images_bytes: List[bytes],
+    ) -> List[Tuple[int, float, Dict[str, Any]]]:
+        """
+        تصنيف عدة صور في استدعاء واحد للنموذج (YOLOv5 batch).
+
+        النتائج بنفس ترتيب الصور المُدخلة، وكل عنصر مطابق لما يعيده predict().
+        أي خطأ في فك إحدى الصور يُفشل الدفعة كاملة (المُجمِّع يعيد المحاولة فردياً).
+        """
+        if not images_bytes:
+            return []
+
+        with timed("decode"):
+            images, tiles = map(list, zip(*(self._load_image(b) for b in images_bytes)))
+        detections = self._infer(images, tiles)
+
+        answers: List[Tuple[int, float, Dict[str, Any]]] = []
+        with timed("postprocess"):
+            for image, det in zip(images, detections):
+                width, height = image.size
+                raw_predictions = self._extract_predictions(det, self.backend.names, width, height)
+                answers.append(self._build_result(raw_predictions))
+        return answers
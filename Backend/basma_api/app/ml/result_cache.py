@@ -0,0 +1,186 @@
+# app/ml/result_cache.py
+from __future__ import annotations
+
+import copy
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from app.settings import (
+    AI_RESULT_CACHE_PATH,
+    AI_RESULT_CACHE_SIZE,
+    AI_RESULT_CACHE_TTL,
+)
+from app.sqlite_store import SQLiteStore
+
+Prediction = Tuple[int, float, Dict[str, Any]]
+
+SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS predictions ("
+    " key TEXT PRIMARY KEY,"
+    " report_type_id INTEGER NOT NULL,"
+    " confidence REAL NOT NULL,"
+    " info TEXT NOT NULL,"
+    " created_at REAL NOT NULL)",
+)
+
+
+def make_cache_key(
+    image_bytes: bytes,
+    model_version: str,
+    model_conf_threshold: float,
+    confidence_threshold: float,
+) -> str:
+    """
+    SHA-256 of the image bytes, salted with everything that can change the
+    answer for the same bytes (model weights and both thresholds).
+    """
+    digest = hashlib.sha256(image_bytes).hexdigest()
+    return f"{digest}:{model_version}:{model_conf_threshold:.4f}:{confidence_threshold:.4f}"
+
+
+class PredictionCache:
+    """
+    Bounded LRU of ``(report_type_id, confidence, info)`` by content hash.
+
+    - ``max_entries`` and ``ttl_seconds`` bound the in-memory part, which is
+      read and written directly on the caller's thread.
+    - When ``path`` is set, entries are also written to a local SQLite file
+      so they survive restarts and are shared by every worker on the host.
+      That tier lives on an ``SQLiteStore`` thread: memory misses await a
+      disk read there, and ``put`` only queues the write.
+      Disk errors are swallowed: the cache must never fail a request.
+    - Callers get their own copy of ``info``, never the cached dict.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = AI_RESULT_CACHE_SIZE,
+        ttl_seconds: float = AI_RESULT_CACHE_TTL,
+        path: Optional[str] = AI_RESULT_CACHE_PATH,
+    ) -> None:
+        self.max_entries = max(0, int(max_entries))
+        self.ttl = max(0.0, float(ttl_seconds))
+        self.path = path or None
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, Tuple[float, Prediction]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk = SQLiteStore(self.path, name="prediction-cache", schema=SCHEMA) if self.path else None
+
+    # -------------------------
+    # SQLite backing store (runs on the store thread)
+    # -------------------------
+
+    def _disk_get(self, conn: sqlite3.Connection, key: str, now: float) -> Optional[Prediction]:
+        row = conn.execute(
+            "SELECT report_type_id, confidence, info, created_at FROM predictions WHERE key = ?",
+            (key,),
+        ).fetchone()
+        if row is None:
+            return None
+        report_type_id, confidence, info, created_at = row
+        if self.ttl and now - created_at > self.ttl:
+            return None
+        return int(report_type_id), float(confidence), json.loads(info)
+
+    def _disk_put(self, conn: sqlite3.Connection, key: str, value: Prediction, now: float) -> None:
+        report_type_id, confidence, info = value
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO predictions "
+                "(key, report_type_id, confidence, info, created_at) VALUES (?, ?, ?, ?, ?)",
+                (key, report_type_id, confidence, json.dumps(info, ensure_ascii=False), now),
+            )
+            if self.ttl:
+                conn.execute("DELETE FROM predictions WHERE created_at < ?", (now - self.ttl,))
+
+    # -------------------------
+    # Public API
+    # -------------------------
+
+    async def get(self, key: str) -> Optional[Prediction]:
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                created_at, value = entry
+                if not self.ttl or now - created_at <= self.ttl:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return _copy(value)
+                del self._entries[key]
+
+        value: Optional[Prediction] = None
+        if self._disk is not None:
+            try:
+                value = await self._disk.run(self._disk_get, key, now)
+            except sqlite3.Error:
+                value = None
+        with self._lock:
+            if value is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.disk_hits += 1
+            self._store(key, value, now)
+        return _copy(value)
+
+    def put(self, key: str, value: Prediction) -> None:
+        """Store in memory now; the disk write is queued, not awaited."""
+        now = time.time()
+        value = _copy(value)
+        with self._lock:
+            self._store(key, value, now)
+        if self._disk is not None:
+            self._disk.submit(self._disk_put, key, value, now)
+
+    def _store(self, key: str, value: Prediction, now: float) -> None:
+        if not self.max_entries:
+            return
+        self._entries[key] = (now, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            stats = {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl,
+                "persistent": bool(self.path),
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": (self.hits / lookups) if lookups else 0.0,
+            }
+        if self._disk is not None:
+            stats["disk"] = self._disk.stats()
+        return stats
+
+
+def _copy(value: Prediction) -> Prediction:
+    report_type_id, confidence, info = value
+    return report_type_id, confidence, copy.deepcopy(info)
+
+
+# Singleton instance (per API worker; the SQLite file is shared on the host)
+_cache: Optional[PredictionCache] = None
+
+
+def get_prediction_cache() -> PredictionCache:
+    global _cache
+    if _cache is None:
+        _cache = PredictionCache()
+    return _cache
@@ -0,0 +1,53 @@
+# app/ml/threads.py
+from __future__ import annotations
+
+import logging
+import os
+import sys
+from typing import Any, Dict
+
+logger = logging.getLogger("basma.ml")
+
+
+def apply_torch_threads(intra_op: int = 0, inter_op: int = 0) -> Dict[str, Any]:
+    """
+    Set torch's process-wide thread pools (0 leaves the default).
+
+    The inter-op pool can only be sized before torch runs any parallel
+    work; later attempts are ignored and reported in the returned dict.
+    Imports torch only if it is already loaded or a value is requested.
+    """
+    applied: Dict[str, Any] = {}
+    if not intra_op and not inter_op:
+        return applied
+    if intra_op:
+        os.environ["OMP_NUM_THREADS"] = str(intra_op)
+    torch = sys.modules.get("torch")
+    if torch is None:
+        try:
+            import torch  # type: ignore[no-redef]
+        except ImportError:
+            return applied
+    if intra_op:
+        torch.set_num_threads(int(intra_op))
+        applied["intra_op"] = torch.get_num_threads()
+    if inter_op:
+        try:
+            torch.set_num_interop_threads(int(inter_op))
+        except RuntimeError as exc:
+            logger.warning("torch inter-op threads already fixed: %s", exc)
+        applied["inter_op"] = torch.get_num_interop_threads()
+    return applied
+
+
+def configure_ort_session(options: Any, intra_op: int = 0, inter_op: int = 0) -> None:
+    """Size an ``onnxruntime.SessionOptions``' thread pools (0 leaves the default)."""
+    if intra_op:
+        options.intra_op_num_threads = int(intra_op)
+    if inter_op:
+        options.inter_op_num_threads = int(inter_op)
+        if inter_op > 1:
+            # the inter-op pool is only used in parallel execution mode
+            import onnxruntime as ort
+
+            options.execution_mode = ort.ExecutionMode.ORT_PARALLEL
@@ -0,0 +1,67 @@
+# app/ml/tiling.py
+from __future__ import annotations
+
+from typing import List, Sequence, Tuple
+
+import numpy as np
+from PIL import Image
+
+from app.ml.backends import DEFAULT_IOU_THRESHOLD, DEFAULT_MAX_DET, MAX_WH, nms
+
+Box = Tuple[int, int, int, int]
+
+
+def _starts(length: int, tile: int, step: int) -> List[int]:
+    if length <= tile:
+        return [0]
+    starts = list(range(0, length - tile, step))
+    # last tile is aligned to the edge instead of running past it
+    starts.append(length - tile)
+    return starts
+
+
+def tile_grid(width: int, height: int, tile: int = 640, overlap: float = 0.2) -> List[Box]:
+    """
+    Overlapping ``tile x tile`` windows ``(x0, y0, x1, y1)`` covering the
+    image. Neighbouring tiles share at least ``overlap`` of their side, so a
+    defect cut by one tile edge is whole in the next tile.
+    """
+    tile = max(1, int(tile))
+    step = max(1, int(round(tile * (1.0 - min(max(overlap, 0.0), 0.9)))))
+    boxes: List[Box] = []
+    for y0 in _starts(height, tile, step):
+        for x0 in _starts(width, tile, step):
+            boxes.append((x0, y0, min(x0 + tile, width), min(y0 + tile, height)))
+    return boxes
+
+
+def crop_tiles(image: Image.Image, boxes: Sequence[Box]) -> List[Image.Image]:
+    return [image.crop(box) for box in boxes]
+
+
+def merge_detections(
+    full_det: np.ndarray,
+    tile_dets: Sequence[np.ndarray],
+    boxes: Sequence[Box],
+    iou_threshold: float = DEFAULT_IOU_THRESHOLD,
+    max_det: int = DEFAULT_MAX_DET,
+) -> np.ndarray:
+    """
+    Shift tile detections into full-image coordinates, add the full-image
+    pass and run class-aware NMS across all of them, so a defect seen by
+    several overlapping tiles (and the full pass) is kept once.
+    """
+    parts = [np.asarray(full_det, dtype=np.float64).reshape(-1, 6)]
+    for det, (x0, y0, _x1, _y1) in zip(tile_dets, boxes):
+        det = np.asarray(det, dtype=np.float64).reshape(-1, 6)
+        if det.shape[0]:
+            det = det.copy()
+            det[:, [0, 2]] += x0
+            det[:, [1, 3]] += y0
+            parts.append(det)
+    merged = np.concatenate(parts)
+    if merged.shape[0] == 0:
+        return merged
+    offsets = merged[:, 5:6] * MAX_WH
+    keep = nms(merged[:, :4] + offsets, merged[:, 4], iou_threshold)[:max_det]
+    return merged[keep]
@@ -0,0 +1,266 @@
+# app/ml/training_export.py
+"""
+Export ``ml_training_queue`` rows as a YOLO dataset, incrementally.
+
+    python -m app.ml.training_export                      # drain the backlog once
+    python -m app.ml.training_export --follow --interval 30
+    python -m app.ml.training_export --out exports/yolo --batch-size 500
+
+Layout written under ``--out``:
+
+    images/{train,val}/<queue id>_<report id>.<ext>
+    labels/{train,val}/<queue id>_<report id>.txt
+    data.yaml          class names in REPORT_TYPE_META id order
+    checkpoint.json    progress counters, rewritten after every batch
+
+Rows are claimed in batches with ``SELECT ... FOR UPDATE SKIP LOCKED``, so
+several exporters can run side by side; each batch is committed (rows set
+to processed = 1, or 2 when the image is missing from local static storage)
+right after its files are written. The database flag is the source of
+truth for resuming: a crash before the commit only means the batch is
+claimed again and its files are rewritten under the same names.
+
+A row whose copy fails (disk full, permission denied, ...) stays pending
+and is retried; attempts are counted in the checkpoint and after
+``--max-attempts`` the row is set to processed = 3. A batch in which
+nothing could be copied is followed by a ``--retry-delay`` pause instead
+of being claimed again straight away.
+
+The queue only carries an image-level label (``report_type_id``), so each
+image gets one full-frame box of class ``report_type_id - 1``; refine the
+boxes in an annotation tool before training a detector on them.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import os
+import shutil
+import time
+import zlib
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app import models
+from app.db import SessionLocal
+from app.ml.report_classifier import REPORT_TYPE_META
+from app.settings import (
+    AI_TRAINING_BATCH_SIZE,
+    AI_TRAINING_EXPORT_DIR,
+    AI_TRAINING_MAX_ATTEMPTS,
+    AI_TRAINING_VAL_RATIO,
+)
+from app.utils import local_static_path
+
+logger = logging.getLogger("basma.training_export")
+
+PENDING = 0
+PROCESSED = 1
+SKIPPED = 2
+FAILED = 3
+
+# report_types.id (1..11) -> YOLO class index (0..10)
+CLASS_NAMES: Dict[int, str] = {
+    meta["id"] - 1: code for code, meta in sorted(REPORT_TYPE_META.items(), key=lambda kv: kv[1]["id"])
+}
+FULL_FRAME_BOX = "0.5 0.5 1.0 1.0"
+
+
+class TrainingExporter:
+    def __init__(
+        self,
+        out_dir: str = AI_TRAINING_EXPORT_DIR,
+        batch_size: int = AI_TRAINING_BATCH_SIZE,
+        val_ratio: float = AI_TRAINING_VAL_RATIO,
+        max_attempts: int = AI_TRAINING_MAX_ATTEMPTS,
+        retry_delay: float = 5.0,
+    ) -> None:
+        self.out = Path(out_dir)
+        self.batch_size = max(1, int(batch_size))
+        self.val_ratio = float(val_ratio)
+        self.max_attempts = max(1, int(max_attempts))
+        self.retry_delay = max(0.0, float(retry_delay))
+        self.checkpoint_path = self.out / "checkpoint.json"
+        self.state = self._load_checkpoint()
+
+    # -------------------------
+    # Checkpoint / dataset files
+    # -------------------------
+
+    def _load_checkpoint(self) -> dict:
+        try:
+            with open(self.checkpoint_path, encoding="utf-8") as fh:
+                state = json.load(fh)
+        except (OSError, ValueError):
+            state = {}
+        state.setdefault("last_id", 0)
+        state.setdefault("exported", 0)
+        state.setdefault("skipped", 0)
+        state.setdefault("failed", 0)
+        # queue id -> failed copy attempts so far (only rows still pending)
+        state.setdefault("attempts", {})
+        state.setdefault("batches", 0)
+        state.setdefault("per_class", {})
+        return state
+
+    def _save_checkpoint(self) -> None:
+        self.state["updated_at"] = time.time()
+        tmp = self.checkpoint_path.with_suffix(".json.tmp")
+        with open(tmp, "w", encoding="utf-8") as fh:
+            json.dump(self.state, fh, indent=2)
+        os.replace(tmp, self.checkpoint_path)
+
+    def _write_data_yaml(self) -> None:
+        lines = [
+            f"path: {self.out.resolve()}",
+            "train: images/train",
+            "val: images/val",
+            f"nc: {len(CLASS_NAMES)}",
+            "names:",
+        ]
+        lines += [f"  {idx}: {name}" for idx, name in sorted(CLASS_NAMES.items())]
+        tmp = self.out / "data.yaml.tmp"
+        tmp.write_text("\n".join(lines) + "\n", encoding="utf-8")
+        os.replace(tmp, self.out / "data.yaml")
+
+    def _prepare_dirs(self) -> None:
+        for kind in ("images", "labels"):
+            for split in ("train", "val"):
+                (self.out / kind / split).mkdir(parents=True, exist_ok=True)
+
+    def _split_for(self, row_id: int) -> str:
+        # stable across runs and exporters: depends only on the queue id
+        bucket = zlib.crc32(str(row_id).encode()) % 10000
+        return "val" if bucket < self.val_ratio * 10000 else "train"
+
+    # -------------------------
+    # Export
+    # -------------------------
+
+    def _export_row(self, row: models.MLTrainingQueue) -> bool:
+        class_idx = int(row.report_type_id) - 1
+        source = local_static_path(row.image_url)
+        if source is None or class_idx not in CLASS_NAMES:
+            return False
+        split = self._split_for(int(row.id))
+        stem = f"{row.id}_{row.report_id}"
+        suffix = source.suffix.lower() or ".jpg"
+        shutil.copyfile(source, self.out / "images" / split / f"{stem}{suffix}")
+        (self.out / "labels" / split / f"{stem}.txt").write_text(
+            f"{class_idx} {FULL_FRAME_BOX}\n", encoding="utf-8"
+        )
+        return True
+
+    def _claim(self, db: Session) -> List[models.MLTrainingQueue]:
+        return (
+            db.query(models.MLTrainingQueue)
+            .filter(models.MLTrainingQueue.processed == PENDING)
+            .order_by(models.MLTrainingQueue.id)
+            .limit(self.batch_size)
+            .with_for_update(skip_locked=True)
+            .all()
+        )
+
+    def run_batch(self) -> Tuple[int, int]:
+        """
+        Claim, export and mark one batch; returns ``(claimed, settled)``:
+        rows claimed, and rows that left the pending state (the rest hit a
+        copy error and will be retried).
+        """
+        db = SessionLocal()
+        attempts: Dict[str, int] = self.state["attempts"]
+        try:
+            rows = self._claim(db)
+            if not rows:
+                db.rollback()
+                return 0, 0
+            exported = skipped = failed = 0
+            for row in rows:
+                key = str(row.id)
+                try:
+                    ok = self._export_row(row)
+                except OSError as e:
+                    attempts[key] = attempts.get(key, 0) + 1
+                    if attempts[key] < self.max_attempts:
+                        logger.warning(
+                            "Queue row %s: copy failed (%s), attempt %s/%s",
+                            row.id, e, attempts[key], self.max_attempts,
+                        )
+                        continue
+                    logger.error("Queue row %s: copy failed %s times (%s), giving up", row.id, attempts[key], e)
+                    attempts.pop(key)
+                    row.processed = FAILED
+                    failed += 1
+                    continue
+                attempts.pop(key, None)
+                row.processed = PROCESSED if ok else SKIPPED
+                if ok:
+                    exported += 1
+                    name = CLASS_NAMES[int(row.report_type_id) - 1]
+                    self.state["per_class"][name] = self.state["per_class"].get(name, 0) + 1
+                else:
+                    skipped += 1
+                self.state["last_id"] = max(self.state["last_id"], int(row.id))
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+        self.state["exported"] += exported
+        self.state["skipped"] += skipped
+        self.state["failed"] += failed
+        self.state["batches"] += 1
+        self._save_checkpoint()
+        logger.info(
+            "Batch of %s rows: %s exported, %s skipped, %s failed",
+            len(rows), exported, skipped, failed,
+        )
+        return len(rows), exported + skipped + failed
+
+    def run(self, follow: bool = False, interval: float = 30.0, max_batches: Optional[int] = None) -> dict:
+        self._prepare_dirs()
+        self._write_data_yaml()
+        batches = 0
+        while max_batches is None or batches < max_batches:
+            claimed, settled = self.run_batch()
+            batches += 1 if claimed else 0
+            if claimed:
+                if not settled:
+                    # every copy failed (e.g. disk full): back off before retrying
+                    time.sleep(self.retry_delay)
+                continue
+            if not follow:
+                break
+            time.sleep(interval)
+        return self.state
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Export ml_training_queue as a YOLO dataset")
+    parser.add_argument("--out", default=AI_TRAINING_EXPORT_DIR)
+    parser.add_argument("--batch-size", type=int, default=AI_TRAINING_BATCH_SIZE)
+    parser.add_argument("--val-ratio", type=float, default=AI_TRAINING_VAL_RATIO)
+    parser.add_argument("--follow", action="store_true", help="keep polling for new rows")
+    parser.add_argument("--interval", type=float, default=30.0, help="seconds between polls with --follow")
+    parser.add_argument("--max-batches", type=int, default=None)
+    parser.add_argument("--max-attempts", type=int, default=AI_TRAINING_MAX_ATTEMPTS)
+    parser.add_argument(
+        "--retry-delay", type=float, default=5.0, help="pause after a batch in which every copy failed"
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    exporter = TrainingExporter(
+        args.out, args.batch_size, args.val_ratio, args.max_attempts, args.retry_delay
+    )
+    state = exporter.run(follow=args.follow, interval=args.interval, max_batches=args.max_batches)
+    print(json.dumps(state, indent=2))
+
+
+if __name__ == "__main__":
+    main()
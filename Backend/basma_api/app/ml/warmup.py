@@ -0,0 +1,78 @@
+# app/ml/warmup.py
+from __future__ import annotations
+
+import logging
+import time
+from typing import Any, Callable, Optional
+
+from app.ml.inference_executor import get_inference_executor
+from app.settings import AI_PRELOAD_MODEL, AI_WARMUP_RUNS
+
+logger = logging.getLogger("basma.ml")
+
+
+class ModelReadiness:
+    """
+    Tracks whether this worker may receive analyze traffic.
+
+    - Preload disabled (default): always ready, the model loads lazily on
+      the first request as before.
+    - Preload enabled: "loading" until the model is loaded and warmed,
+      then "ready" (or "failed" with the error).
+    """
+
+    def __init__(self, preload: bool = AI_PRELOAD_MODEL) -> None:
+        self.preload = preload
+        self.state = "loading" if preload else "lazy"
+        self.error: Optional[str] = None
+        self.load_seconds: Optional[float] = None
+        self.warmup_seconds: Optional[float] = None
+
+    @property
+    def ready(self) -> bool:
+        return self.state in ("lazy", "ready")
+
+    def as_dict(self) -> dict:
+        return {
+            "state": self.state,
+            "ready": self.ready,
+            "preload": self.preload,
+            "load_seconds": self.load_seconds,
+            "warmup_seconds": self.warmup_seconds,
+            "error": self.error,
+        }
+
+
+readiness = ModelReadiness()
+
+
+def _load_and_warm(get_service: Callable[[], Any], runs: int) -> None:
+    start = time.perf_counter()
+    clf = get_service()
+    readiness.load_seconds = round(time.perf_counter() - start, 3)
+
+    start = time.perf_counter()
+    clf.warmup(runs)
+    readiness.warmup_seconds = round(time.perf_counter() - start, 3)
+
+
+async def preload_classifier(
+    get_service: Callable[[], Any],
+    runs: int = AI_WARMUP_RUNS,
+) -> None:
+    """Load the classifier and run ``runs`` dummy inferences off the event loop."""
+    readiness.state = "loading"
+    readiness.error = None
+    try:
+        await get_inference_executor().run(_load_and_warm, get_service, runs)
+    except Exception as exc:  # noqa: BLE001 - reported through /health/ready
+        readiness.state = "failed"
+        readiness.error = f"{type(exc).__name__}: {exc}"
+        logger.exception("Classifier preload failed")
+        return
+    readiness.state = "ready"
+    logger.info(
+        "Classifier ready (load %.2fs, warm-up %.2fs)",
+        readiness.load_seconds or 0.0,
+        readiness.warmup_seconds or 0.0,
+    )
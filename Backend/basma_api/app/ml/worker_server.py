@@ -0,0 +1,182 @@
+# app/ml/worker_server.py
+"""
+Standalone inference worker: one process that owns the model and serves
+predictions to any number of lightweight API workers.
+
+    python -m app.ml.worker_server --uds /tmp/basma-inference.sock
+    python -m app.ml.worker_server --host 127.0.0.1 --port 8100
+
+API workers use it when ``AI_INFERENCE_REMOTE_URL`` points at it
+(``unix:///tmp/basma-inference.sock`` or ``http://127.0.0.1:8100``).
+Inside the worker, ``AI_INFERENCE_WORKERS`` / ``AI_BATCH_MAX_SIZE`` size the
+thread pool and micro-batches, and the result cache is shared by every
+API worker that talks to it.
+
+Protocol:
+- ``POST /predict``: raw image bytes -> ``{report_type_id, confidence, info}``
+  (header ``X-Model-Version``; 503 + Retry-After when the queue is full)
+- ``GET /info``: model version/threshold (503 until the model is warm)
+- ``GET /stats``: executor and cache counters
+- ``GET /metrics``: Prometheus stage histograms of this process
+- ``POST /model/reload``: hot-swap the model (see app/ml/model_registry.py);
+  needs ``X-Worker-Token: $AI_WORKER_TOKEN`` and is disabled while that is
+  unset. ``path`` must be AI_MODEL_PATH or a file inside AI_MODEL_DIR.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import hmac
+import os
+import stat
+from typing import Optional
+
+from fastapi import FastAPI, Header, HTTPException, Request, status
+from fastapi.responses import JSONResponse
+
+from app.ml.inference import classify_image, get_batcher
+from app.ml.inference_executor import (
+    InferenceQueueFull,
+    get_inference_executor,
+    shutdown_inference_executor,
+)
+from app.ml.model_registry import get_model_registry
+from app.ml.result_cache import get_prediction_cache
+from app.ml.warmup import preload_classifier, readiness
+from app.routers.metrics import router as metrics_router
+from app.settings import AI_MODEL_WATCH, AI_WORKER_TOKEN
+
+app = FastAPI(title="Basma inference worker")
+# stage histograms of the model side (decode / forward / nms / postprocess)
+app.include_router(metrics_router)
+
+def get_worker_classifier():
+    """The worker always runs the model locally (ignores AI_INFERENCE_REMOTE_URL)."""
+    return get_model_registry().get()
+
+
+@app.on_event("startup")
+async def load_model():
+    readiness.preload = True
+    await preload_classifier(get_worker_classifier)
+    if AI_MODEL_WATCH:
+        app.state.model_watch_task = asyncio.create_task(get_model_registry().watch())
+
+
+@app.on_event("shutdown")
+def shutdown():
+    task = getattr(app.state, "model_watch_task", None)
+    if task is not None:
+        task.cancel()
+    shutdown_inference_executor()
+
+
+def _not_ready() -> JSONResponse:
+    return JSONResponse(status_code=503, content=readiness.as_dict(), headers={"Retry-After": "5"})
+
+
+@app.get("/info")
+def info():
+    if not readiness.ready:
+        return _not_ready()
+    clf = get_worker_classifier()
+    return {
+        "model_version": clf.model_version,
+        "model_conf_threshold": clf.model_conf_threshold,
+        "backend": getattr(clf, "backend_name", None),
+        "variant": getattr(clf, "variant", None),
+        "pid": os.getpid(),
+    }
+
+
+@app.post("/predict")
+async def predict(request: Request):
+    if not readiness.ready:
+        return _not_ready()
+    image_bytes = await request.body()
+    if not image_bytes:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="empty body")
+    clf = get_worker_classifier()
+    try:
+        report_type_id, confidence, info = await classify_image(clf, image_bytes)
+    except InferenceQueueFull as e:
+        return JSONResponse(
+            status_code=503,
+            content={"detail": "inference queue is full"},
+            headers={"Retry-After": str(e.retry_after)},
+        )
+    return JSONResponse(
+        content={"report_type_id": report_type_id, "confidence": confidence, "info": info},
+        headers={"X-Model-Version": clf.model_version},
+    )
+
+
+def _check_token(token: Optional[str]) -> None:
+    if not AI_WORKER_TOKEN:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="model reload is disabled (AI_WORKER_TOKEN is not set)",
+        )
+    if not token or not hmac.compare_digest(token.encode(), AI_WORKER_TOKEN.encode()):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="invalid worker token")
+
+
+@app.post("/model/reload")
+async def reload_model(
+    path: Optional[str] = None,
+    x_worker_token: Optional[str] = Header(None),
+):
+    """Load + warm a new model file and swap it in (default: newest candidate)."""
+    _check_token(x_worker_token)
+    registry = get_model_registry()
+    try:
+        return await registry.reload_async(path)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e)) from e
+    except RuntimeError as e:
+        if registry.reloading:
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e)) from e
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e)) from e
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"{type(e).__name__}: {e}") from e
+
+
+@app.get("/stats")
+def stats():
+    batcher = get_batcher()
+    return {
+        "executor": get_inference_executor().stats(),
+        "batcher": batcher.stats() if batcher is not None else None,
+        "results": get_prediction_cache().stats(),
+        "readiness": readiness.as_dict(),
+        "model": get_model_registry().status(),
+    }
+
+
+def _remove_stale_socket(path: str) -> None:
+    try:
+        if stat.S_ISSOCK(os.stat(path).st_mode):
+            os.unlink(path)
+    except FileNotFoundError:
+        pass
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Basma inference worker")
+    parser.add_argument("--uds", help="listen on this Unix socket instead of TCP")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--log-level", default="info")
+    args = parser.parse_args()
+
+    import uvicorn
+
+    if args.uds:
+        _remove_stale_socket(args.uds)
+        uvicorn.run(app, uds=args.uds, log_level=args.log_level)
+    else:
+        uvicorn.run(app, host=args.host, port=args.port, log_level=args.log_level)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,21 +1,27 @@
 from __future__ import annotations
 
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import deferred, relationship
 from sqlalchemy import (
+    BigInteger,
     Column,
+    Integer,
     String,
     SmallInteger,
     TIMESTAMP,
     ForeignKey,
+    Index,
     Numeric,
     text,
 )
 from sqlalchemy.dialects.mysql import (
+    CHAR as MySQLChar,
     INTEGER as MySQLInteger,
     MEDIUMTEXT as MySQLMediumText,
 )
 
+from app.settings import AI_PHASH_ENABLED
+
 Base = declarative_base()
 
 # ============================================================
@@ -335,6 +341,13 @@ class Report(Base):
     note = Column(MySQLMediumText(), nullable=True)
 
     image_before_url = Column(String(500), nullable=False)
+    # بصمة الصورة (dHash 64-bit بصيغة hex) لاكتشاف البلاغات المكررة.
+    # لا تُربط إلا عند AI_PHASH_ENABLED (ومؤجّلة في القراءة)، فلا تتعطل قواعد
+    # البيانات التي لم يُنفَّذ عليها Database/Alter/reports image phash.txt
+    if AI_PHASH_ENABLED:
+        image_before_phash = deferred(
+            Column(MySQLChar(16, collation="utf8mb4_bin"), nullable=True, index=True)
+        )
     image_after_url = Column(String(500), nullable=True)
 
     status_id = Column(
@@ -418,3 +431,35 @@ class Report(Base):
 
     def __repr__(self) -> str:
         return f"<Report id={self.id} code={self.report_code!r}>"
+
+
+# ============================================================
+# ML TRAINING QUEUE
+# ============================================================
+
+
+class MLTrainingQueue(Base):
+    """
+    صور مصنّفة بانتظار تصديرها كبيانات تدريب للنموذج
+    (يستهلكها python -m app.ml.training_export).
+    processed: 0 = بالانتظار، 1 = تم التصدير، 2 = تم تخطيه (الصورة غير موجودة محلياً)،
+               3 = فشل نسخ الصورة بعد AI_TRAINING_MAX_ATTEMPTS محاولات
+    """
+
+    __tablename__ = "ml_training_queue"
+    # training_export يطالب بالصفوف المعلّقة بترتيب id دون المرور على ما صُدّر
+    __table_args__ = (Index("processed_id", "processed", "id"),)
+
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    report_id = Column(BigInteger, nullable=False)
+    image_url = Column(String(500), nullable=False)
+    report_type_id = Column(Integer, nullable=False)
+    created_at = Column(
+        TIMESTAMP,
+        nullable=True,
+        server_default=text("CURRENT_TIMESTAMP"),
+    )
+    processed = Column(SmallInteger, nullable=True, server_default=text("0"))
+
+    def __repr__(self) -> str:
+        return f"<MLTrainingQueue id={self.id} report_id={self.report_id} processed={self.processed}>"
@@ -0,0 +1,274 @@
+# app/prefork.py
+"""
+Pre-fork launcher: load the model once, then fork the uvicorn workers.
+
+    python -m app.prefork --workers 4 --host 0.0.0.0 --port 8000
+    python -m app.prefork memreport --pid <launcher pid>
+
+``uvicorn --workers N`` spawns fresh interpreters, so every worker loads its
+own copy of the YOLOv5 weights. Here the master imports the app, loads the
+classifier and freezes the GC *before* ``fork()``; the weight pages are then
+shared copy-on-write by every worker and only touched pages get copied.
+
+Notes:
+- Warm-up inference runs in each worker after the fork (the master never
+  starts torch's OpenMP pool, which is not fork-safe).
+- Each worker sets its torch intra-op threads to ``AI_INTRA_OP_THREADS``
+  (or ``AI_TORCH_THREADS``; default: CPU count / workers) so N workers do
+  not oversubscribe cores.
+- The ONNX backend is not preloaded: ORT sessions own thread pools that do
+  not survive ``fork()``; those workers load the model after forking.
+- Linux/macOS only (needs ``os.fork``).
+"""
+from __future__ import annotations
+
+import argparse
+import gc
+import logging
+import os
+import signal
+import socket
+import sys
+import time
+from typing import Dict, List, Optional
+
+from app.ml.threads import apply_torch_threads
+from app.settings import (
+    AI_INTER_OP_THREADS,
+    AI_INTRA_OP_THREADS,
+    AI_MODEL_BACKEND,
+    AI_MODEL_VARIANT,
+    AI_TORCH_THREADS,
+)
+
+logger = logging.getLogger("basma.prefork")
+
+
+# -------------------------
+# Memory report (/proc)
+# -------------------------
+
+def _smaps_rollup(pid: int) -> Optional[Dict[str, int]]:
+    """Fields of ``/proc/<pid>/smaps_rollup`` in kB (Linux >= 4.14)."""
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as fh:
+            lines = fh.readlines()
+    except OSError:
+        return None
+    fields: Dict[str, int] = {}
+    for line in lines[1:]:
+        parts = line.split()
+        if len(parts) >= 2 and parts[0].endswith(":"):
+            try:
+                fields[parts[0][:-1]] = int(parts[1])
+            except ValueError:
+                continue
+    return fields
+
+
+def child_pids(pid: int) -> List[int]:
+    pids: List[int] = []
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as fh:
+                stat = fh.read()
+        except OSError:
+            continue
+        # the command name may contain spaces; ppid is the 2nd field after ")"
+        fields = stat.rsplit(")", 1)[-1].split()
+        if len(fields) > 1 and fields[1] == str(pid):
+            pids.append(int(entry))
+    return sorted(pids)
+
+
+def memory_report(pids: List[int]) -> List[dict]:
+    """
+    Per-process memory in MB:
+    - ``rss``: resident pages (counts shared pages in every process)
+    - ``uss``: private pages only, what the process really costs
+    - ``shared``: resident pages shared with other processes
+    - ``pss``: proportional share (shared pages divided by sharers)
+    """
+    rows = []
+    for pid in pids:
+        fields = _smaps_rollup(pid)
+        if fields is None:
+            continue
+        uss = fields.get("Private_Clean", 0) + fields.get("Private_Dirty", 0)
+        shared = fields.get("Shared_Clean", 0) + fields.get("Shared_Dirty", 0)
+        rows.append({
+            "pid": pid,
+            "rss": round(fields.get("Rss", 0) / 1024, 1),
+            "uss": round(uss / 1024, 1),
+            "shared": round(shared / 1024, 1),
+            "pss": round(fields.get("Pss", 0) / 1024, 1),
+        })
+    return rows
+
+
+def format_memory_report(rows: List[dict]) -> str:
+    lines = [f"{'pid':>8} {'rss':>9} {'uss':>9} {'shared':>9} {'pss':>9}  (MB)"]
+    for row in rows:
+        lines.append(
+            f"{row['pid']:>8} {row['rss']:>9} {row['uss']:>9} {row['shared']:>9} {row['pss']:>9}"
+        )
+    if rows:
+        lines.append(
+            f"{'total':>8} {round(sum(r['rss'] for r in rows), 1):>9} "
+            f"{round(sum(r['uss'] for r in rows), 1):>9} {'':>9} "
+            f"{round(sum(r['pss'] for r in rows), 1):>9}"
+        )
+    return "\n".join(lines)
+
+
+# -------------------------
+# Launcher
+# -------------------------
+
+def torch_threads_per_worker(workers: int) -> int:
+    if AI_INTRA_OP_THREADS:
+        return AI_INTRA_OP_THREADS
+    if AI_TORCH_THREADS:
+        return AI_TORCH_THREADS
+    return max(1, (os.cpu_count() or 1) // max(1, workers))
+
+
+def _configure_worker_threads(threads: int) -> None:
+    os.environ["OMP_NUM_THREADS"] = str(threads)
+    if "torch" in sys.modules:
+        apply_torch_threads(threads, AI_INTER_OP_THREADS or 1)
+
+
+def _preload_in_master() -> bool:
+    from app.controllers.ai_reports_controller import get_classifier_service
+
+    backend = "onnx" if AI_MODEL_VARIANT == "int8" else AI_MODEL_BACKEND
+    if backend == "onnx":
+        logger.info("ONNX backend: model is loaded in each worker after fork")
+        return False
+    start = time.perf_counter()
+    get_classifier_service()
+    logger.info("Model loaded in master in %.2fs", time.perf_counter() - start)
+    return True
+
+
+def _serve_worker(app, sock: socket.socket, threads: int, log_level: str) -> None:
+    import uvicorn
+
+    from app.db import engine
+    from app.ml.warmup import readiness
+
+    # connections opened by the master must not be shared with workers
+    engine.dispose(close=False)
+    _configure_worker_threads(threads)
+    # each worker warms its own copy-on-write model and gates /health/ready
+    readiness.preload = True
+    readiness.state = "loading"
+
+    config = uvicorn.Config(app, log_level=log_level, lifespan="on")
+    server = uvicorn.Server(config)
+    server.run(sockets=[sock])
+
+
+def run(host: str, port: int, workers: int, log_level: str = "info", preload: bool = True) -> None:
+    if not hasattr(os, "fork"):
+        raise SystemExit("app.prefork needs os.fork(); use `uvicorn --workers` on this platform")
+
+    from app.main import app  # creates tables / imports routers once, in the master
+
+    if preload:
+        _preload_in_master()
+    from app.db import engine
+
+    engine.dispose()
+    # move everything allocated so far out of the GC's reach so collections
+    # in the workers do not write to (and un-share) those pages
+    gc.collect()
+    gc.freeze()
+
+    sock = socket.socket(socket.AF_INET6 if ":" in host else socket.AF_INET)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+
+    threads = torch_threads_per_worker(workers)
+    children: Dict[int, int] = {}
+    stopping = False
+
+    def spawn(slot: int) -> None:
+        pid = os.fork()
+        if pid == 0:
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            try:
+                _serve_worker(app, sock, threads, log_level)
+            finally:
+                os._exit(0)
+        children[pid] = slot
+
+    def stop(signum, _frame) -> None:
+        nonlocal stopping
+        stopping = True
+        for pid in list(children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGTERM, stop)
+
+    for slot in range(workers):
+        spawn(slot)
+    logger.info(
+        "Master %s serving http://%s:%s with %s workers (%s torch threads each)",
+        os.getpid(), host, port, workers, threads,
+    )
+
+    while children:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        except InterruptedError:
+            continue
+        slot = children.pop(pid, None)
+        if slot is not None and not stopping:
+            logger.warning("Worker %s exited (status %s), restarting", pid, status)
+            time.sleep(1.0)
+            spawn(slot)
+    sock.close()
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m app.prefork", description=__doc__.split("\n\n")[0])
+    sub = parser.add_subparsers(dest="command")
+
+    serve = sub.add_parser("serve", help="run the API (default)")
+    serve.add_argument("--host", default="127.0.0.1")
+    serve.add_argument("--port", type=int, default=8000)
+    serve.add_argument("--workers", type=int, default=int(os.getenv("WEB_CONCURRENCY", "2")))
+    serve.add_argument("--log-level", default="info")
+    serve.add_argument("--no-preload", action="store_true", help="fork first, load in workers")
+
+    report = sub.add_parser("memreport", help="unique vs shared memory of a launcher and its workers")
+    report.add_argument("--pid", type=int, required=True, help="launcher (master) pid")
+
+    args_list = list(sys.argv[1:] if argv is None else argv)
+    if not args_list or (args_list[0].startswith("-") and args_list[0] not in ("-h", "--help")):
+        args_list.insert(0, "serve")
+    args = parser.parse_args(args_list)
+
+    if args.command == "memreport":
+        print(format_memory_report(memory_report([args.pid] + child_pids(args.pid))))
+        return
+
+    logging.basicConfig(level=args.log_level.upper(), format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    run(args.host, args.port, max(1, args.workers), args.log_level, preload=not args.no_preload)
+
+
+if __name__ == "__main__":
+    main()
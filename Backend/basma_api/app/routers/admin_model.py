@@ -0,0 +1,69 @@
+# app/routers/admin_model.py
+from __future__ import annotations
+
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from pydantic import BaseModel
+
+from app.deps import get_current_admin_user
+from app.ml.model_registry import get_model_registry
+from app.settings import AI_INFERENCE_REMOTE_URL
+
+router = APIRouter(
+    prefix="/admin/model",
+    tags=["Admin Model"],
+    dependencies=[Depends(get_current_admin_user)],
+)
+
+
+class ModelReloadRequest(BaseModel):
+    # مسار ملف النموذج الجديد؛ إن لم يُحدد يُستخدم أحدث ملف في AI_MODEL_DIR (أو AI_MODEL_PATH)
+    # المسموح فقط: AI_MODEL_PATH نفسه أو ملف داخل AI_MODEL_DIR
+    path: Optional[str] = None
+
+
+def _ensure_local() -> None:
+    if AI_INFERENCE_REMOTE_URL:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="النموذج يعمل في خادم الاستدلال المنفصل؛ استخدم POST /model/reload هناك.",
+        )
+
+
+@router.get("/")
+def model_status():
+    """النموذج النشط في هذا الـ worker وسجل آخر عمليات التحميل."""
+    _ensure_local()
+    return get_model_registry().status()
+
+
+@router.post("/reload")
+async def reload_model(data: ModelReloadRequest):
+    """
+    تحميل النموذج الجديد وتسخينه في الخلفية ثم تبديله دون إعادة تشغيل.
+    الطلبات الجارية تكمل على النموذج القديم.
+    ملاحظة: ينطبق على الـ worker الذي استقبل الطلب فقط (استخدم AI_MODEL_WATCH لكل الـ workers).
+    """
+    _ensure_local()
+    registry = get_model_registry()
+    if data.path:
+        try:
+            registry.check_path(data.path)
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="ملف النموذج غير موجود، أو ليس AI_MODEL_PATH ولا ملفاً داخل AI_MODEL_DIR.",
+            )
+    if registry.reloading:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="يوجد تحميل نموذج قيد التنفيذ.",
+        )
+    try:
+        return await registry.reload_async(data.path)
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"فشل تحميل النموذج: {type(e).__name__}: {e}",
+        ) from e
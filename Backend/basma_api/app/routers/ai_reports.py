@@ -1,18 +1,39 @@
 # app/routers/ai_reports.py
 from __future__ import annotations
 
-from typing import Optional, Tuple, Dict, Any
+import asyncio
+import math
+from typing import Optional, Tuple, Dict, Any, List
 
 import httpx
-from fastapi import APIRouter, Depends, UploadFile, File, HTTPException, status
+from fastapi import APIRouter, Depends, UploadFile, File, Form, HTTPException, Response, status
 from pydantic import BaseModel, Field
 from sqlalchemy.orm import Session
 from sqlalchemy import text
 from sqlalchemy.exc import SQLAlchemyError
 
-from app.db import get_db  # returns a database Session
+from app.db import SessionLocal, get_db  # returns a database Session
 from app import models      # SQLAlchemy models
 from app.ml.report_classifier import ReportClassifierService
+from app.ml.inference import classify_image, hash_image
+from app.metrics import RequestTimer, request_timing, timed, timing_header
+from app.settings import (
+    AI_INFERENCE_RETRY_AFTER,
+    AI_MODEL_PATH,
+    GEOCODER_FALLBACK_DISTANCE_M,
+    GEOCODER_OFFLINE_ENABLED,
+)
+from app.ml.near_duplicates import get_classification_index, get_report_hash_index
+from app.ml.inference_executor import InferenceQueueFull
+from app.ml.result_cache import get_prediction_cache
+from app.ml.jobs import get_job_runner, get_job_store
+# نسخة واحدة (singleton) من خدمة التصنيف، مشتركة مع التحميل المسبق عند الإقلاع
+from app.controllers.ai_reports_controller import get_classifier_service
+from app.controllers.uploads_controller import delete_upload, save_upload
+from app.services.geocode_cache import get_geocode_cache
+from app.services.geocoding import GeocoderUnavailable, get_geocode_flights, get_geocoder, lookup_address
+from app.services.offline_geocoder import KnownLocation, get_location_index, haversine_m
+from app.services.boundaries import get_boundary_index
 
 router = APIRouter(prefix="/ai", tags=["AI"])
 
@@ -20,15 +41,12 @@ router = APIRouter(prefix="/ai", tags=["AI"])
 # MODEL / CLASSIFIER SETUP
 # ============================================================
 
-# Singleton instance
-classifier_service: Optional[ReportClassifierService] = None
-
 # عتبة الثقة على مستوى الـ API:
 # إذا كانت الثقة النهائية (best_conf) أقل من هذا → نرجع OTHERS
 CONFIDENCE_THRESHOLD = 0.25
 
-# مسار ملف نموذج التشوّه البصري (YOLOv5 .pt)
-MODEL_PATH = "app/models/vp.pt"
+# مسار ملف نموذج التشوّه البصري (YOLOv5 .pt أو .onnx) — من AI_MODEL_PATH
+MODEL_PATH = AI_MODEL_PATH
 
 # قيم خاصة بفئة "OTHERS" في قاعدة البيانات
 OTHERS_REPORT_TYPE_ID = 11
@@ -36,20 +54,6 @@ OTHERS_CODE = "OTHERS"
 OTHERS_NAME_AR = "أخرى"
 
 
-def get_classifier_service() -> ReportClassifierService:
-    """
-    إرجاع نسخة واحدة (singleton) من خدمة التصنيف.
-    يعتمد على نموذج YOLOv5 محلي (vp.pt).
-    """
-    global classifier_service
-    if classifier_service is None:
-        classifier_service = ReportClassifierService(
-            model_path=MODEL_PATH,
-            model_conf_threshold=0.1,  # يمكن تعديلها (0.05 ~ 0.2) حسب تجاربك
-        )
-    return classifier_service
-
-
 # ============================================================
 # SCHEMAS
 # ============================================================
@@ -78,6 +82,9 @@ class ResolveLocationResponse(BaseModel):
     district: LocationInfo
     area: LocationInfo
     location: Optional[LocationPoint] = None
+    # approximate: الموقع أقرب موقع معروف (الخدمة الخارجية غير متاحة)، على بُعد distance_m متر
+    approximate: bool = False
+    distance_m: Optional[float] = None
 
 
 class AnalyzeImageResponse(BaseModel):
@@ -89,6 +96,30 @@ class AnalyzeImageResponse(BaseModel):
     class_name: Optional[str] = Field(None, alias="class")
     suggested_title: str
     suggested_description: str
+    # بلاغات سابقة بصور شبه مطابقة (بلاغ مكرر محتمل)
+    duplicate_report_ids: List[int] = Field(default_factory=list)
+    # إصدار النموذج الذي أنتج هذا التصنيف (بصمة ملف الأوزان)
+    model_version: Optional[str] = None
+
+
+class AnalyzeUploadResponse(BaseModel):
+    # رابط الصورة المحفوظة (نفس ما يرجعه /uploads)
+    url: str
+    analysis: AnalyzeImageResponse
+    # None إذا تعذّر تحديد الموقع؛ السبب في location_error
+    location: Optional[ResolveLocationResponse] = None
+    location_error: Optional[str] = None
+
+
+class AnalyzeJobResponse(BaseModel):
+    job_id: str
+    # queued / running / done / failed
+    status: str
+    created_at: float
+    updated_at: float
+    # نفس محتوى AnalyzeImageResponse عند status == "done"
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
 
 
 # ============================================================
@@ -98,26 +129,18 @@ class AnalyzeImageResponse(BaseModel):
 
 async def reverse_geocode(lat: float, lon: float) -> Dict[str, Any]:
     """
-    استدعاء خدمة Nominatim (OpenStreetMap) لتحويل الإحداثيات إلى عنوان.
+    استدعاء خدمة Nominatim (OpenStreetMap) لتحويل الإحداثيات إلى عنوان،
+    عبر عميل HTTP مشترك يُبقي الاتصالات مفتوحة بين الطلبات،
+    مع كاش حسب خلية geohash (النقاط المتقاربة تشترك في نفس النتيجة).
     """
-    url = "https://nominatim.openstreetmap.org/reverse"
-    params = {
-        "format": "json",
-        "lat": lat,
-        "lon": lon,
-        "zoom": 16,
-        "addressdetails": 1,
-        "accept-language": "ar,en",
-    }
-    headers = {
-        "User-Agent": "basma-app/1.0",
-        "Accept-Language": "ar,en",
-    }
     try:
-        async with httpx.AsyncClient(timeout=10) as client:
-            resp = await client.get(url, params=params, headers=headers)
-            resp.raise_for_status()
-            return resp.json()
+        return await lookup_address(lat, lon)
+    except GeocoderUnavailable as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="خدمة تحديد الموقع الجغرافي مشغولة حالياً، يرجى المحاولة بعد قليل.",
+            headers={"Retry-After": str(max(1, math.ceil(e.retry_after)))},
+        ) from e
     except httpx.HTTPError as e:
         raise HTTPException(
             status_code=status.HTTP_502_BAD_GATEWAY,
@@ -193,12 +216,48 @@ async def ai_resolve_location(
       - الموقع التفصيلي (locations) إن وُجد
     ويقوم بإنشاء السجلات تلقائياً في قاعدة البيانات عند عدم وجودها.
     """
-    lat = payload.latitude
-    lon = payload.longitude
+    return await resolve_location(payload.latitude, payload.longitude, db)
+
+
+async def resolve_location(lat: float, lon: float, db: Session) -> ResolveLocationResponse:
+    """
+    تحديد المحافظة/اللواء/المنطقة/الموقع من الإحداثيات (منطق /ai/resolve-location).
+    يرفع HTTPException عند فشل خدمة تحديد الموقع أو قاعدة البيانات.
+    """
+    # أولاً: أقرب موقع معروف في قاعدة البيانات (بدون طلب خارجي)
+    if GEOCODER_OFFLINE_ENABLED:
+        try:
+            with timed("offline_geocode"):
+                known = get_location_index().resolve(db, lat, lon)
+        except SQLAlchemyError as e:
+            db.rollback()
+            print("Offline geocoder error:", e)
+            known = None
+        if known is not None:
+            return _location_response(*known)
+
+    # المحافظة واللواء من حدود المضلعات (إن وُجد ملف GeoJSON)؛
+    # الخدمة الخارجية تبقى فقط لتسمية المنطقة والموقع
+    boundary = None
+    try:
+        with timed("boundary_lookup"):
+            boundary = get_boundary_index().resolve(db, lat, lon)
+    except SQLAlchemyError as e:
+        db.rollback()
+        print("Boundary lookup error:", e)
 
     # Reverse geocode
-    geo = await reverse_geocode(lat, lon)
+    try:
+        geo = await reverse_geocode(lat, lon)
+    except HTTPException:
+        # الخدمة الخارجية غير متاحة: أقرب موقع معروف ضمن مسافة أوسع بدل فشل الطلب
+        known = _offline_fallback(db, lat, lon)
+        if known is None:
+            raise
+        return _approximate(_location_response(*known), lat, lon)
     gov_raw, dist_raw, area_raw, loc_raw = extract_components(geo)
+    if boundary is not None:
+        gov_raw, dist_raw = boundary[0].name_ar, boundary[1].name_ar
 
     gov_name = _clean_admin_name(gov_raw)
     dist_name = _clean_admin_name(dist_raw)
@@ -219,7 +278,7 @@ async def ai_resolve_location(
         (loc_name[:80] + "..." if len(loc_name) > 80 else loc_name),
     )
 
-    if not gov_name or not dist_name:
+    if boundary is None and (not gov_name or not dist_name):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="غير قادر على تحديد المحافظة أو اللواء من الإحداثيات.",
@@ -227,85 +286,11 @@ async def ai_resolve_location(
     if not area_name:
         area_name = "منطقة بدون اسم"
 
-    # --------- Government ---------
-    try:
-        gov = (
-            db.query(models.Government)
-            .filter(models.Government.name_ar == gov_name)
-            .first()
-        )
-        if not gov:
-            print("Creating new Government:", gov_name)
-            db.execute(
-                text(
-                    "INSERT INTO governments (name_ar, name_en, is_active) "
-                    "VALUES (:name_ar, :name_en, 1)"
-                ),
-                {"name_ar": gov_name, "name_en": gov_name},
-            )
-            db.commit()
-            gov = (
-                db.query(models.Government)
-                .filter(models.Government.name_ar == gov_name)
-                .first()
-            )
-        if not gov:
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="فشل إنشاء أو قراءة بيانات المحافظة من قاعدة البيانات.",
-            )
-    except SQLAlchemyError as e:
-        db.rollback()
-        print("Error while creating Government:", e)
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="حدث خطأ أثناء حفظ بيانات المحافظة.",
-        ) from e
-
-    # --------- District ---------
-    try:
-        dist = (
-            db.query(models.District)
-            .filter(
-                models.District.government_id == gov.id,
-                models.District.name_ar == dist_name,
-            )
-            .first()
-        )
-        if not dist:
-            print("Creating new District:", dist_name, "for gov_id:", gov.id)
-            db.execute(
-                text(
-                    "INSERT INTO districts (government_id, name_ar, name_en, is_active) "
-                    "VALUES (:gid, :name_ar, :name_en, 1)"
-                ),
-                {
-                    "gid": gov.id,
-                    "name_ar": dist_name,
-                    "name_en": dist_name,
-                },
-            )
-            db.commit()
-            dist = (
-                db.query(models.District)
-                .filter(
-                    models.District.government_id == gov.id,
-                    models.District.name_ar == dist_name,
-                )
-                .first()
-            )
-        if not dist:
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="فشل إنشاء أو قراءة بيانات اللواء/القضاء من قاعدة البيانات.",
-            )
-    except SQLAlchemyError as e:
-        db.rollback()
-        print("Error while creating District:", e)
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="حدث خطأ أثناء حفظ بيانات اللواء/القضاء.",
-        ) from e
+    if boundary is not None:
+        gov, dist = boundary
+    else:
+        gov = _ensure_government(db, gov_name)
+        dist = _ensure_district(db, gov, dist_name)
 
     # --------- Area ---------
     try:
@@ -404,6 +389,136 @@ async def ai_resolve_location(
             print("Error while creating Location:", e)
             location_obj = None
 
+    # إضافة الموقع للفهرس المحلي ليُستخدم مباشرة في الطلبات القريبة التالية
+    if location_obj is not None and location_obj.latitude is not None and location_obj.longitude is not None:
+        get_location_index().add(
+            KnownLocation(
+                location_obj.id,
+                area.id,
+                dist.id,
+                gov.id,
+                float(location_obj.latitude),
+                float(location_obj.longitude),
+            )
+        )
+
+    return _location_response(gov, dist, area, location_obj)
+
+
+def _offline_fallback(db: Session, lat: float, lon: float):
+    """أقرب موقع معروف ضمن GEOCODER_FALLBACK_DISTANCE_M (عند تعذّر الخدمة الخارجية)."""
+    if not GEOCODER_OFFLINE_ENABLED or not GEOCODER_FALLBACK_DISTANCE_M:
+        return None
+    try:
+        return get_location_index().resolve(db, lat, lon, max_distance_m=GEOCODER_FALLBACK_DISTANCE_M)
+    except SQLAlchemyError:
+        db.rollback()
+        return None
+
+
+def _ensure_government(db: Session, gov_name: str) -> models.Government:
+    """قراءة المحافظة بالاسم أو إنشاؤها."""
+    # --------- Government ---------
+    try:
+        gov = (
+            db.query(models.Government)
+            .filter(models.Government.name_ar == gov_name)
+            .first()
+        )
+        if not gov:
+            print("Creating new Government:", gov_name)
+            db.execute(
+                text(
+                    "INSERT INTO governments (name_ar, name_en, is_active) "
+                    "VALUES (:name_ar, :name_en, 1)"
+                ),
+                {"name_ar": gov_name, "name_en": gov_name},
+            )
+            db.commit()
+            gov = (
+                db.query(models.Government)
+                .filter(models.Government.name_ar == gov_name)
+                .first()
+            )
+        if not gov:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="فشل إنشاء أو قراءة بيانات المحافظة من قاعدة البيانات.",
+            )
+    except SQLAlchemyError as e:
+        db.rollback()
+        print("Error while creating Government:", e)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="حدث خطأ أثناء حفظ بيانات المحافظة.",
+        ) from e
+    return gov
+
+
+def _ensure_district(db: Session, gov: models.Government, dist_name: str) -> models.District:
+    """قراءة اللواء/القضاء بالاسم ضمن المحافظة أو إنشاؤه."""
+    # --------- District ---------
+    try:
+        dist = (
+            db.query(models.District)
+            .filter(
+                models.District.government_id == gov.id,
+                models.District.name_ar == dist_name,
+            )
+            .first()
+        )
+        if not dist:
+            print("Creating new District:", dist_name, "for gov_id:", gov.id)
+            db.execute(
+                text(
+                    "INSERT INTO districts (government_id, name_ar, name_en, is_active) "
+                    "VALUES (:gid, :name_ar, :name_en, 1)"
+                ),
+                {
+                    "gid": gov.id,
+                    "name_ar": dist_name,
+                    "name_en": dist_name,
+                },
+            )
+            db.commit()
+            dist = (
+                db.query(models.District)
+                .filter(
+                    models.District.government_id == gov.id,
+                    models.District.name_ar == dist_name,
+                )
+                .first()
+            )
+        if not dist:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="فشل إنشاء أو قراءة بيانات اللواء/القضاء من قاعدة البيانات.",
+            )
+    except SQLAlchemyError as e:
+        db.rollback()
+        print("Error while creating District:", e)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="حدث خطأ أثناء حفظ بيانات اللواء/القضاء.",
+        ) from e
+    return dist
+
+
+def _approximate(response: ResolveLocationResponse, lat: float, lon: float) -> ResolveLocationResponse:
+    """تعليم الرد كتقريبي مع المسافة إلى الموقع المعروف المستخدم."""
+    response.approximate = True
+    point = response.location
+    if point is not None and point.latitude is not None and point.longitude is not None:
+        response.distance_m = round(haversine_m(lat, lon, point.latitude, point.longitude), 1)
+    return response
+
+
+def _location_response(
+    gov: models.Government,
+    dist: models.District,
+    area: models.Area,
+    location_obj: Optional[models.Location],
+) -> ResolveLocationResponse:
     # إعداد الرد
     location_point = None
     if location_obj:
@@ -528,43 +643,135 @@ def generate_text_suggestions(
 
 @router.post("/analyze-image", response_model=AnalyzeImageResponse)
 async def ai_analyze_image(
+    response: Response,
     file: UploadFile = File(...),
     gov_id: int = 0,
     dist_id: int = 0,
     area_id: int = 0,
     db: Session = Depends(get_db),
     clf: ReportClassifierService = Depends(get_classifier_service),
+    timer: Optional[RequestTimer] = Depends(request_timing),
 ):
     """
     يقبل صورة من المستخدم ويستخدم نموذج YOLOv5 لتحليلها،
     ويرجع نوع التشوّه البصري المتوقع مع درجة الثقة
     بالإضافة إلى عنوان ووصف مقترحين للبلاغ.
     """
-    image_bytes = await file.read()
+    with timed("upload_read"):
+        image_bytes = await file.read()
     if not image_bytes:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="ملف الصورة فارغ.",
         )
 
-    # تشغيل خدمة التصنيف
     try:
-        report_type_id, confidence, info = clf.predict(image_bytes)
+        result = await analyze_image_bytes(image_bytes, gov_id, dist_id, area_id, db, clf)
+    except InferenceQueueFull as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="خدمة تحليل الصور مشغولة حالياً، يرجى المحاولة بعد قليل.",
+            headers={"Retry-After": str(e.retry_after)},
+        ) from e
+
+    server_timing = timing_header(timer)
+    if server_timing:
+        response.headers["Server-Timing"] = server_timing
+    return result
+
+
+async def analyze_image_bytes(
+    image_bytes: bytes,
+    gov_id: int,
+    dist_id: int,
+    area_id: int,
+    db: Session,
+    clf: ReportClassifierService,
+) -> AnalyzeImageResponse:
+    """
+    تحليل صورة تمت قراءتها مسبقاً (يُستخدم في الطلب المتزامن وفي المهام غير المتزامنة).
+    يرفع InferenceQueueFull عندما تكون خدمة التحليل مشغولة،
+    ويتولى المستدعي تحويلها إلى 503 أو إعادة المحاولة.
+    """
+    image_hash, prediction = await classify_image_bytes(image_bytes, clf)
+
+    with timed("db_lookup"):
+        gov = db.get(models.Government, gov_id) if gov_id else None
+        dist = db.get(models.District, dist_id) if dist_id else None
+        area = db.get(models.Area, area_id) if area_id else None
+
+    return build_analysis(
+        image_hash,
+        prediction,
+        gov.name_ar if gov else None,
+        dist.name_ar if dist else None,
+        area.name_ar if area else None,
+        area_id,
+        db,
+        clf,
+    )
+
+
+async def classify_image_bytes(
+    image_bytes: bytes,
+    clf: ReportClassifierService,
+) -> Tuple[Optional[int], Tuple[int, float, Dict[str, Any]]]:
+    """
+    بصمة الصورة (pHash) + التصنيف، بدون أي وصول لقاعدة البيانات.
+    يرجع (image_hash, (report_type_id, confidence, info)).
+    """
+    # تشغيل خدمة التصنيف (خارج حلقة الأحداث، مع حد أقصى للطلبات المعلّقة)
+    try:
+        with timed("phash"):
+            image_hash = await hash_image(image_bytes)
+        with timed("classify"):
+            report_type_id, confidence, info = await classify_image(
+                clf,
+                image_bytes,
+                confidence_threshold=CONFIDENCE_THRESHOLD,
+                image_hash=image_hash,
+            )
+    except InferenceQueueFull:
+        raise
     except Exception as e:
         print("AI analyze-image error:", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="حدث خطأ أثناء تحليل الصورة.",
         ) from e
+    return image_hash, (report_type_id, confidence, info)
+
+
+def build_analysis(
+    image_hash: Optional[int],
+    prediction: Tuple[int, float, Dict[str, Any]],
+    gov_name_ar: Optional[str],
+    dist_name_ar: Optional[str],
+    area_name_ar: Optional[str],
+    area_id: int,
+    db: Session,
+    clf: ReportClassifierService,
+) -> AnalyzeImageResponse:
+    """
+    بناء رد التحليل من نتيجة التصنيف وأسماء الموقع:
+    فلتر OTHERS، البلاغات المكررة المحتملة، والعنوان/الوصف المقترحين.
+    """
+    report_type_id, confidence, info = prediction
 
-    # أسماء المواقع (اختياري)
-    gov = db.get(models.Government, gov_id) if gov_id else None
-    dist = db.get(models.District, dist_id) if dist_id else None
-    area = db.get(models.Area, area_id) if area_id else None
+    duplicate_report_ids: List[int] = []
+    if image_hash is not None:
+        try:
+            with timed("duplicate_lookup"):
+                duplicate_report_ids = get_report_hash_index().find(
+                    db, image_hash, area_id=area_id or None
+                )
+        except SQLAlchemyError:
+            db.rollback()
 
-    gov_name_ar = gov.name_ar if gov else "غير محدد"
-    dist_name_ar = dist.name_ar if dist else "غير محدد"
-    area_name_ar = area.name_ar if area else "غير محدد"
+    # أسماء المواقع (اختياري)
+    gov_name_ar = gov_name_ar or "غير محدد"
+    dist_name_ar = dist_name_ar or "غير محدد"
+    area_name_ar = area_name_ar or "غير محدد"
 
     # معلومات التصنيف من خدمة YOLO
     report_type_name_ar = info.get("name_ar", OTHERS_NAME_AR)
@@ -599,9 +806,186 @@ async def ai_analyze_image(
         class_name=report_type_code,
         suggested_title=suggested_title,
         suggested_description=suggested_description,
+        duplicate_report_ids=duplicate_report_ids,
+        model_version=getattr(clf, "model_version", None),
+    )
+
+
+# ============================================================
+# Endpoint: Upload + Analyze + Resolve Location (طلب واحد)
+# ============================================================
+
+
+@router.post("/analyze-upload", response_model=AnalyzeUploadResponse)
+async def ai_analyze_upload(
+    response: Response,
+    file: UploadFile = File(...),
+    latitude: float = Form(...),
+    longitude: float = Form(...),
+    db: Session = Depends(get_db),
+    clf: ReportClassifierService = Depends(get_classifier_service),
+    timer: Optional[RequestTimer] = Depends(request_timing),
+):
+    """
+    بديل لثلاثة طلبات (/uploads ثم /ai/analyze-image ثم /ai/resolve-location):
+    تُحفظ الصورة على القرص مرة واحدة، ثم يعمل التصنيف وتحديد الموقع بالتوازي.
+    فشل تحديد الموقع لا يُفشل الطلب (location = None مع location_error).
+    """
+    with timed("upload_save"):
+        url, image_bytes = await save_upload(file, keep_bytes=True)
+    if not image_bytes:
+        delete_upload(url)
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="ملف الصورة فارغ.",
+        )
+
+    classification, location = await asyncio.gather(
+        classify_image_bytes(image_bytes, clf),
+        resolve_location(latitude, longitude, db),
+        return_exceptions=True,
+    )
+
+    if isinstance(classification, BaseException):
+        delete_upload(url)
+        if isinstance(classification, InferenceQueueFull):
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="خدمة تحليل الصور مشغولة حالياً، يرجى المحاولة بعد قليل.",
+                headers={"Retry-After": str(classification.retry_after)},
+            ) from classification
+        raise classification
+
+    location_error: Optional[str] = None
+    if isinstance(location, BaseException):
+        if not isinstance(location, HTTPException):
+            print("AI analyze-upload location error:", location)
+        location_error = getattr(location, "detail", None) or "تعذّر تحديد الموقع."
+        location = None
+
+    image_hash, prediction = classification
+    analysis = build_analysis(
+        image_hash,
+        prediction,
+        location.government.name_ar if location else None,
+        location.district.name_ar if location else None,
+        location.area.name_ar if location else None,
+        location.area.id if location else 0,
+        db,
+        clf,
+    )
+
+    server_timing = timing_header(timer)
+    if server_timing:
+        response.headers["Server-Timing"] = server_timing
+    return AnalyzeUploadResponse(
+        url=url,
+        analysis=analysis,
+        location=location,
+        location_error=location_error,
+    )
+
+
+# ============================================================
+# Endpoints: Asynchronous analyze jobs
+# ============================================================
+
+
+def _job_response(job: Dict[str, Any]) -> AnalyzeJobResponse:
+    return AnalyzeJobResponse(
+        job_id=job["id"],
+        status=job["status"],
+        created_at=job["created_at"],
+        updated_at=job["updated_at"],
+        result=job.get("result"),
+        error=job.get("error"),
     )
 
 
+@router.post(
+    "/analyze-image/jobs",
+    response_model=AnalyzeJobResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+)
+async def ai_analyze_image_job(
+    file: UploadFile = File(...),
+    gov_id: int = 0,
+    dist_id: int = 0,
+    area_id: int = 0,
+    clf: ReportClassifierService = Depends(get_classifier_service),
+):
+    """
+    نسخة غير متزامنة من /ai/analyze-image:
+    تستقبل الصورة وتضعها في قائمة الانتظار وترجع job_id فوراً،
+    ثم يستعلم العميل عن النتيجة عبر GET /ai/analyze-image/jobs/{job_id}.
+    """
+    image_bytes = await file.read()
+    if not image_bytes:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="ملف الصورة فارغ.",
+        )
+
+    runner = get_job_runner()
+    if runner.full():
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="خدمة تحليل الصور مشغولة حالياً، يرجى المحاولة بعد قليل.",
+            headers={"Retry-After": str(AI_INFERENCE_RETRY_AFTER)},
+        )
+
+    job = await get_job_store().create()
+
+    async def work() -> Dict[str, Any]:
+        # جلسة قاعدة بيانات خاصة بالمهمة (جلسة الطلب تُغلق بعد الرد)
+        db = SessionLocal()
+        try:
+            result = await analyze_image_bytes(image_bytes, gov_id, dist_id, area_id, db, clf)
+        finally:
+            db.close()
+        return result.model_dump(by_alias=True)
+
+    runner.submit(job["id"], work)
+    return _job_response(job)
+
+
+@router.get("/analyze-image/jobs/{job_id}", response_model=AnalyzeJobResponse)
+async def ai_analyze_image_job_status(job_id: str, response: Response):
+    """حالة مهمة التحليل ونتيجتها (تُحذف بعد انتهاء صلاحيتها AI_JOB_TTL)."""
+    job = await get_job_store().get(job_id)
+    if job is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="المهمة غير موجودة أو انتهت صلاحيتها.",
+        )
+    if job["status"] in ("queued", "running"):
+        response.headers["Retry-After"] = "1"
+    return _job_response(job)
+
+
+# ============================================================
+# Endpoint: Result cache stats
+# ============================================================
+
+
+@router.get("/cache-stats")
+def ai_cache_stats():
+    """
+    عدّادات كاش نتائج التصنيف (hits / misses / عدد العناصر)
+    وفهرس الصور شبه المطابقة (perceptual hash) وكاش تحديد الموقع الجغرافي.
+    """
+    return {
+        "results": get_prediction_cache().stats(),
+        "geocode": get_geocode_cache().stats(),
+        "geocode_flights": get_geocode_flights().stats(),
+        "geocoder": get_geocoder().stats(),
+        "offline_geocode": get_location_index().stats(),
+        "boundaries": get_boundary_index().stats(),
+        "near_duplicates": get_classification_index().stats(),
+        "jobs": get_job_runner().stats(),
+    }
+
+
 # ============================================================
 # Debug endpoint: raw reverse geocoding (للاختبار فقط)
 # ============================================================
@@ -0,0 +1,30 @@
+# app/routers/health.py
+from __future__ import annotations
+
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+
+from app.ml.warmup import readiness
+
+router = APIRouter(
+    prefix="/health",
+    tags=["Health"],
+)
+
+
+@router.get("/live")
+def live():
+    """العملية تعمل (لا يعتمد على حالة النموذج)."""
+    return {"status": "ok"}
+
+
+@router.get("/ready")
+def ready():
+    """
+    جاهزية استقبال طلبات التحليل:
+    503 أثناء تحميل/تسخين النموذج أو عند فشل التحميل.
+    """
+    body = readiness.as_dict()
+    if not readiness.ready:
+        return JSONResponse(status_code=503, content=body, headers={"Retry-After": "5"})
+    return body
@@ -0,0 +1,170 @@
+# app/routers/metrics.py
+from __future__ import annotations
+
+from typing import List
+
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from app.metrics import metric_lines, register_collector, render_metrics
+from app.ml.inference_executor import get_inference_executor
+from app.ml.model_registry import get_model_registry
+from app.ml.near_duplicates import get_classification_index
+from app.ml.result_cache import get_prediction_cache
+from app.services.geocode_cache import get_geocode_cache
+from app.services import geocoding
+from app.services.geocoding import get_geocode_flights, get_geocoder
+from app.services.boundaries import get_boundary_index
+from app.services.offline_geocoder import get_location_index
+
+router = APIRouter(tags=["Metrics"])
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _ai_counters() -> List[str]:
+    cache = get_prediction_cache().stats()
+    near = get_classification_index().stats()
+    executor = get_inference_executor().stats()
+    geocode = get_geocode_cache().stats()
+    flights = get_geocode_flights().stats()
+    geocoder = get_geocoder().stats()
+    offline = get_location_index().stats()
+    boundaries = get_boundary_index().stats()
+    lines: List[str] = []
+    lines += metric_lines(
+        "basma_result_cache_lookups_total",
+        "counter",
+        "Result cache lookups by outcome.",
+        [({"outcome": "hit"}, cache["hits"]), ({"outcome": "miss"}, cache["misses"])],
+    )
+    lines += metric_lines(
+        "basma_near_duplicate_lookups_total",
+        "counter",
+        "Perceptual-hash classification index lookups by outcome.",
+        [({"outcome": "hit"}, near["hits"]), ({"outcome": "miss"}, near["misses"])],
+    )
+    lines += metric_lines(
+        "basma_geocode_cache_lookups_total",
+        "counter",
+        "Reverse-geocode cache lookups by outcome (disk = hit served from SQLite).",
+        [
+            ({"outcome": "memory"}, geocode["hits"] - geocode["disk_hits"]),
+            ({"outcome": "disk"}, geocode["disk_hits"]),
+            ({"outcome": "miss"}, geocode["misses"]),
+        ],
+    )
+    lines += metric_lines(
+        "basma_geocode_cache_entries",
+        "gauge",
+        "Reverse-geocode cells held in this worker's memory.",
+        [({}, geocode["entries"])],
+    )
+    lines += metric_lines(
+        "basma_geocode_singleflight_total",
+        "counter",
+        "Remote reverse-geocode lookups by role: leader = sent, coalesced = waited on a leader.",
+        [({"role": "leader"}, flights["leaders"]), ({"role": "coalesced"}, flights["coalesced"])],
+    )
+    lines += metric_lines(
+        "basma_geocode_inflight",
+        "gauge",
+        "Remote reverse-geocode lookups currently in flight.",
+        [({}, flights["in_flight"])],
+    )
+    lines += metric_lines(
+        "basma_geocoder_requests_total",
+        "counter",
+        "HTTP requests sent to the remote geocoder (retries included).",
+        [({}, geocoder["requests"])],
+    )
+    lines += metric_lines(
+        "basma_geocoder_retries_total",
+        "counter",
+        "Remote geocoder retries after a timeout, 429 or 5xx.",
+        [({}, geocoder["retries"])],
+    )
+    lines += metric_lines(
+        "basma_geocoder_unavailable_total",
+        "counter",
+        "Lookups not answered by the geocoder by reason.",
+        [
+            ({"reason": "failed"}, geocoder["failures"]),
+            ({"reason": "circuit_open"}, geocoder["circuit_refused"]),
+            ({"reason": "rate_limited"}, geocoder["rate_limited"]),
+        ],
+    )
+    lines += metric_lines(
+        "basma_geocoder_circuit_state",
+        "gauge",
+        "Geocoder circuit breaker state (0 closed, 1 half-open, 2 open).",
+        [({}, {"closed": 0, "half_open": 1, "open": 2}[geocoder["circuit"]])],
+    )
+    lines += metric_lines(
+        "basma_geocoder_circuit_opens_total",
+        "counter",
+        "Times the geocoder circuit breaker opened.",
+        [({}, geocoder["circuit_opens"])],
+    )
+    lines += metric_lines(
+        "basma_geocode_stale_fallbacks_total",
+        "counter",
+        "Lookups answered from an expired cache cell while the geocoder was unavailable.",
+        [({}, geocoding.stale_fallbacks)],
+    )
+    lines += metric_lines(
+        "basma_offline_geocode_lookups_total",
+        "counter",
+        "Offline (known-location) resolutions by outcome; fallback = remote geocoder used.",
+        [({"outcome": "hit"}, offline["hits"]), ({"outcome": "fallback"}, offline["fallbacks"])],
+    )
+    lines += metric_lines(
+        "basma_boundary_lookups_total",
+        "counter",
+        "Point-in-polygon governorate/district lookups by outcome.",
+        [({"outcome": "hit"}, boundaries["hits"]), ({"outcome": "miss"}, boundaries["misses"])],
+    )
+    lines += metric_lines(
+        "basma_inference_pending",
+        "gauge",
+        "Analyses admitted to the inference executor (running + waiting).",
+        [({}, executor["pending"])],
+    )
+    lines += metric_lines(
+        "basma_inference_rejected_total",
+        "counter",
+        "Analyses rejected with 503 because the inference queue was full.",
+        [({}, executor["rejected"])],
+    )
+    registry = get_model_registry()
+    model = registry.status()
+    if model["loaded"]:
+        lines += metric_lines(
+            "basma_model_info",
+            "gauge",
+            "Active classifier model (value is always 1).",
+            [(
+                {
+                    "version": str(model["version"]),
+                    "backend": str(model["backend"]),
+                    "variant": str(model["variant"]),
+                },
+                1,
+            )],
+        )
+    lines += metric_lines(
+        "basma_model_reloads_total",
+        "counter",
+        "Model hot reloads by outcome.",
+        [({"outcome": "success"}, model["reloads"]), ({"outcome": "failure"}, model["failures"])],
+    )
+    return lines
+
+
+register_collector(_ai_counters)
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    """Prometheus exposition: stage latency histograms + AI counters."""
+    return PlainTextResponse(render_metrics(), media_type=PROMETHEUS_CONTENT_TYPE)
@@ -0,0 +1,197 @@
+# app/services/boundaries.py
+"""
+Governorate / district resolution by point-in-polygon.
+
+``GEOCODER_BOUNDARIES_PATH`` points to a GeoJSON FeatureCollection of
+``Polygon`` / ``MultiPolygon`` features (coordinates in lon/lat) with:
+
+- ``level``: ``"government"`` (or ``"governorate"``) / ``"district"``
+- ``government_id`` / ``district_id``: database row IDs, or
+- ``name_ar``: matched against ``governments.name_ar`` /
+  ``districts.name_ar`` (districts within the containing governorate)
+"""
+from __future__ import annotations
+
+import json
+import logging
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app import models
+from app.services.spatial import STRtree, point_in_polygon, ring_bbox
+from app.settings import GEOCODER_BOUNDARIES_PATH
+
+logger = logging.getLogger("basma.geocoding")
+
+GOVERNMENT = "government"
+DISTRICT = "district"
+_LEVELS = {"government": GOVERNMENT, "governorate": GOVERNMENT, "district": DISTRICT}
+
+# (feature index, level, polygon rings)
+Polygon = Tuple[int, str, List[List[Tuple[float, float]]]]
+
+
+def _polygons(geometry: Dict[str, Any]) -> List[List[List[Tuple[float, float]]]]:
+    kind = (geometry or {}).get("type")
+    coords = (geometry or {}).get("coordinates") or []
+    if kind == "Polygon":
+        polygons = [coords]
+    elif kind == "MultiPolygon":
+        polygons = coords
+    else:
+        return []
+    return [
+        [[(float(p[0]), float(p[1])) for p in ring] for ring in polygon if ring]
+        for polygon in polygons
+        if polygon
+    ]
+
+
+class BoundaryIndex:
+    """
+    STR R-tree over the bounding boxes of every boundary polygon; a lookup
+    runs the exact ray-casting test only on the few polygons whose box
+    contains the point. Feature → database row IDs are memoised once
+    found; a feature without a matching row is looked up again next time,
+    so governorates/districts created after startup are picked up.
+    """
+
+    def __init__(self, path: Optional[str] = GEOCODER_BOUNDARIES_PATH) -> None:
+        self.path = path
+        self.features: List[Dict[str, Any]] = []
+        self.hits = 0
+        self.misses = 0
+        self._tree: STRtree[Polygon] = STRtree([])
+        self._row_ids: Dict[int, int] = {}
+        self._lock = threading.Lock()
+        if path:
+            self.load(path)
+
+    @property
+    def enabled(self) -> bool:
+        return len(self._tree) > 0
+
+    @property
+    def bounds(self) -> Optional[Tuple[float, float, float, float]]:
+        """``(min_lon, min_lat, max_lon, max_lat)`` of all polygons."""
+        return self._tree.bounds
+
+    def load(self, path: str) -> None:
+        with open(path, encoding="utf-8") as fh:
+            collection = json.load(fh)
+        features: List[Dict[str, Any]] = []
+        items = []
+        for feature in collection.get("features") or []:
+            props = feature.get("properties") or {}
+            level = _LEVELS.get(str(props.get("level", "")).strip().lower())
+            if level is None:
+                continue
+            index = len(features)
+            features.append({"level": level, **props})
+            for rings in _polygons(feature.get("geometry")):
+                items.append((ring_bbox(rings[0]), (index, level, rings)))
+        tree: STRtree[Polygon] = STRtree(items)
+        with self._lock:
+            self.features = features
+            self._tree = tree
+            self._row_ids = {}
+        logger.info("loaded %d boundary polygons from %s", len(items), path)
+
+    def locate(self, lat: float, lon: float) -> Tuple[Optional[int], Optional[int]]:
+        """Feature indexes of the governorate and district containing the point."""
+        government: Optional[int] = None
+        district: Optional[int] = None
+        for index, level, rings in self._tree.query_point(lon, lat):
+            if level == GOVERNMENT and government is not None:
+                continue
+            if level == DISTRICT and district is not None:
+                continue
+            if point_in_polygon(lon, lat, rings):
+                if level == GOVERNMENT:
+                    government = index
+                else:
+                    district = index
+        return government, district
+
+    def _row_id(self, db: Session, index: int, government_id: Optional[int]) -> Optional[int]:
+        with self._lock:
+            if index in self._row_ids:
+                return self._row_ids[index]
+        props = self.features[index]
+        name = str(props.get("name_ar") or "").strip()
+        row_id: Optional[int] = None
+        if props["level"] == GOVERNMENT:
+            row_id = props.get("government_id")
+            if row_id is None and name:
+                row = db.query(models.Government.id).filter(models.Government.name_ar == name).first()
+                row_id = row[0] if row else None
+        else:
+            row_id = props.get("district_id")
+            if row_id is None and name:
+                query = db.query(models.District.id).filter(models.District.name_ar == name)
+                if government_id:
+                    query = query.filter(models.District.government_id == government_id)
+                row = query.first()
+                row_id = row[0] if row else None
+        if row_id is None:
+            return None
+        row_id = int(row_id)
+        with self._lock:
+            self._row_ids[index] = row_id
+        return row_id
+
+    def resolve(
+        self,
+        db: Session,
+        lat: float,
+        lon: float,
+    ) -> Optional[Tuple[models.Government, models.District]]:
+        """Government and district rows containing the point, or ``None``."""
+        if not self.enabled:
+            return None
+        gov_index, dist_index = self.locate(lat, lon)
+        gov = dist = None
+        if gov_index is not None:
+            gov_id = self._row_id(db, gov_index, None)
+            gov = db.get(models.Government, gov_id) if gov_id else None
+        if dist_index is not None:
+            dist_id = self._row_id(db, dist_index, gov.id if gov else None)
+            dist = db.get(models.District, dist_id) if dist_id else None
+        if dist is not None and (gov is None or dist.government_id != gov.id):
+            gov = db.get(models.Government, dist.government_id)
+        with self._lock:
+            if gov is None or dist is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return gov, dist
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "path": self.path,
+                "features": len(self.features),
+                "polygons": len(self._tree),
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+# Singleton instance (per API worker)
+_index: Optional[BoundaryIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_boundary_index() -> BoundaryIndex:
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                try:
+                    _index = BoundaryIndex(GEOCODER_BOUNDARIES_PATH)
+                except Exception as exc:  # noqa: BLE001 - any bad file disables the index
+                    logger.error("boundary polygons not loaded: %s: %s", type(exc).__name__, exc)
+                    _index = BoundaryIndex(path=None)
+    return _index
@@ -0,0 +1,207 @@
+# app/services/geocode_cache.py
+from __future__ import annotations
+
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from app.services.geohash import encode
+from app.settings import (
+    GEOCODER_CACHE_PATH,
+    GEOCODER_CACHE_PRECISION,
+    GEOCODER_CACHE_SIZE,
+    GEOCODER_CACHE_TTL,
+)
+from app.sqlite_store import SQLiteStore
+
+Address = Dict[str, Any]
+
+# Expired cells are deleted from disk only after this many TTLs
+STALE_KEEP_FACTOR = 2
+
+SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS reverse_geocode ("
+    " cell TEXT PRIMARY KEY,"
+    " address TEXT NOT NULL,"
+    " created_at REAL NOT NULL)",
+)
+
+
+class GeocodeCache:
+    """
+    Reverse-geocode answers by geohash cell.
+
+    Every coordinate inside one cell (``precision`` characters) shares the
+    answer of the first lookup there. Same layout as ``PredictionCache``:
+    a bounded in-memory LRU with TTL, used directly on the event loop, in
+    front of a local SQLite file that survives restarts and is shared by
+    the workers on the host. The file is only touched from an
+    ``SQLiteStore`` thread (``get`` awaits reads there, ``put`` queues the
+    write). Disk errors are swallowed: the cache must never fail a request.
+    """
+
+    def __init__(
+        self,
+        precision: int = GEOCODER_CACHE_PRECISION,
+        max_entries: int = GEOCODER_CACHE_SIZE,
+        ttl_seconds: float = GEOCODER_CACHE_TTL,
+        path: Optional[str] = GEOCODER_CACHE_PATH,
+    ) -> None:
+        self.precision = int(precision)
+        self.max_entries = max(0, int(max_entries))
+        self.ttl = max(0.0, float(ttl_seconds))
+        self.path = (path or None) if self.max_entries else None
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, Tuple[float, Address]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk = SQLiteStore(self.path, name="geocode-cache", schema=SCHEMA) if self.path else None
+
+    def key(self, lat: float, lon: float) -> str:
+        return encode(lat, lon, self.precision)
+
+    # -------------------------
+    # SQLite backing store (runs on the store thread)
+    # -------------------------
+
+    def _disk_get(
+        self,
+        conn: sqlite3.Connection,
+        cell: str,
+        now: float,
+        allow_stale: bool = False,
+    ) -> Optional[Address]:
+        row = conn.execute(
+            "SELECT address, created_at FROM reverse_geocode WHERE cell = ?",
+            (cell,),
+        ).fetchone()
+        if row is None:
+            return None
+        address, created_at = row
+        if self.ttl and now - created_at > self.ttl and not allow_stale:
+            return None
+        return json.loads(address)
+
+    def _disk_put(self, conn: sqlite3.Connection, cell: str, value: Address, now: float) -> None:
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO reverse_geocode (cell, address, created_at) VALUES (?, ?, ?)",
+                (cell, json.dumps(value, ensure_ascii=False), now),
+            )
+
+    def _purge(self, conn: sqlite3.Connection, before: float) -> int:
+        with conn:
+            cur = conn.execute("DELETE FROM reverse_geocode WHERE created_at < ?", (before,))
+        return cur.rowcount
+
+    async def _read(self, cell: str, now: float, allow_stale: bool = False) -> Optional[Address]:
+        if self._disk is None:
+            return None
+        try:
+            return await self._disk.run(self._disk_get, cell, now, allow_stale)
+        except sqlite3.Error:
+            return None
+
+    def purge_expired(self) -> None:
+        """
+        Queue deletion of rows from the SQLite file that expired more than
+        one TTL ago (recently expired cells stay as an outage fallback).
+        """
+        if self._disk is not None and self.ttl:
+            self._disk.submit(self._purge, time.time() - STALE_KEEP_FACTOR * self.ttl)
+
+    # -------------------------
+    # Public API
+    # -------------------------
+
+    async def get(self, lat: float, lon: float, allow_stale: bool = False) -> Optional[Address]:
+        """
+        Cached answer for the coordinate's cell. ``allow_stale`` also returns
+        expired entries (still on disk until purged), without touching the
+        hit/miss counters: a fallback for when the geocoder is unavailable.
+        """
+        if not self.max_entries:
+            return None
+        cell = self.key(lat, lon)
+        now = time.time()
+        if allow_stale:
+            with self._lock:
+                entry = self._entries.get(cell)
+            if entry is not None:
+                return dict(entry[1])
+            return await self._read(cell, now, allow_stale=True)
+        with self._lock:
+            entry = self._entries.get(cell)
+            if entry is not None:
+                created_at, value = entry
+                if not self.ttl or now - created_at <= self.ttl:
+                    self._entries.move_to_end(cell)
+                    self.hits += 1
+                    return dict(value)
+                del self._entries[cell]
+
+        value = await self._read(cell, now)
+        with self._lock:
+            if value is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.disk_hits += 1
+            self._store(cell, value, now)
+        return dict(value)
+
+    def put(self, lat: float, lon: float, value: Address) -> None:
+        """Store in memory now; the disk write is queued, not awaited."""
+        if not self.max_entries:
+            return
+        cell = self.key(lat, lon)
+        now = time.time()
+        value = dict(value)
+        with self._lock:
+            self._store(cell, value, now)
+        if self._disk is not None:
+            self._disk.submit(self._disk_put, cell, value, now)
+
+    def _store(self, cell: str, value: Address, now: float) -> None:
+        self._entries[cell] = (now, value)
+        self._entries.move_to_end(cell)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            stats = {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "precision": self.precision,
+                "ttl_seconds": self.ttl,
+                "persistent": bool(self.path),
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": (self.hits / lookups) if lookups else 0.0,
+            }
+        if self._disk is not None:
+            stats["disk"] = self._disk.stats()
+        return stats
+
+
+# Singleton instance (per API worker; the SQLite file is shared on the host)
+_cache: Optional[GeocodeCache] = None
+
+
+def get_geocode_cache() -> GeocodeCache:
+    global _cache
+    if _cache is None:
+        _cache = GeocodeCache()
+        _cache.purge_expired()
+    return _cache
@@ -0,0 +1,268 @@
+# app/services/geocoding.py
+from __future__ import annotations
+
+import asyncio
+import importlib.util
+from typing import Any, Dict, Optional, Union
+
+import httpx
+
+from app.services.geocode_cache import get_geocode_cache
+from app.services.resilience import CircuitBreaker, ServiceUnavailable, TokenBucket, backoff_delay
+from app.services.singleflight import SingleFlight
+from app.settings import (
+    GEOCODER_BREAKER_FAILURES,
+    GEOCODER_BREAKER_RESET_SECONDS,
+    GEOCODER_CONNECT_TIMEOUT,
+    GEOCODER_HTTP2,
+    GEOCODER_KEEPALIVE_SECONDS,
+    GEOCODER_MAX_CONNECTIONS,
+    GEOCODER_RATE_BURST,
+    GEOCODER_RATE_LIMIT,
+    GEOCODER_RATE_MAX_WAIT,
+    GEOCODER_RETRIES,
+    GEOCODER_RETRY_BACKOFF,
+    GEOCODER_TIMEOUT,
+    GEOCODER_URL,
+    GEOCODER_USER_AGENT,
+)
+
+# Answers worth retrying (rate limited / upstream trouble)
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+# Longest Retry-After from the geocoder we are willing to sleep inside a request
+MAX_RETRY_AFTER = 5.0
+
+
+class GeocoderUnavailable(ServiceUnavailable):
+    """The geocoder was not called (circuit open / rate limit) or kept failing."""
+
+
+def http2_available() -> bool:
+    return importlib.util.find_spec("h2") is not None
+
+
+class GeocodingClient:
+    """
+    Reverse geocoding over one pooled ``httpx.AsyncClient``.
+
+    Connections to the geocoder are kept alive between calls, so only the
+    first request (or the first after ``keepalive_seconds`` idle) pays the
+    TCP + TLS handshake.
+
+    Every request takes a token from a per-worker bucket; transport errors,
+    429 and 5xx are retried with jittered backoff; a call that still fails
+    counts towards the circuit breaker. ``reverse`` raises
+    ``GeocoderUnavailable`` when the call was refused or kept failing, and
+    ``httpx.HTTPError`` for other errors (e.g. 4xx); callers turn them into
+    their own error response.
+    """
+
+    def __init__(
+        self,
+        url: str = GEOCODER_URL,
+        timeout: float = GEOCODER_TIMEOUT,
+        connect_timeout: float = GEOCODER_CONNECT_TIMEOUT,
+        max_connections: int = GEOCODER_MAX_CONNECTIONS,
+        keepalive_seconds: float = GEOCODER_KEEPALIVE_SECONDS,
+        http2: bool = GEOCODER_HTTP2,
+        user_agent: str = GEOCODER_USER_AGENT,
+        verify: Union[bool, str] = True,
+        rate_limit: float = GEOCODER_RATE_LIMIT,
+        rate_burst: float = GEOCODER_RATE_BURST,
+        rate_max_wait: float = GEOCODER_RATE_MAX_WAIT,
+        retries: int = GEOCODER_RETRIES,
+        retry_backoff: float = GEOCODER_RETRY_BACKOFF,
+        breaker_failures: int = GEOCODER_BREAKER_FAILURES,
+        breaker_reset_seconds: float = GEOCODER_BREAKER_RESET_SECONDS,
+    ) -> None:
+        self.url = url
+        self.timeout = httpx.Timeout(timeout, connect=min(connect_timeout, timeout))
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_connections,
+            keepalive_expiry=keepalive_seconds,
+        )
+        self.http2 = bool(http2) and http2_available()
+        self.headers = {"User-Agent": user_agent, "Accept-Language": "ar,en"}
+        self.verify = verify
+        self.bucket = TokenBucket(rate_limit, rate_burst)
+        self.rate_max_wait = max(0.0, float(rate_max_wait))
+        self.retries = max(0, int(retries))
+        self.retry_backoff = max(0.0, float(retry_backoff))
+        self.breaker = CircuitBreaker(breaker_failures, breaker_reset_seconds)
+        self.requests = 0
+        self.retried = 0
+        self.failed = 0
+        self.refused = 0
+        self._client: Optional[httpx.AsyncClient] = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        # created lazily too, for code paths that run without the app startup
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                timeout=self.timeout,
+                limits=self.limits,
+                http2=self.http2,
+                headers=self.headers,
+                verify=self.verify,
+            )
+        return self._client
+
+    async def reverse(self, lat: float, lon: float) -> Dict[str, Any]:
+        """Nominatim ``/reverse`` JSON for a coordinate (zoom 16, with address details)."""
+        params = {
+            "format": "json",
+            "lat": lat,
+            "lon": lon,
+            "zoom": 16,
+            "addressdetails": 1,
+            "accept-language": "ar,en",
+        }
+        # ask the breaker first: a refused call never takes a rate token
+        if not self.breaker.allow():
+            self.refused += 1
+            raise GeocoderUnavailable("circuit open", self.breaker.retry_after())
+        probe = self.breaker.probing
+        try:
+            return await self._call(params)
+        finally:
+            # a probe that ended without an outcome (refused a token before
+            # anything was sent, cancelled) must not leave the breaker stuck
+            # half-open
+            if probe and self.breaker.probing:
+                self.breaker.release()
+
+    async def _call(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        error: Optional[Exception] = None
+        retry_after: Optional[float] = None
+        for attempt in range(self.retries + 1):
+            if attempt:
+                self.retried += 1
+                await asyncio.sleep(
+                    retry_after if retry_after is not None else backoff_delay(attempt, self.retry_backoff)
+                )
+            try:
+                await self._take_token()
+            except GeocoderUnavailable:
+                if error is None:
+                    raise
+                # no budget left for a retry: the call failed with ``error``
+                break
+
+            self.requests += 1
+            retry_after = None
+            try:
+                resp = await self.client.get(self.url, params=params)
+            except httpx.HTTPError as exc:
+                error = exc
+                continue
+            if resp.status_code in RETRY_STATUSES:
+                error = httpx.HTTPStatusError(
+                    f"geocoder answered {resp.status_code}", request=resp.request, response=resp
+                )
+                retry_after = _retry_after(resp)
+                continue
+            # any other answer means the geocoder is up
+            self.breaker.record_success()
+            resp.raise_for_status()
+            return resp.json()
+
+        self.failed += 1
+        self.breaker.record_failure()
+        raise GeocoderUnavailable(f"geocoder failed: {error}", retry_after or 1.0) from error
+
+    async def _take_token(self) -> None:
+        wait = self.bucket.reserve(self.rate_max_wait)
+        if wait is None:
+            raise GeocoderUnavailable("rate limited", 1.0 / self.bucket.rate)
+        if wait:
+            await asyncio.sleep(wait)
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def stats(self) -> dict:
+        return {
+            "url": self.url,
+            "http2": self.http2,
+            "max_connections": self.limits.max_connections,
+            "requests": self.requests,
+            "retries": self.retried,
+            "failures": self.failed,
+            "circuit_refused": self.refused,
+            "rate_limited": self.bucket.rejected,
+            "circuit": self.breaker.state,
+            "circuit_opens": self.breaker.opens,
+        }
+
+
+def _retry_after(resp: httpx.Response) -> Optional[float]:
+    try:
+        value = float(resp.headers.get("Retry-After", ""))
+    except ValueError:
+        return None
+    return min(max(0.0, value), MAX_RETRY_AFTER)
+
+
+# Singleton instance (per API worker)
+_geocoder: Optional[GeocodingClient] = None
+
+
+def get_geocoder() -> GeocodingClient:
+    global _geocoder
+    if _geocoder is None:
+        _geocoder = GeocodingClient()
+    return _geocoder
+
+
+async def start_geocoder() -> GeocodingClient:
+    """Open the pooled client at startup (inside the worker's event loop)."""
+    geocoder = get_geocoder()
+    geocoder.client
+    return geocoder
+
+
+async def close_geocoder() -> None:
+    if _geocoder is not None:
+        await _geocoder.aclose()
+
+
+# Concurrent cache misses for the same geohash cell share one remote call
+_flights: SingleFlight[Dict[str, Any]] = SingleFlight()
+# Answers served from an expired cache cell because the geocoder was unavailable
+stale_fallbacks = 0
+
+
+def get_geocode_flights() -> SingleFlight[Dict[str, Any]]:
+    return _flights
+
+
+async def lookup_address(lat: float, lon: float) -> Dict[str, Any]:
+    """
+    Reverse geocode through the geohash cell cache; only cache misses reach
+    the remote geocoder, and concurrent misses in the same cell wait for a
+    single request. While the geocoder is unavailable an expired answer for
+    the cell is still used. Raises like ``reverse`` otherwise.
+    """
+    global stale_fallbacks
+    cache = get_geocode_cache()
+    address = await cache.get(lat, lon)
+    if address is not None:
+        return address
+
+    async def fetch() -> Dict[str, Any]:
+        result = await get_geocoder().reverse(lat, lon)
+        cache.put(lat, lon, result)
+        return result
+
+    try:
+        return await _flights.do(cache.key(lat, lon), fetch)
+    except GeocoderUnavailable:
+        stale = await cache.get(lat, lon, allow_stale=True)
+        if stale is None:
+            raise
+        stale_fallbacks += 1
+        return stale
@@ -0,0 +1,74 @@
+# app/services/geohash.py
+from __future__ import annotations
+
+from typing import Tuple
+
+BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+
+def encode(lat: float, lon: float, precision: int = 7) -> str:
+    """
+    Geohash of a coordinate: ``precision`` base-32 characters, each
+    refining the cell by alternating longitude/latitude bisections.
+    Precision 6 is ~1.2 km x 0.6 km, 7 ~153 m x 153 m, 8 ~38 m x 19 m.
+    """
+    lat_lo, lat_hi = -90.0, 90.0
+    lon_lo, lon_hi = -180.0, 180.0
+    chars = []
+    bits = 0
+    value = 0
+    even = True
+    while len(chars) < precision:
+        if even:
+            mid = (lon_lo + lon_hi) / 2
+            if lon >= mid:
+                value = (value << 1) | 1
+                lon_lo = mid
+            else:
+                value <<= 1
+                lon_hi = mid
+        else:
+            mid = (lat_lo + lat_hi) / 2
+            if lat >= mid:
+                value = (value << 1) | 1
+                lat_lo = mid
+            else:
+                value <<= 1
+                lat_hi = mid
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(BASE32[value])
+            bits = 0
+            value = 0
+    return "".join(chars)
+
+
+def bounds(cell: str) -> Tuple[float, float, float, float]:
+    """``(min_lat, min_lon, max_lat, max_lon)`` of a geohash cell."""
+    lat_lo, lat_hi = -90.0, 90.0
+    lon_lo, lon_hi = -180.0, 180.0
+    even = True
+    for char in cell:
+        value = BASE32.index(char)
+        for shift in range(4, -1, -1):
+            bit = (value >> shift) & 1
+            if even:
+                mid = (lon_lo + lon_hi) / 2
+                if bit:
+                    lon_lo = mid
+                else:
+                    lon_hi = mid
+            else:
+                mid = (lat_lo + lat_hi) / 2
+                if bit:
+                    lat_lo = mid
+                else:
+                    lat_hi = mid
+            even = not even
+    return lat_lo, lon_lo, lat_hi, lon_hi
+
+
+def center(cell: str) -> Tuple[float, float]:
+    lat_lo, lon_lo, lat_hi, lon_hi = bounds(cell)
+    return (lat_lo + lat_hi) / 2, (lon_lo + lon_hi) / 2
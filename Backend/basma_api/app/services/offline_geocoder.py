@@ -0,0 +1,190 @@
+# app/services/offline_geocoder.py
+from __future__ import annotations
+
+import math
+import threading
+import time
+from typing import Dict, List, NamedTuple, Optional, Set, Tuple
+
+from sqlalchemy.orm import Session
+
+from app import models
+from app.settings import (
+    GEOCODER_OFFLINE_MAX_DISTANCE_M,
+    GEOCODER_OFFLINE_REFRESH_SECONDS,
+)
+
+EARTH_RADIUS_M = 6371008.8
+METRES_PER_DEGREE = 111320.0
+# Grid cell size in degrees (~1.1 km of latitude)
+CELL_DEGREES = 0.01
+
+
+class KnownLocation(NamedTuple):
+    location_id: int
+    area_id: int
+    district_id: int
+    government_id: int
+    latitude: float
+    longitude: float
+
+
+def haversine_m(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Great-circle distance in metres."""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    d_phi = phi2 - phi1
+    d_lambda = math.radians(lon2 - lon1)
+    a = math.sin(d_phi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    return 2 * EARTH_RADIUS_M * math.asin(min(1.0, math.sqrt(a)))
+
+
+class LocationIndex:
+    """
+    Uniform lat/lon grid of ``locations`` rows (joined up to their area,
+    district and governorate) answering nearest-known-location queries.
+
+    Loaded lazily from the database and refreshed incrementally (rows with
+    ``id`` above the last seen one) at most every ``refresh_seconds``;
+    locations created by this worker are added directly. A query only
+    scans the grid cells that can hold a point within ``max_distance_m``.
+    """
+
+    def __init__(
+        self,
+        max_distance_m: float = GEOCODER_OFFLINE_MAX_DISTANCE_M,
+        refresh_seconds: float = GEOCODER_OFFLINE_REFRESH_SECONDS,
+        cell_degrees: float = CELL_DEGREES,
+    ) -> None:
+        self.max_distance_m = max(0.0, float(max_distance_m))
+        self.refresh_seconds = max(0.0, float(refresh_seconds))
+        self.cell_degrees = float(cell_degrees)
+        self.hits = 0
+        self.misses = 0
+        self._cells: Dict[Tuple[int, int], List[KnownLocation]] = {}
+        self._ids: Set[int] = set()
+        self._last_id = 0
+        self._last_refresh = 0.0
+        self._lock = threading.Lock()
+
+    def _cell(self, lat: float, lon: float) -> Tuple[int, int]:
+        return math.floor(lat / self.cell_degrees), math.floor(lon / self.cell_degrees)
+
+    def _add(self, entry: KnownLocation) -> None:
+        if entry.location_id in self._ids:
+            return
+        self._ids.add(entry.location_id)
+        self._cells.setdefault(self._cell(entry.latitude, entry.longitude), []).append(entry)
+
+    def add(self, entry: KnownLocation) -> None:
+        with self._lock:
+            self._add(entry)
+
+    def refresh(self, db: Session, force: bool = False) -> None:
+        now = time.monotonic()
+        if not force and now - self._last_refresh < self.refresh_seconds:
+            return
+        rows = (
+            db.query(
+                models.Location.id,
+                models.Location.area_id,
+                models.Area.district_id,
+                models.District.government_id,
+                models.Location.latitude,
+                models.Location.longitude,
+            )
+            .join(models.Area, models.Area.id == models.Location.area_id)
+            .join(models.District, models.District.id == models.Area.district_id)
+            .filter(
+                models.Location.id > self._last_id,
+                models.Location.latitude.isnot(None),
+                models.Location.longitude.isnot(None),
+                models.Location.is_active == 1,
+            )
+            .order_by(models.Location.id)
+            .all()
+        )
+        with self._lock:
+            for location_id, area_id, district_id, government_id, lat, lon in rows:
+                self._add(
+                    KnownLocation(
+                        int(location_id),
+                        int(area_id),
+                        int(district_id),
+                        int(government_id),
+                        float(lat),
+                        float(lon),
+                    )
+                )
+                self._last_id = max(self._last_id, int(location_id))
+            self._last_refresh = now
+
+    def nearest(
+        self,
+        db: Session,
+        lat: float,
+        lon: float,
+        max_distance_m: Optional[float] = None,
+    ) -> Optional[Tuple[float, KnownLocation]]:
+        """``(distance_m, location)`` of the closest known location within range."""
+        self.refresh(db)
+        limit = self.max_distance_m if max_distance_m is None else float(max_distance_m)
+        lat_cells = math.ceil(limit / (METRES_PER_DEGREE * self.cell_degrees))
+        cos_lat = max(math.cos(math.radians(lat)), 1e-6)
+        lon_cells = math.ceil(limit / (METRES_PER_DEGREE * cos_lat * self.cell_degrees))
+        row, col = self._cell(lat, lon)
+
+        best: Optional[Tuple[float, KnownLocation]] = None
+        with self._lock:
+            for d_row in range(-lat_cells, lat_cells + 1):
+                for d_col in range(-lon_cells, lon_cells + 1):
+                    for entry in self._cells.get((row + d_row, col + d_col), ()):
+                        dist = haversine_m(lat, lon, entry.latitude, entry.longitude)
+                        if dist <= limit and (best is None or dist < best[0]):
+                            best = (dist, entry)
+            if best is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return best
+
+    def resolve(
+        self,
+        db: Session,
+        lat: float,
+        lon: float,
+        max_distance_m: Optional[float] = None,
+    ) -> Optional[Tuple[models.Government, models.District, models.Area, models.Location]]:
+        """Rows of the nearest known location in range (``None`` → use the remote geocoder)."""
+        found = self.nearest(db, lat, lon, max_distance_m)
+        if found is None:
+            return None
+        entry = found[1]
+        location = db.get(models.Location, entry.location_id)
+        area = db.get(models.Area, entry.area_id)
+        dist = db.get(models.District, entry.district_id)
+        gov = db.get(models.Government, entry.government_id)
+        if not (location and area and dist and gov) or not location.is_active:
+            return None
+        return gov, dist, area, location
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._ids),
+                "max_distance_m": self.max_distance_m,
+                "hits": self.hits,
+                "fallbacks": self.misses,
+                "hit_rate": (self.hits / lookups) if lookups else 0.0,
+            }
+
+
+# Singleton instance (per API worker)
+_index: Optional[LocationIndex] = None
+
+
+def get_location_index() -> LocationIndex:
+    global _index
+    if _index is None:
+        _index = LocationIndex()
+    return _index
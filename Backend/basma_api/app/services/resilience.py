@@ -0,0 +1,115 @@
+# app/services/resilience.py
+from __future__ import annotations
+
+import random
+import time
+from typing import Optional
+
+
+class ServiceUnavailable(Exception):
+    """A call was refused locally (circuit open / rate limit) or kept failing."""
+
+    def __init__(self, reason: str, retry_after: float = 1.0) -> None:
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = max(0.0, float(retry_after))
+
+
+class TokenBucket:
+    """
+    ``rate`` tokens per second, up to ``burst`` saved. ``reserve`` takes a
+    token and returns how long the caller must wait for it (tokens may go
+    negative, which queues callers fairly); a wait above ``max_wait`` is
+    refused instead. Used from one event loop, so there is no await between
+    the check and the update and no lock is needed.
+    """
+
+    def __init__(self, rate: float, burst: float = 1.0) -> None:
+        self.rate = max(0.0, float(rate))
+        self.capacity = max(1.0, float(burst))
+        self.rejected = 0
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+
+    def reserve(self, max_wait: float) -> Optional[float]:
+        """Seconds to wait for a token, or ``None`` if that exceeds ``max_wait``."""
+        if not self.rate:
+            return 0.0
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        wait = max(0.0, (1.0 - self._tokens) / self.rate)
+        if wait > max_wait:
+            self.rejected += 1
+            return None
+        self._tokens -= 1.0
+        return wait
+
+
+class CircuitBreaker:
+    """
+    Closed → open after ``failure_threshold`` consecutive failures; while
+    open every call is refused for ``reset_seconds``; then half-open lets a
+    single probe through, whose outcome closes or re-opens the circuit.
+    A probe that ends without an outcome (cancelled, never sent) must call
+    ``release`` so the next call can probe instead.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 5, reset_seconds: float = 30.0) -> None:
+        self.failure_threshold = max(1, int(failure_threshold))
+        self.reset_seconds = max(0.0, float(reset_seconds))
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opens = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+
+    def retry_after(self) -> float:
+        if self.state != self.OPEN:
+            return 0.0
+        return max(0.0, self._opened_at + self.reset_seconds - time.monotonic())
+
+    def allow(self) -> bool:
+        if self.state == self.OPEN:
+            if self.retry_after() > 0:
+                return False
+            self.state = self.HALF_OPEN
+            self._probe_in_flight = False
+        if self.state == self.HALF_OPEN:
+            if self._probe_in_flight:
+                return False
+            self._probe_in_flight = True
+        return True
+
+    @property
+    def probing(self) -> bool:
+        """True while the half-open probe slot is taken."""
+        return self.state == self.HALF_OPEN and self._probe_in_flight
+
+    def release(self) -> None:
+        """Free the probe slot without recording an outcome."""
+        if self.state == self.HALF_OPEN:
+            self._probe_in_flight = False
+
+    def record_success(self) -> None:
+        self.state = self.CLOSED
+        self.failures = 0
+        self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        self._probe_in_flight = False
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            if self.state != self.OPEN:
+                self.opens += 1
+            self.state = self.OPEN
+            self._opened_at = time.monotonic()
+
+
+def backoff_delay(attempt: int, base: float, cap: float = 5.0) -> float:
+    """Full-jitter exponential backoff: uniform in [0, min(cap, base * 2**attempt)]."""
+    return random.uniform(0.0, min(cap, base * (2 ** max(0, attempt - 1))))
@@ -0,0 +1,50 @@
+# app/services/singleflight.py
+from __future__ import annotations
+
+import asyncio
+from typing import Awaitable, Callable, Dict, Generic, Hashable, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight(Generic[T]):
+    """
+    Coalesces concurrent calls for the same key into one.
+
+    The first caller for a key (the leader) starts ``fn`` as a task; callers
+    arriving while it runs await the same task and get its result or
+    exception. The task is shielded, so a cancelled caller does not cancel
+    the lookup the others are waiting for. Single event loop (per worker).
+    """
+
+    def __init__(self) -> None:
+        self.leaders = 0
+        self.coalesced = 0
+        self._inflight: Dict[Hashable, "asyncio.Task[T]"] = {}
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        task = self._inflight.get(key)
+        if task is None:
+            self.leaders += 1
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda _t, k=key: self._forget(k, _t))
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
+
+    def _forget(self, key: Hashable, task: "asyncio.Task[T]") -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            # retrieved here so an unawaited failure is not logged as "never retrieved"
+            task.exception()
+
+    def stats(self) -> dict:
+        calls = self.leaders + self.coalesced
+        return {
+            "in_flight": len(self._inflight),
+            "leaders": self.leaders,
+            "coalesced": self.coalesced,
+            "coalesce_rate": (self.coalesced / calls) if calls else 0.0,
+        }
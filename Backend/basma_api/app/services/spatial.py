@@ -0,0 +1,110 @@
+# app/services/spatial.py
+from __future__ import annotations
+
+import math
+from typing import Generic, List, Optional, Sequence, Tuple, TypeVar
+
+P = TypeVar("P")
+
+# (min_x, min_y, max_x, max_y)
+BBox = Tuple[float, float, float, float]
+Ring = Sequence[Tuple[float, float]]
+
+
+def ring_bbox(ring: Ring) -> BBox:
+    xs = [p[0] for p in ring]
+    ys = [p[1] for p in ring]
+    return min(xs), min(ys), max(xs), max(ys)
+
+
+def point_in_ring(x: float, y: float, ring: Ring) -> bool:
+    """Even-odd ray casting; the ring may or may not repeat its first point."""
+    inside = False
+    n = len(ring)
+    j = n - 1
+    for i in range(n):
+        xi, yi = ring[i][0], ring[i][1]
+        xj, yj = ring[j][0], ring[j][1]
+        if (yi > y) != (yj > y):
+            cross = (xj - xi) * (y - yi) / (yj - yi) + xi
+            if x < cross:
+                inside = not inside
+        j = i
+    return inside
+
+
+def point_in_polygon(x: float, y: float, rings: Sequence[Ring]) -> bool:
+    """GeoJSON polygon: first ring is the outer boundary, the rest are holes."""
+    if not rings or not point_in_ring(x, y, rings[0]):
+        return False
+    return not any(point_in_ring(x, y, hole) for hole in rings[1:])
+
+
+class STRtree(Generic[P]):
+    """
+    Static R-tree bulk-loaded with Sort-Tile-Recursive packing.
+
+    Items are ``(bbox, payload)``. Leaves hold up to ``node_capacity``
+    items; STR sorts by x centre into vertical slices, then by y centre
+    within each slice, so sibling boxes overlap little. ``query_point``
+    returns the payloads whose box contains the point (candidates for an
+    exact geometry test).
+    """
+
+    __slots__ = ("_root", "_size", "node_capacity")
+
+    def __init__(self, items: Sequence[Tuple[BBox, P]], node_capacity: int = 16) -> None:
+        self.node_capacity = max(2, int(node_capacity))
+        self._size = len(items)
+        # node = (bbox, is_leaf, children); leaf children are (bbox, payload)
+        self._root: Optional[tuple] = None
+        if not items:
+            return
+        level = self._pack(list(items), leaf=True)
+        while len(level) > 1:
+            level = self._pack([(node[0], node) for node in level], leaf=False)
+        self._root = level[0]
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def bounds(self) -> Optional[BBox]:
+        return self._root[0] if self._root is not None else None
+
+    def _pack(self, entries: List[Tuple[BBox, object]], leaf: bool) -> List[tuple]:
+        cap = self.node_capacity
+        n_nodes = math.ceil(len(entries) / cap)
+        n_slices = max(1, math.ceil(math.sqrt(n_nodes)))
+        per_slice = n_slices * cap
+        entries = sorted(entries, key=lambda e: e[0][0] + e[0][2])
+        nodes: List[tuple] = []
+        for s in range(0, len(entries), per_slice):
+            column = sorted(entries[s:s + per_slice], key=lambda e: e[0][1] + e[0][3])
+            for c in range(0, len(column), cap):
+                children = column[c:c + cap]
+                bbox = (
+                    min(e[0][0] for e in children),
+                    min(e[0][1] for e in children),
+                    max(e[0][2] for e in children),
+                    max(e[0][3] for e in children),
+                )
+                nodes.append((bbox, leaf, children if leaf else [e[1] for e in children]))
+        return nodes
+
+    def query_point(self, x: float, y: float) -> List[P]:
+        found: List[P] = []
+        if self._root is None:
+            return found
+        stack = [self._root]
+        while stack:
+            bbox, leaf, children = stack.pop()
+            if not (bbox[0] <= x <= bbox[2] and bbox[1] <= y <= bbox[3]):
+                continue
+            if leaf:
+                for (min_x, min_y, max_x, max_y), payload in children:
+                    if min_x <= x <= max_x and min_y <= y <= max_y:
+                        found.append(payload)
+            else:
+                stack.extend(children)
+        return found
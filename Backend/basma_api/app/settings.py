@@ -0,0 +1,213 @@
+# app/settings.py
+from __future__ import annotations
+
+import os
+import tempfile
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+def env_int(name: str, default: int) -> int:
+    """Read an integer environment variable, falling back to ``default``."""
+    raw = os.getenv(name)
+    if raw is None or not raw.strip():
+        return default
+    try:
+        return int(raw)
+    except ValueError:
+        return default
+
+
+def env_float(name: str, default: float) -> float:
+    """Read a float environment variable, falling back to ``default``."""
+    raw = os.getenv(name)
+    if raw is None or not raw.strip():
+        return default
+    try:
+        return float(raw)
+    except ValueError:
+        return default
+
+
+def env_bool(name: str, default: bool = False) -> bool:
+    """Read a boolean flag (1/true/yes/on) from the environment."""
+    raw = os.getenv(name)
+    if raw is None or not raw.strip():
+        return default
+    return raw.strip().lower() in {"1", "true", "yes", "on"}
+
+
+# =====================================================
+# AI inference
+# =====================================================
+
+# Number of threads that run model inference (the event loop never does).
+AI_INFERENCE_WORKERS = max(1, env_int("AI_INFERENCE_WORKERS", 1))
+
+# Maximum number of analyze requests admitted at once (running + waiting).
+# Requests beyond this limit are rejected with 503 + Retry-After.
+AI_INFERENCE_MAX_PENDING = max(1, env_int("AI_INFERENCE_MAX_PENDING", 8))
+
+# Value of the Retry-After header (seconds) sent when the inference queue
+# or the analyze-job queue is full.
+AI_INFERENCE_RETRY_AFTER = max(1, env_int("AI_INFERENCE_RETRY_AFTER", 5))
+
+# Micro-batching: images arriving within AI_BATCH_MAX_WAIT_MS of each other
+# are classified in one model call. AI_BATCH_MAX_SIZE=1 disables batching.
+AI_BATCH_MAX_SIZE = max(1, env_int("AI_BATCH_MAX_SIZE", 1))
+AI_BATCH_MAX_WAIT_MS = max(0.0, env_float("AI_BATCH_MAX_WAIT_MS", 5.0))
+
+# Content-hash cache of classification results (0 entries = disabled).
+# AI_RESULT_CACHE_PATH points to a local SQLite file shared by all workers
+# on the host; leave empty to keep the cache in memory only.
+AI_RESULT_CACHE_SIZE = max(0, env_int("AI_RESULT_CACHE_SIZE", 512))
+AI_RESULT_CACHE_TTL = max(0.0, env_float("AI_RESULT_CACHE_TTL", 24 * 3600.0))
+AI_RESULT_CACHE_PATH = os.getenv("AI_RESULT_CACHE_PATH", "").strip() or None
+
+# Perceptual-hash (dHash) near-duplicate detection (off by default).
+# Images with exactly the same hash as an already classified image reuse
+# its answer; reports whose photos are within AI_PHASH_RADIUS bits are only
+# flagged as likely duplicates. Enabling it maps reports.image_before_phash:
+# run Database/Alter/reports image phash.txt on the database first.
+AI_PHASH_ENABLED = env_bool("AI_PHASH_ENABLED", False)
+AI_PHASH_RADIUS = max(0, env_int("AI_PHASH_RADIUS", 6))
+AI_PHASH_INDEX_SIZE = max(1, env_int("AI_PHASH_INDEX_SIZE", 5000))
+AI_PHASH_REFRESH_SECONDS = max(0.0, env_float("AI_PHASH_REFRESH_SECONDS", 60.0))
+
+# Reduced-cost decode: JPEG draft mode + EXIF orientation, straight to
+# AI_DECODE_TARGET_SIZE on the long side. Disable to decode at full size.
+AI_FAST_DECODE = env_bool("AI_FAST_DECODE", True)
+AI_DECODE_TARGET_SIZE = max(0, env_int("AI_DECODE_TARGET_SIZE", 640))
+
+# Model weights and inference backend ("yolov5" = PyTorch via the yolov5
+# package, "onnx" = exported model on ONNX Runtime CPU).
+AI_MODEL_PATH = os.getenv("AI_MODEL_PATH", "").strip() or "app/models/vp.pt"
+AI_MODEL_BACKEND = (os.getenv("AI_MODEL_BACKEND", "").strip() or "yolov5").lower()
+
+# "fp32" = original weights, "int8" = quantized ONNX variant
+# (<model>.int8.onnx, built with python -m app.ml.quantize).
+AI_MODEL_VARIANT = (os.getenv("AI_MODEL_VARIANT", "").strip() or "fp32").lower()
+
+# Load and warm the classifier at startup; /health/ready reports 503 until
+# it is done. When disabled the model loads lazily on the first request.
+AI_PRELOAD_MODEL = env_bool("AI_PRELOAD_MODEL", False)
+AI_WARMUP_RUNS = max(0, env_int("AI_WARMUP_RUNS", 2))
+
+# Intra-op threads per worker process for torch (0 = CPU count / workers).
+# Used by the pre-fork launcher (python -m app.prefork).
+AI_TORCH_THREADS = max(0, env_int("AI_TORCH_THREADS", 0))
+
+# Out-of-process inference worker (python -m app.ml.worker_server).
+# When set, the API sends images there instead of loading the model:
+#   http://127.0.0.1:8100  or  unix:///tmp/basma-inference.sock
+AI_INFERENCE_REMOTE_URL = os.getenv("AI_INFERENCE_REMOTE_URL") or None
+AI_INFERENCE_REMOTE_TIMEOUT = env_float("AI_INFERENCE_REMOTE_TIMEOUT", 30.0)
+
+# Tiled inference for large photos: images whose long side is at least
+# AI_TILE_MIN_SIDE are decoded at up to AI_TILE_MAX_SIDE and run as
+# overlapping AI_TILE_SIZE tiles plus one full-image pass (one batch).
+AI_TILED_INFERENCE = env_bool("AI_TILED_INFERENCE", False)
+AI_TILE_MIN_SIDE = max(1, env_int("AI_TILE_MIN_SIDE", 1600))
+AI_TILE_MAX_SIDE = max(1, env_int("AI_TILE_MAX_SIDE", 1920))
+AI_TILE_SIZE = max(32, env_int("AI_TILE_SIZE", 640))
+AI_TILE_OVERLAP = min(0.9, max(0.0, env_float("AI_TILE_OVERLAP", 0.2)))
+
+# Per-stage latency histograms (GET /metrics) and, optionally, a
+# Server-Timing header on /ai/analyze-image responses.
+AI_METRICS_ENABLED = env_bool("AI_METRICS_ENABLED", True)
+AI_TIMING_HEADER = env_bool("AI_TIMING_HEADER", False)
+
+# Asynchronous analyze jobs (POST /ai/analyze-image/jobs). Job state lives
+# in a local SQLite file shared by the API workers on the host; finished
+# jobs are deleted after AI_JOB_TTL seconds. A queued/running job whose
+# worker stopped refreshing it for AI_JOB_STALE_SECONDS is marked failed.
+AI_JOB_STORE_PATH = os.getenv("AI_JOB_STORE_PATH", "").strip() or os.path.join(
+    tempfile.gettempdir(), "basma_ai_jobs.sqlite3"
+)
+AI_JOB_TTL = max(60, env_int("AI_JOB_TTL", 3600))
+AI_JOB_STALE_SECONDS = max(10, env_int("AI_JOB_STALE_SECONDS", 120))
+AI_JOB_CONCURRENCY = max(1, env_int("AI_JOB_CONCURRENCY", 2))
+AI_JOB_MAX_QUEUED = max(1, env_int("AI_JOB_MAX_QUEUED", 100))
+
+# YOLO training export of ml_training_queue (python -m app.ml.training_export)
+AI_TRAINING_EXPORT_DIR = os.getenv("AI_TRAINING_EXPORT_DIR", "").strip() or "exports/yolo"
+AI_TRAINING_BATCH_SIZE = max(1, env_int("AI_TRAINING_BATCH_SIZE", 200))
+AI_TRAINING_VAL_RATIO = min(0.5, max(0.0, env_float("AI_TRAINING_VAL_RATIO", 0.1)))
+# a row whose image copy keeps failing is marked failed after this many tries
+AI_TRAINING_MAX_ATTEMPTS = max(1, env_int("AI_TRAINING_MAX_ATTEMPTS", 3))
+
+# Model hot-reload. With AI_MODEL_DIR set, the newest model file in that
+# directory (same extension as AI_MODEL_PATH) is the active one; with
+# AI_MODEL_WATCH the directory (or AI_MODEL_PATH) is polled every
+# AI_MODEL_WATCH_INTERVAL seconds and a changed file is loaded, warmed and
+# swapped in without a restart. POST /admin/model/reload does it on demand;
+# an explicit path must be AI_MODEL_PATH or a file inside AI_MODEL_DIR.
+# The inference worker's POST /model/reload additionally requires the
+# X-Worker-Token header to match AI_WORKER_TOKEN (disabled while unset).
+AI_MODEL_DIR = os.getenv("AI_MODEL_DIR", "").strip() or None
+AI_MODEL_WATCH = env_bool("AI_MODEL_WATCH", False)
+AI_MODEL_WATCH_INTERVAL = max(1.0, env_float("AI_MODEL_WATCH_INTERVAL", 10.0))
+AI_WORKER_TOKEN = os.getenv("AI_WORKER_TOKEN", "").strip() or None
+
+# CPU thread settings applied when the model is loaded (0 = library default).
+# torch: set_num_threads / set_num_interop_threads (process-wide);
+# ONNX Runtime: session intra/inter-op thread pools. Pick values with
+# python -m benchmarks.sweep_threads; AI_INFERENCE_WORKERS is the executor width.
+AI_INTRA_OP_THREADS = max(0, env_int("AI_INTRA_OP_THREADS", 0))
+AI_INTER_OP_THREADS = max(0, env_int("AI_INTER_OP_THREADS", 0))
+
+# Reverse geocoding (Nominatim-compatible /reverse endpoint). One pooled
+# keep-alive client per worker, opened at startup and closed at shutdown;
+# HTTP/2 is used when the optional "h2" package is installed.
+GEOCODER_URL = os.getenv("GEOCODER_URL", "").strip() or "https://nominatim.openstreetmap.org/reverse"
+GEOCODER_USER_AGENT = os.getenv("GEOCODER_USER_AGENT", "").strip() or "basma-app/1.0"
+GEOCODER_TIMEOUT = max(0.1, env_float("GEOCODER_TIMEOUT", 10.0))
+GEOCODER_CONNECT_TIMEOUT = max(0.1, env_float("GEOCODER_CONNECT_TIMEOUT", 3.0))
+GEOCODER_MAX_CONNECTIONS = max(1, env_int("GEOCODER_MAX_CONNECTIONS", 10))
+GEOCODER_KEEPALIVE_SECONDS = max(0.0, env_float("GEOCODER_KEEPALIVE_SECONDS", 30.0))
+GEOCODER_HTTP2 = env_bool("GEOCODER_HTTP2", True)
+
+# Reverse-geocode cache keyed by geohash cell (precision 7 ~ 150 m x 150 m):
+# in-process LRU backed by a local SQLite file shared by the workers on
+# the host. GEOCODER_CACHE_SIZE=0 disables it.
+GEOCODER_CACHE_PRECISION = min(12, max(1, env_int("GEOCODER_CACHE_PRECISION", 7)))
+GEOCODER_CACHE_SIZE = max(0, env_int("GEOCODER_CACHE_SIZE", 10000))
+GEOCODER_CACHE_TTL = max(0.0, env_float("GEOCODER_CACHE_TTL", 30 * 24 * 3600.0))
+GEOCODER_CACHE_PATH = os.getenv("GEOCODER_CACHE_PATH", "").strip() or os.path.join(
+    tempfile.gettempdir(), "basma_geocode_cache.sqlite3"
+)
+
+# Offline reverse geocoding from our own locations table: a coordinate
+# within GEOCODER_OFFLINE_MAX_DISTANCE_M metres of a known location is
+# resolved locally; farther points fall back to the remote geocoder.
+# New rows are picked up at most every GEOCODER_OFFLINE_REFRESH_SECONDS.
+GEOCODER_OFFLINE_ENABLED = env_bool("GEOCODER_OFFLINE_ENABLED", True)
+GEOCODER_OFFLINE_MAX_DISTANCE_M = max(0.0, env_float("GEOCODER_OFFLINE_MAX_DISTANCE_M", 150.0))
+GEOCODER_OFFLINE_REFRESH_SECONDS = max(0.0, env_float("GEOCODER_OFFLINE_REFRESH_SECONDS", 60.0))
+
+# Governorate/district boundary polygons (GeoJSON FeatureCollection, see
+# app/services/boundaries.py). When set, coordinates map to governments
+# and districts by point-in-polygon; the remote geocoder only names the
+# area/street.
+GEOCODER_BOUNDARIES_PATH = os.getenv("GEOCODER_BOUNDARIES_PATH", "").strip() or None
+
+# Geocoder resilience (per worker). GEOCODER_RATE_LIMIT requests/second
+# with GEOCODER_RATE_BURST saved up (0 = unlimited; the public Nominatim
+# allows 1/s per application, so divide by the number of workers);
+# a call that would wait longer than GEOCODER_RATE_MAX_WAIT is refused.
+# Timeouts, 429 and 5xx are retried GEOCODER_RETRIES times with jittered
+# backoff; GEOCODER_BREAKER_FAILURES failed calls in a row open the circuit
+# for GEOCODER_BREAKER_RESET_SECONDS. While the geocoder is unavailable,
+# expired cache cells and known locations within
+# GEOCODER_FALLBACK_DISTANCE_M are used instead; such location answers
+# are returned with approximate = true and their distance_m.
+GEOCODER_RATE_LIMIT = max(0.0, env_float("GEOCODER_RATE_LIMIT", 1.0))
+GEOCODER_RATE_BURST = max(1.0, env_float("GEOCODER_RATE_BURST", 2.0))
+GEOCODER_RATE_MAX_WAIT = max(0.0, env_float("GEOCODER_RATE_MAX_WAIT", 2.0))
+GEOCODER_RETRIES = max(0, env_int("GEOCODER_RETRIES", 2))
+GEOCODER_RETRY_BACKOFF = max(0.0, env_float("GEOCODER_RETRY_BACKOFF", 0.25))
+GEOCODER_BREAKER_FAILURES = max(1, env_int("GEOCODER_BREAKER_FAILURES", 5))
+GEOCODER_BREAKER_RESET_SECONDS = max(0.0, env_float("GEOCODER_BREAKER_RESET_SECONDS", 30.0))
+GEOCODER_FALLBACK_DISTANCE_M = max(0.0, env_float("GEOCODER_FALLBACK_DISTANCE_M", 2000.0))
@@ -0,0 +1,111 @@
+# app/sqlite_store.py
+"""
+Local SQLite files used from async code without blocking the event loop.
+
+Every statement for one file runs on a single background thread that owns
+the connection: ``await store.run(fn, ...)`` for reads whose answer the
+request needs, ``store.submit(fn, ...)`` for best-effort writes the request
+does not wait for, and ``store.call(fn, ...)`` from synchronous code. ``fn``
+receives the connection as its first argument. Statements from this process
+are serialized on that thread; other processes on the host share the file
+through WAL.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import sqlite3
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Optional, Sequence, TypeVar
+
+logger = logging.getLogger("basma.sqlite")
+
+T = TypeVar("T")
+
+
+class SQLiteStore:
+    """
+    One SQLite file plus the thread that talks to it.
+
+    - ``schema`` statements run once, when the connection is first opened
+      (on the store thread, never on the caller's).
+    - ``timeout`` is SQLite's busy timeout; waiting on another process's
+      lock only ever stalls the store thread.
+    - ``max_backlog`` bounds the writes queued by ``submit``; beyond it new
+      writes are dropped (and counted) instead of growing the queue.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        name: str = "sqlite",
+        timeout: float = 1.0,
+        schema: Sequence[str] = (),
+        row_factory: Optional[Any] = None,
+        max_backlog: int = 1000,
+    ) -> None:
+        self.path = path
+        self.timeout = float(timeout)
+        self.schema = tuple(schema)
+        self.row_factory = row_factory
+        self.max_backlog = max(1, int(max_backlog))
+        self.backlog = 0
+        self.dropped = 0
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix=name)
+
+    def _connect(self) -> sqlite3.Connection:
+        # only ever called on the store thread
+        if self._conn is None:
+            conn = sqlite3.connect(self.path, timeout=self.timeout, check_same_thread=False)
+            try:
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute("PRAGMA synchronous=NORMAL")
+                if self.row_factory is not None:
+                    conn.row_factory = self.row_factory
+                with conn:
+                    for statement in self.schema:
+                        conn.execute(statement)
+            except sqlite3.Error:
+                conn.close()
+                raise
+            self._conn = conn
+        return self._conn
+
+    def _invoke(self, fn: Callable[..., T], *args: Any) -> T:
+        return fn(self._connect(), *args)
+
+    def call(self, fn: Callable[..., T], *args: Any) -> T:
+        """Run ``fn(conn, *args)`` on the store thread and wait (sync callers)."""
+        return self._pool.submit(self._invoke, fn, *args).result()
+
+    async def run(self, fn: Callable[..., T], *args: Any) -> T:
+        """Run ``fn(conn, *args)`` on the store thread and await the result."""
+        return await asyncio.wrap_future(self._pool.submit(self._invoke, fn, *args))
+
+    def submit(self, fn: Callable[..., Any], *args: Any) -> bool:
+        """
+        Queue ``fn(conn, *args)`` without waiting for it; errors are logged.
+        Returns False when the write was dropped because of the backlog.
+        """
+        with self._lock:
+            if self.backlog >= self.max_backlog:
+                self.dropped += 1
+                return False
+            self.backlog += 1
+        future = self._pool.submit(self._invoke, fn, *args)
+        future.add_done_callback(self._done)
+        return True
+
+    def _done(self, future: "Future[Any]") -> None:
+        with self._lock:
+            self.backlog -= 1
+        error = future.exception()
+        if error is not None:
+            logger.warning("SQLite write to %s failed: %s", self.path, error)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"backlog": self.backlog, "dropped": self.dropped}
@@ -1,9 +1,30 @@
 from __future__ import annotations
 from datetime import datetime
+from pathlib import Path
+from typing import Optional
 import random
 
+STATIC_DIR = Path(__file__).resolve().parent / "static"
+
+
 def generate_report_code(prefix: str = "UF") -> str:
     now = datetime.now()
     # UF-2026-11-06-2003
     tail = random.randint(1000, 9999)
     return f"{prefix}-{now.year:04d}-{now.month:02d}-{now.day:02d}-{tail}"
+
+
+def local_static_path(url: Optional[str]) -> Optional[Path]:
+    """
+    Map a public "/static/..." URL (absolute or relative) back to the file on
+    disk. Returns None for foreign URLs or paths escaping the static dir.
+    """
+    if not url or "/static/" not in url:
+        return None
+    rel = url.split("/static/", 1)[1].split("?", 1)[0]
+    path = (STATIC_DIR / rel).resolve()
+    try:
+        path.relative_to(STATIC_DIR.resolve())
+    except ValueError:
+        return None
+    return path if path.is_file() else None
@@ -0,0 +1,64 @@
+# benchmarks/_common.py
+"""Shared helpers for the benchmark scripts (run from Backend/basma_api)."""
+from __future__ import annotations
+
+import math
+import os
+import resource
+import sys
+from pathlib import Path
+from typing import Dict, List, Sequence
+
+IMAGE_EXTS = {".jpg", ".jpeg", ".png", ".webp"}
+
+# Default model settings, kept in line with the API
+DEFAULT_MODEL_PATH = "app/models/vp.pt"
+DEFAULT_MODEL_CONF = 0.1
+
+
+def list_images(root: str, limit: int | None = None) -> List[Path]:
+    paths = sorted(
+        p for p in Path(root).rglob("*") if p.is_file() and p.suffix.lower() in IMAGE_EXTS
+    )
+    if not paths:
+        sys.exit(f"no images found under {root}")
+    return paths[:limit] if limit else paths
+
+
+def load_images(paths: Sequence[Path]) -> List[bytes]:
+    return [p.read_bytes() for p in paths]
+
+
+def percentile(values: Sequence[float], pct: float) -> float:
+    """Nearest-rank percentile (``pct`` in 0..100)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100.0 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def latency_summary(latencies_s: Sequence[float]) -> Dict[str, float]:
+    ms = [v * 1000.0 for v in latencies_s]
+    return {
+        "p50_ms": round(percentile(ms, 50), 2),
+        "p95_ms": round(percentile(ms, 95), 2),
+        "p99_ms": round(percentile(ms, 99), 2),
+        "max_ms": round(max(ms), 2) if ms else 0.0,
+    }
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process in MiB."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS reports bytes
+    if sys.platform == "darwin":
+        return peak / (1024 * 1024)
+    return peak / 1024
+
+
+def ensure_app_importable() -> None:
+    """Allow ``import app`` when the script is run from Backend/basma_api."""
+    here = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    if here not in sys.path:
+        sys.path.insert(0, here)
@@ -0,0 +1,104 @@
+# benchmarks/bench_batching.py
+"""
+Replay N images at a fixed arrival rate through the micro-batcher and report
+throughput/latency for each batch size.
+
+    python -m benchmarks.bench_batching --images ./samples --count 200 \
+        --rate 20 --batch-sizes 1,4,8 --max-wait-ms 5
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import time
+from typing import List
+
+from benchmarks._common import (
+    DEFAULT_MODEL_CONF,
+    DEFAULT_MODEL_PATH,
+    ensure_app_importable,
+    latency_summary,
+    list_images,
+    load_images,
+)
+
+ensure_app_importable()
+
+from app.ml.batching import MicroBatcher  # noqa: E402
+from app.ml.inference_executor import InferenceExecutor  # noqa: E402
+from app.ml.report_classifier import ReportClassifierService  # noqa: E402
+
+
+async def replay(
+    clf: ReportClassifierService,
+    images: List[bytes],
+    count: int,
+    rate: float,
+    batch_size: int,
+    max_wait_ms: float,
+    workers: int,
+) -> dict:
+    executor = InferenceExecutor(max_workers=workers, max_pending=count)
+    batcher = MicroBatcher(executor, max_batch_size=batch_size, max_wait_ms=max_wait_ms)
+    latencies: List[float] = []
+    interval = 1.0 / rate if rate > 0 else 0.0
+
+    async def one(image_bytes: bytes) -> None:
+        start = time.perf_counter()
+        if batch_size > 1:
+            await batcher.submit(clf, image_bytes)
+        else:
+            await executor.run(clf.predict, image_bytes)
+        latencies.append(time.perf_counter() - start)
+
+    started = time.perf_counter()
+    tasks = []
+    for i in range(count):
+        tasks.append(asyncio.create_task(one(images[i % len(images)])))
+        if interval:
+            await asyncio.sleep(interval)
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - started
+    executor.shutdown()
+
+    result = {
+        "batch_size": batch_size,
+        "max_wait_ms": max_wait_ms,
+        "images": count,
+        "elapsed_s": round(elapsed, 3),
+        "images_per_s": round(count / elapsed, 2) if elapsed else 0.0,
+        **latency_summary(latencies),
+    }
+    if batch_size > 1:
+        result["avg_batch_size"] = round(batcher.stats()["avg_batch_size"], 2)
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--images", required=True, help="directory of sample images")
+    parser.add_argument("--model", default=DEFAULT_MODEL_PATH)
+    parser.add_argument("--count", type=int, default=100, help="number of requests to replay")
+    parser.add_argument("--rate", type=float, default=20.0, help="arrivals per second (0 = all at once)")
+    parser.add_argument("--batch-sizes", default="1,4,8")
+    parser.add_argument("--max-wait-ms", type=float, default=5.0)
+    parser.add_argument("--workers", type=int, default=1, help="inference threads")
+    args = parser.parse_args()
+
+    images = load_images(list_images(args.images))
+    clf = ReportClassifierService(model_path=args.model, model_conf_threshold=DEFAULT_MODEL_CONF)
+    clf.predict(images[0])  # warm-up
+
+    runs = []
+    for size in (int(s) for s in args.batch_sizes.split(",") if s.strip()):
+        runs.append(
+            asyncio.run(
+                replay(clf, images, args.count, args.rate, size, args.max_wait_ms, args.workers)
+            )
+        )
+    print(json.dumps({"rate": args.rate, "workers": args.workers, "runs": runs}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
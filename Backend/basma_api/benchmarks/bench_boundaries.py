@@ -0,0 +1,113 @@
+# benchmarks/bench_boundaries.py
+"""
+Point-in-polygon lookup speed of the boundary index (no database).
+
+Uses ``--geojson`` if given, otherwise a synthetic country: a grid of
+governorates, each split into districts with ``--vertices``-point
+jagged outlines:
+
+    python -m benchmarks.bench_boundaries --queries 20000
+    python -m benchmarks.bench_boundaries --geojson data/jordan_admin.geojson
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import random
+import tempfile
+import time
+from typing import Dict, List
+
+from benchmarks._common import ensure_app_importable, latency_summary
+
+ensure_app_importable()
+
+from app.services.boundaries import BoundaryIndex  # noqa: E402
+
+
+def _jagged_box(rng: random.Random, lon0: float, lat0: float, size: float, vertices: int) -> List[List[float]]:
+    """Square outline with ``vertices`` points, edges nudged inwards (no overlap with neighbours)."""
+    per_side = max(1, vertices // 4)
+    corners = [(lon0, lat0), (lon0 + size, lat0), (lon0 + size, lat0 + size), (lon0, lat0 + size)]
+    ring: List[List[float]] = []
+    for i in range(4):
+        (x0, y0), (x1, y1) = corners[i], corners[(i + 1) % 4]
+        for k in range(per_side):
+            t = k / per_side
+            x, y = x0 + (x1 - x0) * t, y0 + (y1 - y0) * t
+            cx, cy = lon0 + size / 2, lat0 + size / 2
+            shrink = 0.0 if k == 0 else rng.uniform(0, 0.03)
+            ring.append([x + (cx - x) * shrink, y + (cy - y) * shrink])
+    ring.append(ring[0])
+    return ring
+
+
+def synthetic_collection(governorates: int, districts: int, vertices: int, seed: int) -> Dict:
+    rng = random.Random(seed)
+    side = math.ceil(math.sqrt(governorates))
+    split = math.ceil(math.sqrt(districts))
+    features = []
+    for g in range(governorates):
+        lon0, lat0 = 35.0 + (g % side) * 0.5, 29.0 + (g // side) * 0.5
+        features.append({
+            "type": "Feature",
+            "properties": {"level": "government", "government_id": g + 1},
+            "geometry": {"type": "Polygon", "coordinates": [_jagged_box(rng, lon0, lat0, 0.5, vertices)]},
+        })
+        size = 0.5 / split
+        for d in range(split * split):
+            features.append({
+                "type": "Feature",
+                "properties": {"level": "district", "district_id": g * 100 + d + 1},
+                "geometry": {
+                    "type": "Polygon",
+                    "coordinates": [_jagged_box(rng, lon0 + (d % split) * size, lat0 + (d // split) * size, size, vertices)],
+                },
+            })
+    return {"type": "FeatureCollection", "features": features}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--geojson", default=None)
+    parser.add_argument("--governorates", type=int, default=12)
+    parser.add_argument("--districts", type=int, default=9, help="per governorate (synthetic)")
+    parser.add_argument("--vertices", type=int, default=400, help="outline points per polygon (synthetic)")
+    parser.add_argument("--queries", type=int, default=10000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    with tempfile.NamedTemporaryFile("w", suffix=".geojson", encoding="utf-8") as tmp:
+        path = args.geojson
+        if path is None:
+            json.dump(synthetic_collection(args.governorates, args.districts, args.vertices, args.seed), tmp)
+            tmp.flush()
+            path = tmp.name
+        load_start = time.perf_counter()
+        index = BoundaryIndex(path)
+        load_s = time.perf_counter() - load_start
+
+    if index.bounds is None:
+        raise SystemExit("no government/district polygons loaded")
+    min_lon, min_lat, max_lon, max_lat = index.bounds
+    rng = random.Random(args.seed)
+    latencies: List[float] = []
+    matched = 0
+    for _ in range(args.queries):
+        lat, lon = rng.uniform(min_lat, max_lat), rng.uniform(min_lon, max_lon)
+        start = time.perf_counter()
+        gov, dist = index.locate(lat, lon)
+        latencies.append(time.perf_counter() - start)
+        matched += gov is not None and dist is not None
+    print(json.dumps({
+        **index.stats(),
+        "load_s": round(load_s, 3),
+        "queries": args.queries,
+        "matched": matched,
+        **latency_summary(latencies),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
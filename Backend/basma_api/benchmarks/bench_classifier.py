@@ -0,0 +1,176 @@
+# benchmarks/bench_classifier.py
+"""
+Offline throughput/latency harness for ReportClassifierService.
+
+Replays a directory of images through the classifier (no API, no cache)
+with N concurrent threads, each sending ``--batch-size`` images per model
+call, and prints one JSON report:
+
+    python -m benchmarks.bench_classifier --images ./samples \
+        --concurrency 2 --batch-size 4 --repeat 3 --output runs/$(git rev-parse --short HEAD).json
+
+Report fields: images/sec, per-image latency p50/p95/p99/max (a batch's
+latency counts for each of its images), model load time, peak RSS and the
+distribution of final report codes. ``git_commit`` and the model settings
+are included so runs can be compared across commits, backends and
+variants (``--compare old.json`` prints the throughput/latency deltas).
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import subprocess
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+from benchmarks._common import (
+    DEFAULT_MODEL_CONF,
+    DEFAULT_MODEL_PATH,
+    ensure_app_importable,
+    latency_summary,
+    list_images,
+    load_images,
+    peak_rss_mb,
+)
+
+ensure_app_importable()
+
+from app.ml.report_classifier import ReportClassifierService  # noqa: E402
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return out.stdout.strip() or None
+
+
+def _chunks(blobs: List[bytes], size: int) -> List[List[bytes]]:
+    return [blobs[i:i + size] for i in range(0, len(blobs), size)]
+
+
+def replay(
+    clf: ReportClassifierService,
+    blobs: List[bytes],
+    concurrency: int,
+    batch_size: int,
+    repeat: int,
+) -> Dict:
+    work = _chunks(blobs * repeat, batch_size)
+    latencies: List[float] = []
+    codes: Counter = Counter()
+
+    def run_batch(batch: List[bytes]) -> None:
+        start = time.perf_counter()
+        if batch_size == 1:
+            results = [clf.predict(batch[0])]
+        else:
+            results = clf.predict_batch(batch)
+        elapsed = time.perf_counter() - start
+        latencies.extend([elapsed] * len(batch))
+        for _, _, info in results:
+            codes[info["code"]] += 1
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(run_batch, work))
+    elapsed = time.perf_counter() - started
+
+    images = len(latencies)
+    return {
+        "images": images,
+        "elapsed_s": round(elapsed, 3),
+        "images_per_s": round(images / elapsed, 2) if elapsed else 0.0,
+        **latency_summary(latencies),
+        "class_distribution": {
+            code: {"count": n, "share": round(n / images, 4)}
+            for code, n in codes.most_common()
+        },
+    }
+
+
+def _compare(current: Dict, baseline_path: str) -> Dict:
+    with open(baseline_path, encoding="utf-8") as fh:
+        baseline = json.load(fh)
+    deltas = {}
+    for key in ("images_per_s", "p50_ms", "p95_ms", "p99_ms", "peak_rss_mb"):
+        old, new = baseline.get(key), current.get(key)
+        if old:
+            deltas[key] = {"baseline": old, "current": new, "change": round((new - old) / old, 4)}
+    return {"baseline_commit": baseline.get("git_commit"), "deltas": deltas}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--images", required=True, help="directory of sample images")
+    parser.add_argument("--limit", type=int, default=None)
+    parser.add_argument("--model", default=DEFAULT_MODEL_PATH)
+    parser.add_argument("--conf", type=float, default=DEFAULT_MODEL_CONF)
+    parser.add_argument("--backend", default=None, help="yolov5 / onnx (default AI_MODEL_BACKEND)")
+    parser.add_argument("--variant", default=None, help="fp32 / int8 (default AI_MODEL_VARIANT)")
+    parser.add_argument("--tiled", action="store_true", help="enable tiled inference")
+    parser.add_argument("--intra-op", type=int, default=None, help="model intra-op threads (default AI_INTRA_OP_THREADS)")
+    parser.add_argument("--inter-op", type=int, default=None, help="model inter-op threads (default AI_INTER_OP_THREADS)")
+    parser.add_argument("--concurrency", type=int, default=1, help="threads calling the model")
+    parser.add_argument("--batch-size", type=int, default=1, help="images per model call")
+    parser.add_argument("--repeat", type=int, default=1, help="passes over the image set")
+    parser.add_argument("--warmup", type=int, default=2, help="untimed predictions first")
+    parser.add_argument("--output", default=None, help="also write the JSON report here")
+    parser.add_argument("--compare", default=None, help="previous report to diff against")
+    args = parser.parse_args()
+
+    blobs = load_images(list_images(args.images, args.limit))
+
+    load_start = time.perf_counter()
+    clf = ReportClassifierService(
+        args.model,
+        model_conf_threshold=args.conf,
+        backend=args.backend,
+        variant=args.variant,
+        tiled=args.tiled or None,
+        intra_op_threads=args.intra_op,
+        inter_op_threads=args.inter_op,
+    )
+    load_s = time.perf_counter() - load_start
+    for i in range(args.warmup):
+        clf.predict(blobs[i % len(blobs)])
+
+    run = replay(clf, blobs, max(1, args.concurrency), max(1, args.batch_size), max(1, args.repeat))
+    report = {
+        "git_commit": _git_commit(),
+        "python": platform.python_version(),
+        "model": clf.model_path,
+        "model_version": clf.model_version,
+        "backend": clf.backend_name,
+        "variant": clf.variant,
+        "tiled": clf.tiled,
+        "intra_op_threads": clf.intra_op_threads,
+        "inter_op_threads": clf.inter_op_threads,
+        "concurrency": args.concurrency,
+        "batch_size": args.batch_size,
+        "repeat": args.repeat,
+        "load_s": round(load_s, 3),
+        **run,
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+    }
+    if args.compare:
+        report["comparison"] = _compare(report, args.compare)
+
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as fh:
+            fh.write(text + "\n")
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+# benchmarks/bench_decode.py
+"""
+Compare the legacy full-resolution decode with the reduced-cost decode
+(JPEG draft mode + EXIF orientation) on a corpus of phone-sized JPEGs.
+
+Each path runs in its own child process so peak RSS is measured per path.
+
+    python -m benchmarks.bench_decode --images ./phone_photos --repeat 3
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import multiprocessing as mp
+import time
+from typing import List
+
+from benchmarks._common import (
+    ensure_app_importable,
+    latency_summary,
+    list_images,
+    peak_rss_mb,
+)
+
+ensure_app_importable()
+
+
+def _run_path(path_name: str, files: List[str], repeat: int, target: int, out: "mp.Queue") -> None:
+    from app.ml.image_decode import decode_for_inference, decode_full
+
+    blobs = [open(f, "rb").read() for f in files]
+    baseline_rss = peak_rss_mb()
+    timings: List[float] = []
+    for _ in range(repeat):
+        for blob in blobs:
+            start = time.perf_counter()
+            if path_name == "full":
+                image = decode_full(blob)
+            else:
+                image, _ = decode_for_inference(blob, target)
+            image.load()
+            timings.append(time.perf_counter() - start)
+            del image
+    total = sum(timings)
+    out.put(
+        {
+            "path": path_name,
+            "decodes": len(timings),
+            "images_per_s": round(len(timings) / total, 2) if total else 0.0,
+            "mean_ms": round(total / len(timings) * 1000.0, 2) if timings else 0.0,
+            **latency_summary(timings),
+            "peak_rss_mb": round(peak_rss_mb(), 1),
+            "peak_rss_over_baseline_mb": round(peak_rss_mb() - baseline_rss, 1),
+        }
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--images", required=True, help="directory of JPEG photos")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--target-size", type=int, default=640)
+    parser.add_argument("--limit", type=int, default=None)
+    args = parser.parse_args()
+
+    files = [str(p) for p in list_images(args.images, args.limit)]
+    ctx = mp.get_context("spawn")
+    results = []
+    for path_name in ("full", "reduced"):
+        queue: mp.Queue = ctx.Queue()
+        proc = ctx.Process(target=_run_path, args=(path_name, files, args.repeat, args.target_size, queue))
+        proc.start()
+        results.append(queue.get())
+        proc.join()
+
+    full, reduced = results
+    speedup = (reduced["images_per_s"] / full["images_per_s"]) if full["images_per_s"] else 0.0
+    print(
+        json.dumps(
+            {"images": len(files), "runs": results, "speedup": round(speedup, 2)},
+            indent=2,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
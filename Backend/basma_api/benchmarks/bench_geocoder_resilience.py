@@ -0,0 +1,147 @@
+# benchmarks/bench_geocoder_resilience.py
+"""
+Geocoder behaviour through an outage, against the local fake geocoder.
+
+Runs ``lookup_address`` (cache + single-flight + rate limit + retries +
+circuit breaker) in three phases: healthy, outage (``--outage-error-rate``
+of answers fail with ``--outage-status``, or hang with ``--outage-hang``),
+and recovery. Points are drawn from a small set of cells so the cache
+(short ``--cache-ttl``) has expired entries to fall back on:
+
+    python -m benchmarks.bench_geocoder_resilience --rate 20 --phase-seconds 5
+    python -m benchmarks.bench_geocoder_resilience --outage-status 429 --outage-error-rate 0.5
+
+Per phase: answers from the geocoder / fresh cache / stale cache,
+failures (503 in the API), latency, and breaker state/opens at the end.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import tempfile
+import time
+from typing import Dict, List
+
+import httpx
+
+from benchmarks._common import ensure_app_importable, latency_summary
+from benchmarks.fake_geocoder import free_port, start_fake_geocoder
+
+ensure_app_importable()
+
+
+async def phase(
+    name: str,
+    seconds: float,
+    concurrency: int,
+    points: List[tuple],
+    rng: random.Random,
+) -> Dict:
+    # imported after the GEOCODER_* environment is set in main()
+    from app.services import geocoding
+    from app.services.geocode_cache import get_geocode_cache
+
+    cache = get_geocode_cache()
+    client = geocoding.get_geocoder()
+    before = {
+        "requests": client.requests,
+        "hits": cache.hits,
+        "stale": geocoding.stale_fallbacks,
+    }
+    latencies: List[float] = []
+    outcomes = {"ok": 0, "failed": 0}
+    deadline = time.monotonic() + seconds
+
+    async def user() -> None:
+        while time.monotonic() < deadline:
+            lat, lon = rng.choice(points)
+            start = time.perf_counter()
+            try:
+                await geocoding.lookup_address(lat + rng.uniform(-1e-4, 1e-4), lon)
+                outcomes["ok"] += 1
+            except (geocoding.GeocoderUnavailable, httpx.HTTPError):
+                outcomes["failed"] += 1
+            latencies.append(time.perf_counter() - start)
+            await asyncio.sleep(rng.uniform(0.0, 0.05))
+
+    await asyncio.gather(*(user() for _ in range(concurrency)))
+    stale = geocoding.stale_fallbacks - before["stale"]
+    fresh_hits = cache.hits - before["hits"]
+    stats = client.stats()
+    return {
+        "phase": name,
+        "lookups": len(latencies),
+        "ok": outcomes["ok"],
+        "from_cache": fresh_hits,
+        "from_stale_cache": stale,
+        "failed": outcomes["failed"],
+        "geocoder_requests": client.requests - before["requests"],
+        "circuit": stats["circuit"],
+        "circuit_opens": stats["circuit_opens"],
+        "retries": stats["retries"],
+        "rate_limited": stats["rate_limited"],
+        **latency_summary(latencies),
+    }
+
+
+async def run(args: argparse.Namespace, control_url: str) -> Dict:
+    rng = random.Random(args.seed)
+    points = [(31.9 + rng.random() * 0.2, 35.8 + rng.random() * 0.2) for _ in range(args.cells)]
+    results = []
+    async with httpx.AsyncClient() as control:
+        for name, faults in (
+            ("healthy", {"error_rate": 0.0, "hang_rate": 0.0}),
+            ("outage", {
+                "error_rate": args.outage_error_rate,
+                "error_status": args.outage_status,
+                "hang_rate": args.outage_hang,
+                "hang_seconds": 30.0,
+            }),
+            ("recovery", {"error_rate": 0.0, "hang_rate": 0.0}),
+        ):
+            await control.post(control_url, json=faults)
+            results.append(await phase(name, args.phase_seconds, args.concurrency, points, rng))
+    return {"settings": {k: os.environ[k] for k in sorted(os.environ) if k.startswith("GEOCODER_")}, "phases": results}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--phase-seconds", type=float, default=5.0)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--cells", type=int, default=40, help="distinct locations requested")
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    parser.add_argument("--outage-error-rate", type=float, default=1.0)
+    parser.add_argument("--outage-status", type=int, default=503)
+    parser.add_argument("--outage-hang", type=float, default=0.0, help="share of requests that stall")
+    parser.add_argument("--rate", type=float, default=20.0, help="GEOCODER_RATE_LIMIT")
+    parser.add_argument("--cache-ttl", type=float, default=2.0, help="GEOCODER_CACHE_TTL")
+    parser.add_argument("--timeout", type=float, default=1.0, help="GEOCODER_TIMEOUT")
+    parser.add_argument("--breaker-reset", type=float, default=2.0, help="GEOCODER_BREAKER_RESET_SECONDS")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        port = free_port()
+        os.environ.update({
+            "GEOCODER_URL": f"http://127.0.0.1:{port}/reverse",
+            "GEOCODER_CACHE_PATH": os.path.join(tmp, "geocode.sqlite3"),
+            "GEOCODER_CACHE_TTL": str(args.cache_ttl),
+            "GEOCODER_RATE_LIMIT": str(args.rate),
+            "GEOCODER_TIMEOUT": str(args.timeout),
+            "GEOCODER_BREAKER_RESET_SECONDS": str(args.breaker_reset),
+            "GEOCODER_RETRY_BACKOFF": "0.05",
+        })
+        proc, _ = start_fake_geocoder(args.latency_ms, port=port)
+        try:
+            report = asyncio.run(run(args, f"http://127.0.0.1:{port}/control"))
+        finally:
+            proc.terminate()
+            proc.wait()
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
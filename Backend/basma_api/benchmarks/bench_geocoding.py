@@ -0,0 +1,122 @@
+# benchmarks/bench_geocoding.py
+"""
+Per-call latency of reverse geocoding: a fresh ``httpx.AsyncClient`` per
+call (the old behaviour) vs. the pooled ``GeocodingClient``.
+
+Without ``--url`` a local ``benchmarks.fake_geocoder`` is started on a free
+port (``--tls`` serves it with a throwaway self-signed certificate, so
+the fresh-client numbers include the TLS handshake):
+
+    python -m benchmarks.bench_geocoding --calls 200 --tls
+    python -m benchmarks.bench_geocoding --url http://10.0.0.5:8080/reverse --concurrency 8
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import tempfile
+import time
+from typing import Awaitable, Callable, Dict, List, Tuple, Union
+
+import httpx
+
+from benchmarks._common import ensure_app_importable, latency_summary
+from benchmarks.fake_geocoder import start_fake_geocoder
+
+ensure_app_importable()
+
+from app.services.geocoding import GeocodingClient  # noqa: E402
+
+# Around Amman
+LAT_RANGE = (31.80, 32.10)
+LON_RANGE = (35.75, 36.10)
+
+
+async def measure(
+    call: Callable[[float, float], Awaitable[dict]],
+    points: List[Tuple[float, float]],
+    concurrency: int,
+) -> Dict:
+    latencies: List[float] = []
+    queue = list(points)
+
+    async def user() -> None:
+        while queue:
+            lat, lon = queue.pop()
+            start = time.perf_counter()
+            await call(lat, lon)
+            latencies.append(time.perf_counter() - start)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(user() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    return {
+        "calls": len(latencies),
+        "calls_per_s": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        **latency_summary(latencies),
+    }
+
+
+async def run(args: argparse.Namespace, url: str, verify: Union[bool, str]) -> Dict:
+    rng = random.Random(args.seed)
+    points = [(rng.uniform(*LAT_RANGE), rng.uniform(*LON_RANGE)) for _ in range(args.calls)]
+    params = {"format": "json", "zoom": 16, "addressdetails": 1}
+
+    async def fresh(lat: float, lon: float) -> dict:
+        async with httpx.AsyncClient(timeout=10, verify=verify) as client:
+            resp = await client.get(url, params={**params, "lat": lat, "lon": lon})
+            resp.raise_for_status()
+            return resp.json()
+
+    # no rate limit / retries: measure connection reuse only
+    pooled_client = GeocodingClient(url=url, verify=verify, rate_limit=0, retries=0)
+    # one untimed call each so both start from a warm server
+    await fresh(*points[0])
+    await pooled_client.reverse(*points[0])
+    try:
+        report = {
+            "url": url,
+            "concurrency": args.concurrency,
+            "http2": pooled_client.http2,
+            "fresh_client": await measure(fresh, points, args.concurrency),
+            "pooled_client": await measure(pooled_client.reverse, points, args.concurrency),
+        }
+    finally:
+        await pooled_client.aclose()
+    before, after = report["fresh_client"]["p50_ms"], report["pooled_client"]["p50_ms"]
+    report["p50_reduction"] = round(1 - after / before, 4) if before else 0.0
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default=None, help="geocoder /reverse URL (default: start a local fake)")
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="server delay of the local fake")
+    parser.add_argument("--tls", action="store_true", help="serve the local fake over HTTPS")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    proc = None
+    with tempfile.TemporaryDirectory() as tmp:
+        url = args.url
+        verify: Union[bool, str] = True
+        if url is None:
+            proc, url = start_fake_geocoder(args.latency_ms, tmp if args.tls else None)
+            if args.tls:
+                verify = os.path.join(tmp, "cert.pem")
+        try:
+            report = asyncio.run(run(args, url, verify))
+        finally:
+            if proc is not None:
+                proc.terminate()
+                proc.wait()
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+# benchmarks/bench_tiling.py
+"""
+Latency cost vs. detection gain of tiled inference on large photos.
+
+Runs every image through the same loaded model twice: the normal single
+640 pass and the tiled mode (AI_TILE_* settings). Images can be labelled by
+directory name like in compare_variants (fixtures/POTHOLES/*.jpg); then the
+report also has accuracy of the final code per mode.
+
+    python -m benchmarks.bench_tiling --images ./large_photos \
+        --model app/models/vp.pt --repeat 2
+
+"small_detections" counts boxes covering under --small-area of the frame,
+the defects tiling is meant to recover.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import time
+from typing import Dict, List, Optional
+
+from benchmarks._common import (
+    DEFAULT_MODEL_CONF,
+    DEFAULT_MODEL_PATH,
+    ensure_app_importable,
+    latency_summary,
+    list_images,
+)
+
+ensure_app_importable()
+
+from app.ml.report_classifier import REPORT_TYPE_META, ReportClassifierService  # noqa: E402
+from app.settings import AI_TILE_MIN_SIDE  # noqa: E402
+
+
+def _label_for(path, root: str) -> Optional[str]:
+    parts = path.relative_to(root).parts
+    label = parts[0].upper() if len(parts) > 1 else None
+    return label if label in REPORT_TYPE_META else None
+
+
+def run_mode(
+    clf: ReportClassifierService,
+    blobs: List[bytes],
+    labels: List[Optional[str]],
+    tiled: bool,
+    repeat: int,
+    small_area: float,
+) -> Dict:
+    clf.tiled = tiled
+    clf.predict(blobs[0])  # warm-up
+
+    latencies: List[float] = []
+    codes: List[str] = []
+    detections = 0
+    small = 0
+    tiled_images = 0
+    for r in range(repeat):
+        for blob in blobs:
+            start = time.perf_counter()
+            image, use_tiles = clf._load_image(blob)
+            det = clf._infer([image], [use_tiles])[0]
+            preds = clf._extract_predictions(det, clf.backend.names, image.width, image.height)
+            _, _, info = clf._build_result(preds)
+            latencies.append(time.perf_counter() - start)
+            if r == 0:
+                codes.append(info["code"])
+                detections += int(preds.confidence.shape[0])
+                small += int((preds.area_ratio < small_area).sum())
+                tiled_images += int(use_tiles)
+
+    labelled = [(c, l) for c, l in zip(codes, labels) if l]
+    total = sum(latencies)
+    return {
+        "tiled": tiled,
+        "images_tiled": tiled_images,
+        "images_per_s": round(len(latencies) / total, 2) if total else 0.0,
+        **latency_summary(latencies),
+        "detections": detections,
+        "small_detections": small,
+        "accuracy": (
+            round(sum(c == l for c, l in labelled) / len(labelled), 4) if labelled else None
+        ),
+        "codes": codes,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--images", required=True)
+    parser.add_argument("--model", default=DEFAULT_MODEL_PATH)
+    parser.add_argument("--backend", default=None)
+    parser.add_argument("--conf", type=float, default=DEFAULT_MODEL_CONF)
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--limit", type=int, default=None)
+    parser.add_argument("--small-area", type=float, default=0.01)
+    args = parser.parse_args()
+
+    paths = list_images(args.images, args.limit)
+    blobs = [p.read_bytes() for p in paths]
+    labels = [_label_for(p, args.images) for p in paths]
+
+    clf = ReportClassifierService(args.model, model_conf_threshold=args.conf, backend=args.backend)
+    base = run_mode(clf, blobs, labels, False, args.repeat, args.small_area)
+    tiled = run_mode(clf, blobs, labels, True, args.repeat, args.small_area)
+
+    changed = sum(a != b for a, b in zip(base.pop("codes"), tiled.pop("codes")))
+    print(
+        json.dumps(
+            {
+                "images": len(blobs),
+                "tile_min_side": AI_TILE_MIN_SIDE,
+                "single_pass": base,
+                "tiled": tiled,
+                "p50_cost_ratio": round(tiled["p50_ms"] / base["p50_ms"], 2) if base["p50_ms"] else None,
+                "codes_changed": changed,
+            },
+            indent=2,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+# benchmarks/bench_topology.py
+"""
+Closed-loop HTTP load test of /ai/analyze-image against one or more running
+deployments, e.g. in-process model vs. separate inference worker.
+
+Start the topologies (disable the caches so every request reaches the model):
+
+    export AI_RESULT_CACHE_SIZE=0 AI_PHASH_ENABLED=0
+
+    # A: every API worker loads its own model
+    python -m app.prefork --workers 4 --port 8000
+
+    # B: one inference worker + lightweight API workers
+    python -m app.ml.worker_server --uds /tmp/basma-inference.sock
+    AI_INFERENCE_REMOTE_URL=unix:///tmp/basma-inference.sock \\
+        python -m app.prefork --workers 8 --port 8001
+
+Then:
+
+    python -m benchmarks.bench_topology --images ./samples --count 400 \\
+        --concurrency 16 \\
+        --target inproc=http://127.0.0.1:8000 --target worker=http://127.0.0.1:8001 \\
+        --pid inproc=<master pid A> --pid worker=<master pid B>,<worker pid>
+
+``--pid`` adds the summed USS/PSS of those processes and their children.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import time
+from collections import Counter
+from typing import Dict, List
+
+import httpx
+
+from benchmarks._common import ensure_app_importable, latency_summary, list_images, load_images
+
+ensure_app_importable()
+
+from app.prefork import child_pids, memory_report  # noqa: E402
+
+
+async def load_test(
+    base_url: str,
+    path: str,
+    images: List[bytes],
+    count: int,
+    concurrency: int,
+    timeout: float,
+) -> dict:
+    latencies: List[float] = []
+    statuses: Counter = Counter()
+    next_index = 0
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=timeout) as client:
+
+        async def user() -> None:
+            nonlocal next_index
+            while next_index < count:
+                i = next_index
+                next_index += 1
+                files = {"file": (f"img{i}.jpg", images[i % len(images)], "image/jpeg")}
+                start = time.perf_counter()
+                try:
+                    resp = await client.post(path, files=files)
+                    statuses[resp.status_code] += 1
+                except httpx.HTTPError as e:
+                    statuses[type(e).__name__] += 1
+                    continue
+                if resp.status_code == 200:
+                    latencies.append(time.perf_counter() - start)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(user() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    return {
+        "requests": count,
+        "ok": len(latencies),
+        "status_counts": {str(k): v for k, v in sorted(statuses.items(), key=str)},
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+        **latency_summary(latencies),
+    }
+
+
+def memory_for(pids: List[int]) -> Dict[str, float]:
+    all_pids: List[int] = []
+    for pid in pids:
+        all_pids.append(pid)
+        all_pids.extend(child_pids(pid))
+    rows = memory_report(sorted(set(all_pids)))
+    return {
+        "processes": len(rows),
+        "uss_mb": round(sum(r["uss"] for r in rows), 1),
+        "pss_mb": round(sum(r["pss"] for r in rows), 1),
+        "rss_mb": round(sum(r["rss"] for r in rows), 1),
+    }
+
+
+def _pairs(values: List[str]) -> Dict[str, str]:
+    out: Dict[str, str] = {}
+    for value in values:
+        name, _, rest = value.partition("=")
+        if not rest:
+            raise SystemExit(f"expected name=value, got {value!r}")
+        out[name] = rest
+    return out
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--images", required=True)
+    parser.add_argument("--limit", type=int, default=None)
+    parser.add_argument("--count", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--path", default="/ai/analyze-image")
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--warmup", type=int, default=8, help="requests sent before measuring")
+    parser.add_argument("--target", action="append", required=True, help="name=base_url")
+    parser.add_argument("--pid", action="append", default=[], help="name=pid[,pid...]")
+    args = parser.parse_args()
+
+    images = load_images(list_images(args.images, args.limit))
+    targets = _pairs(args.target)
+    pids = {name: [int(p) for p in value.split(",")] for name, value in _pairs(args.pid).items()}
+
+    results = {}
+    for name, base_url in targets.items():
+        if args.warmup:
+            asyncio.run(load_test(base_url, args.path, images, args.warmup, 1, args.timeout))
+        result = asyncio.run(
+            load_test(base_url, args.path, images, args.count, args.concurrency, args.timeout)
+        )
+        if name in pids:
+            result["memory"] = memory_for(pids[name])
+        results[name] = result
+
+    print(json.dumps({"concurrency": args.concurrency, "targets": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+# benchmarks/compare_backends.py
+"""
+Parity and throughput check between two classifier backends.
+
+For every fixture image both services run ``predict``; the script reports
+how many final decisions (report_type_id / REPORT_TYPE_META code) agree,
+the largest confidence difference, and per-backend throughput.
+
+    python -m benchmarks.compare_backends --images ./fixtures \
+        --reference yolov5:app/models/vp.pt --candidate onnx:app/models/vp.onnx
+
+Exit status is 1 when any decision differs (use --min-agreement to relax).
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from typing import List, Tuple
+
+from benchmarks._common import (
+    DEFAULT_MODEL_CONF,
+    ensure_app_importable,
+    latency_summary,
+    list_images,
+    load_images,
+)
+
+ensure_app_importable()
+
+from app.ml.report_classifier import ReportClassifierService  # noqa: E402
+
+
+def _parse_spec(spec: str) -> Tuple[str, str]:
+    backend, _, path = spec.partition(":")
+    if not path:
+        sys.exit(f"expected BACKEND:PATH, got {spec!r}")
+    return backend, path
+
+
+def _run(clf: ReportClassifierService, images: List[bytes], repeat: int) -> Tuple[list, dict]:
+    clf.predict(images[0])  # warm-up
+    outputs = []
+    latencies: List[float] = []
+    for r in range(repeat):
+        for blob in images:
+            start = time.perf_counter()
+            out = clf.predict(blob)
+            latencies.append(time.perf_counter() - start)
+            if r == 0:
+                outputs.append(out)
+    total = sum(latencies)
+    return outputs, {
+        "backend": clf.backend_name,
+        "model_version": clf.model_version,
+        "images_per_s": round(len(latencies) / total, 2) if total else 0.0,
+        **latency_summary(latencies),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--images", required=True)
+    parser.add_argument("--reference", default="yolov5:app/models/vp.pt")
+    parser.add_argument("--candidate", default="onnx:app/models/vp.onnx")
+    parser.add_argument("--conf", type=float, default=DEFAULT_MODEL_CONF)
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--min-agreement", type=float, default=1.0)
+    args = parser.parse_args()
+
+    paths = list_images(args.images)
+    images = load_images(paths)
+
+    services = []
+    for spec in (args.reference, args.candidate):
+        backend, path = _parse_spec(spec)
+        services.append(ReportClassifierService(path, model_conf_threshold=args.conf, backend=backend))
+
+    ref_out, ref_perf = _run(services[0], images, args.repeat)
+    cand_out, cand_perf = _run(services[1], images, args.repeat)
+
+    mismatches = []
+    max_conf_diff = 0.0
+    for path, (ref_id, ref_conf, ref_info), (cand_id, cand_conf, cand_info) in zip(paths, ref_out, cand_out):
+        max_conf_diff = max(max_conf_diff, abs(ref_conf - cand_conf))
+        if ref_id != cand_id:
+            mismatches.append(
+                {"image": str(path), "reference": ref_info["code"], "candidate": cand_info["code"]}
+            )
+
+    agreement = 1.0 - len(mismatches) / len(paths)
+    print(
+        json.dumps(
+            {
+                "images": len(paths),
+                "agreement": round(agreement, 4),
+                "max_confidence_diff": round(max_conf_diff, 4),
+                "mismatches": mismatches,
+                "reference": ref_perf,
+                "candidate": cand_perf,
+            },
+            indent=2,
+            ensure_ascii=False,
+        )
+    )
+    sys.exit(0 if agreement >= args.min_agreement else 1)
+
+
+if __name__ == "__main__":
+    main()
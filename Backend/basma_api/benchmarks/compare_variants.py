@@ -0,0 +1,140 @@
+# benchmarks/compare_variants.py
+"""
+Accuracy-vs-speed report for the FP32 and INT8 classifier variants.
+
+The fixture set is labelled by directory name, one folder per
+REPORT_TYPE_META code:
+
+    fixtures/GARBAGE/*.jpg
+    fixtures/POTHOLES/*.jpg
+    ...
+
+    python -m benchmarks.compare_variants --images ./fixtures \
+        --model app/models/vp.onnx --variants fp32,int8
+
+Each variant runs in its own process (so memory numbers are not mixed) and
+the report contains latency, throughput, peak RSS, accuracy against the
+labels and per-class agreement of the final code with the first variant.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import multiprocessing as mp
+import time
+from collections import Counter, defaultdict
+from typing import Dict, List, Optional
+
+from benchmarks._common import (
+    DEFAULT_MODEL_CONF,
+    ensure_app_importable,
+    latency_summary,
+    list_images,
+    peak_rss_mb,
+)
+
+ensure_app_importable()
+
+
+def _label_for(path: str, root: str) -> Optional[str]:
+    from pathlib import Path
+
+    from app.ml.report_classifier import REPORT_TYPE_META
+
+    parts = Path(path).relative_to(root).parts
+    label = parts[0].upper() if len(parts) > 1 else None
+    return label if label in REPORT_TYPE_META else None
+
+
+def _run_variant(
+    variant: str,
+    backend: str,
+    model: str,
+    conf: float,
+    files: List[str],
+    repeat: int,
+    out: "mp.Queue",
+) -> None:
+    from app.ml.report_classifier import ReportClassifierService
+
+    rss_before = peak_rss_mb()
+    load_start = time.perf_counter()
+    clf = ReportClassifierService(model, model_conf_threshold=conf, backend=backend, variant=variant)
+    load_s = time.perf_counter() - load_start
+    blobs = [open(f, "rb").read() for f in files]
+    clf.predict(blobs[0])  # warm-up
+
+    codes: List[str] = []
+    latencies: List[float] = []
+    for r in range(repeat):
+        for blob in blobs:
+            start = time.perf_counter()
+            _, _, info = clf.predict(blob)
+            latencies.append(time.perf_counter() - start)
+            if r == 0:
+                codes.append(info["code"])
+    total = sum(latencies)
+    out.put(
+        {
+            "variant": variant,
+            "backend": clf.backend_name,
+            "model_version": clf.model_version,
+            "load_s": round(load_s, 2),
+            "images_per_s": round(len(latencies) / total, 2) if total else 0.0,
+            **latency_summary(latencies),
+            "peak_rss_mb": round(peak_rss_mb(), 1),
+            "model_rss_mb": round(peak_rss_mb() - rss_before, 1),
+            "codes": codes,
+        }
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--images", required=True, help="labelled fixture root")
+    parser.add_argument("--model", default="app/models/vp.onnx")
+    parser.add_argument("--backend", default="onnx", help="backend for the fp32 variant")
+    parser.add_argument("--variants", default="fp32,int8")
+    parser.add_argument("--conf", type=float, default=DEFAULT_MODEL_CONF)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    files = [str(p) for p in list_images(args.images)]
+    labels = [_label_for(f, args.images) for f in files]
+    variants = [v.strip() for v in args.variants.split(",") if v.strip()]
+
+    ctx = mp.get_context("spawn")
+    runs: List[Dict] = []
+    for variant in variants:
+        queue: mp.Queue = ctx.Queue()
+        proc = ctx.Process(
+            target=_run_variant,
+            args=(variant, args.backend, args.model, args.conf, files, args.repeat, queue),
+        )
+        proc.start()
+        runs.append(queue.get())
+        proc.join()
+
+    reference = runs[0]["codes"]
+    for run in runs:
+        codes = run.pop("codes")
+        labelled = [(c, l) for c, l in zip(codes, labels) if l]
+        run["accuracy"] = (
+            round(sum(c == l for c, l in labelled) / len(labelled), 4) if labelled else None
+        )
+        run["distribution"] = dict(Counter(codes))
+
+        per_class: Dict[str, List[int]] = defaultdict(lambda: [0, 0])
+        for ref_code, code in zip(reference, codes):
+            per_class[ref_code][1] += 1
+            per_class[ref_code][0] += int(ref_code == code)
+        run["agreement_with_" + runs[0]["variant"]] = {
+            "overall": round(sum(a for a, _ in per_class.values()) / len(codes), 4),
+            "per_class": {k: round(a / n, 4) for k, (a, n) in sorted(per_class.items())},
+        }
+
+    print(json.dumps({"images": len(files), "labelled": sum(1 for l in labels if l), "runs": runs}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+# benchmarks/fake_geocoder.py
+"""
+Local stand-in for Nominatim's ``/reverse`` endpoint, for benchmarks.
+
+Answers with a deterministic Arabic address derived from the coordinate
+(governorate / district / area cells of a fixed grid), after an optional
+artificial delay. Serve it over TLS to include handshake costs:
+
+    python -m benchmarks.fake_geocoder --port 8200 --latency-ms 20
+    python -m benchmarks.fake_geocoder --port 8443 --certfile cert.pem --keyfile key.pem
+
+Point the API at it with ``GEOCODER_URL=http://127.0.0.1:8200/reverse``.
+
+Fault injection (flags at start, or ``POST /control`` with the same keys
+as JSON at runtime, e.g. to simulate an outage and its recovery):
+
+- ``--jitter-ms``: extra uniform random delay
+- ``--error-rate`` / ``--error-status``: share of answers replaced by an
+  error status (503 by default; 429 answers carry ``Retry-After: 1``)
+- ``--hang-rate`` / ``--hang-seconds``: share of requests that stall
+  (to trigger client timeouts)
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import math
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+from fastapi import Body, FastAPI, Query
+from fastapi.responses import JSONResponse
+
+app = FastAPI(title="fake geocoder")
+app.state.requests = 0
+app.state.errors = 0
+app.state.faults = {
+    "latency_ms": 0.0,
+    "jitter_ms": 0.0,
+    "error_rate": 0.0,
+    "error_status": 503,
+    "hang_rate": 0.0,
+    "hang_seconds": 30.0,
+}
+
+
+def fake_address(lat: float, lon: float) -> Dict[str, Any]:
+    """Nominatim-shaped answer; nearby points share governorate/district/area."""
+    gov = math.floor(lat * 2) * 1000 + math.floor(lon * 2)
+    dist = math.floor(lat * 10) * 10000 + math.floor(lon * 10)
+    area = math.floor(lat * 100) * 100000 + math.floor(lon * 100)
+    return {
+        "lat": str(lat),
+        "lon": str(lon),
+        "display_name": f"شارع {abs(area) % 97}، حي {abs(area) % 1000}",
+        "address": {
+            "state": f"محافظة {abs(gov) % 1000}",
+            "county": f"لواء {abs(dist) % 1000}",
+            "suburb": f"حي {abs(area) % 1000}",
+            "country": "الأردن",
+            "country_code": "jo",
+        },
+    }
+
+
+@app.get("/reverse")
+async def reverse(lat: float = Query(...), lon: float = Query(...)):
+    faults = app.state.faults
+    app.state.requests += 1
+    delay = (faults["latency_ms"] + random.uniform(0, faults["jitter_ms"])) / 1000.0
+    if faults["hang_rate"] and random.random() < faults["hang_rate"]:
+        delay += faults["hang_seconds"]
+    if delay:
+        await asyncio.sleep(delay)
+    if faults["error_rate"] and random.random() < faults["error_rate"]:
+        app.state.errors += 1
+        status_code = int(faults["error_status"])
+        headers = {"Retry-After": "1"} if status_code == 429 else None
+        return JSONResponse({"error": "injected"}, status_code=status_code, headers=headers)
+    return fake_address(lat, lon)
+
+
+@app.post("/control")
+def control(changes: Dict[str, float] = Body(...)):
+    for key, value in changes.items():
+        if key in app.state.faults:
+            app.state.faults[key] = float(value)
+    return app.state.faults
+
+
+@app.get("/stats")
+def stats():
+    return {"requests": app.state.requests, "errors": app.state.errors, "faults": app.state.faults}
+
+
+# -------------------------
+# Helpers for benchmark scripts (start the fake in a subprocess)
+# -------------------------
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _self_signed_cert(directory: str) -> Tuple[str, str]:
+    cert, key = os.path.join(directory, "cert.pem"), os.path.join(directory, "key.pem")
+    subprocess.run(
+        [
+            "openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes", "-days", "1",
+            "-subj", "/CN=127.0.0.1", "-addext", "subjectAltName=IP:127.0.0.1",
+            "-keyout", key, "-out", cert,
+        ],
+        check=True,
+        capture_output=True,
+    )
+    return cert, key
+
+
+def start_fake_geocoder(
+    latency_ms: float = 0.0,
+    tls_dir: Optional[str] = None,
+    port: Optional[int] = None,
+    extra_args: Sequence[str] = (),
+) -> Tuple[subprocess.Popen, str]:
+    """Run this module on ``port`` (default: a free one); returns ``(process, /reverse URL)``."""
+    port = port or free_port()
+    cmd = [
+        sys.executable, "-m", "benchmarks.fake_geocoder",
+        "--port", str(port), "--latency-ms", str(latency_ms), *extra_args,
+    ]
+    scheme = "http"
+    if tls_dir:
+        cert, key = _self_signed_cert(tls_dir)
+        cmd += ["--certfile", cert, "--keyfile", key]
+        scheme = "https"
+    proc = subprocess.Popen(cmd)
+    url = f"{scheme}://127.0.0.1:{port}/reverse"
+    deadline = time.monotonic() + 15
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.2):
+                return proc, url
+        except OSError:
+            time.sleep(0.1)
+    proc.kill()
+    sys.exit("fake geocoder did not start")
+
+
+def main() -> None:
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8200)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="delay added to each answer")
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--error-status", type=int, default=503)
+    parser.add_argument("--hang-rate", type=float, default=0.0)
+    parser.add_argument("--hang-seconds", type=float, default=30.0)
+    parser.add_argument("--certfile", default=None)
+    parser.add_argument("--keyfile", default=None)
+    args = parser.parse_args()
+
+    app.state.faults.update(
+        latency_ms=max(0.0, args.latency_ms),
+        jitter_ms=max(0.0, args.jitter_ms),
+        error_rate=args.error_rate,
+        error_status=args.error_status,
+        hang_rate=args.hang_rate,
+        hang_seconds=args.hang_seconds,
+    )
+    uvicorn.run(
+        app,
+        host=args.host,
+        port=args.port,
+        ssl_certfile=args.certfile,
+        ssl_keyfile=args.keyfile,
+        log_level="warning",
+    )
+
+
+if __name__ == "__main__":
+    main()
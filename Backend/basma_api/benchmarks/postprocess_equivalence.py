@@ -0,0 +1,267 @@
+# benchmarks/postprocess_equivalence.py
+"""
+Property check: the NumPy post-processing in ReportClassifierService makes
+exactly the same decision as the original per-box Python loops (kept below
+verbatim as the reference) on randomly generated detection arrays.
+
+    python -m benchmarks.postprocess_equivalence --cases 20000 --seed 0
+
+Cases are biased towards the edge cases of the rules: GARBAGE mixed with
+other classes, FADED_SIGNAGE + GARBAGE, tied confidences/impacts, class
+names that normalize to the same code, unknown and empty names, inverted
+boxes and confidences under the 1e-3 cut-off. Exit status 1 on mismatch.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import sys
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from benchmarks._common import ensure_app_importable
+
+ensure_app_importable()
+
+from app.ml.report_classifier import (  # noqa: E402
+    BASE_IMPACT_BIAS,
+    DEFAULT_AREA_WEIGHT,
+    FADED_SIGNAGE_CLASS_CODE,
+    GARBAGE_AREA_WEIGHT,
+    GARBAGE_CLASS_CODE,
+    GARBAGE_DOMINANCE_FACTOR,
+    REPORT_TYPE_META,
+    ReportClassifierService,
+)
+
+# ============================================================
+# Reference implementation (pre-vectorization, per-box loops)
+# ============================================================
+
+
+def legacy_extract_predictions(
+    normalize,
+    det: Any,
+    names: Optional[Dict[int, str]],
+    image_width: int,
+    image_height: int,
+) -> List[Dict[str, Any]]:
+    predictions: List[Dict[str, Any]] = []
+    if det is None or len(det) == 0:
+        return predictions
+
+    image_area = float(max(1, image_width * image_height))
+
+    for row in det.tolist():
+        if len(row) < 6:
+            continue
+
+        x1, y1, x2, y2, conf, cls_idx = row
+        conf = float(conf)
+        cls_idx = int(cls_idx)
+
+        if conf < 1e-3:
+            continue
+
+        w = max(0.0, x2 - x1)
+        h = max(0.0, y2 - y1)
+        box_area = max(0.0, w * h)
+        area_ratio = 0.0
+        if image_area > 0:
+            area_ratio = max(0.0, min(1.0, box_area / image_area))
+
+        # اسم الكلاس كما هو في النموذج
+        if isinstance(names, dict) and cls_idx in names:
+            raw_label = str(names[cls_idx])
+        else:
+            raw_label = str(cls_idx)
+
+        # تحويل الاسم الخام إلى كود تصنيف موحّد إن أمكن
+        label_code = normalize(raw_label)
+
+        # حساب impact_score مع تقليل تأثير الحجم لفئة القمامة
+        if label_code == GARBAGE_CLASS_CODE:
+            area_weight = GARBAGE_AREA_WEIGHT
+        else:
+            area_weight = DEFAULT_AREA_WEIGHT
+
+        impact_score = conf * (BASE_IMPACT_BIAS + area_weight * area_ratio)
+
+        predictions.append(
+            {
+                "class": label_code,
+                "raw_class": raw_label,
+                "class_id": cls_idx,
+                "confidence": conf,
+                "area_ratio": area_ratio,
+                "impact_score": impact_score,
+            }
+        )
+
+    return predictions
+
+def legacy_aggregate_predictions(
+    predictions: List[Dict[str, Any]],
+) -> Tuple[str, float, Optional[int]]:
+    if not predictions:
+        return "OTHERS", 0.0, None
+
+    stats: Dict[str, Dict[str, Any]] = {}
+
+    # تجميع الإحصائيات لكل كلاس متوقع
+    for p in predictions:
+        label = p.get("class")
+        if not label:
+            continue
+
+        conf = float(p.get("confidence", 0.0))
+        impact = float(p.get("impact_score", 0.0))
+        model_class_id = p.get("class_id")
+
+        if label not in stats:
+            stats[label] = {
+                "count": 0,
+                "best_conf": 0.0,
+                "best_class_id": None,
+                "total_impact": 0.0,
+            }
+
+        s = stats[label]
+        s["count"] += 1
+        s["total_impact"] += impact
+        if conf > s["best_conf"]:
+            s["best_conf"] = conf
+            s["best_class_id"] = model_class_id
+
+    if not stats:
+        return "OTHERS", 0.0, None
+
+    has_garbage = GARBAGE_CLASS_CODE in stats
+    non_garbage_labels = [lbl for lbl in stats.keys() if lbl != GARBAGE_CLASS_CODE]
+
+    # ✅ حالة وجود القمامة + فئات أخرى
+    if has_garbage and non_garbage_labels:
+        # 1) قاعدة خاصة: إذا كانت FADED_SIGNAGE موجودة مع GARBAGE → اختر FADED_SIGNAGE فوراً
+        if FADED_SIGNAGE_CLASS_CODE in stats:
+            chosen_stats = stats[FADED_SIGNAGE_CLASS_CODE]
+            return (
+                FADED_SIGNAGE_CLASS_CODE,
+                float(chosen_stats["best_conf"]),
+                chosen_stats["best_class_id"],
+            )
+
+        # 2) اختيار أفضل فئة غير القمامة حسب التأثير الكلي
+        best_label: Optional[str] = None
+        best_tuple = (-1.0, -1.0, -1)  # (total_impact, best_conf, count)
+
+        for label in non_garbage_labels:
+            s = stats[label]
+            candidate = (s["total_impact"], s["best_conf"], s["count"])
+            if candidate > best_tuple:
+                best_tuple = candidate
+                best_label = label
+
+        if best_label is None:
+            # احتياطاً لو حدث شيء غير متوقع
+            best_label = GARBAGE_CLASS_CODE
+
+        # مقارنة تأثير القمامة بأفضل فئة أخرى
+        garbage_impact = stats[GARBAGE_CLASS_CODE]["total_impact"]
+        best_non_impact = stats.get(best_label, {}).get("total_impact", 0.0)
+
+        if garbage_impact > GARBAGE_DOMINANCE_FACTOR * best_non_impact:
+            # إذا كان تأثير القمامة أعلى بكثير → نختار القمامة
+            best_label = GARBAGE_CLASS_CODE
+
+        chosen_stats = stats[best_label]
+        return (
+            best_label,
+            float(chosen_stats["best_conf"]),
+            chosen_stats["best_class_id"],
+        )
+
+    # ⬅️ لا توجد إلا فئة واحدة (أو لا يوجد GARBAGE + فئات أخرى)
+    best_label: Optional[str] = None
+    best_tuple = (-1.0, -1.0, -1)
+
+    for label, s in stats.items():
+        candidate = (s["total_impact"], s["best_conf"], s["count"])
+        if candidate > best_tuple:
+            best_tuple = candidate
+            best_label = label
+
+    if best_label is None:
+        return "OTHERS", 0.0, None
+
+    best_conf = float(stats[best_label]["best_conf"])
+    best_class_id = stats[best_label]["best_class_id"]
+    return best_label, best_conf, best_class_id
+
+
+# ============================================================
+# Random case generation
+# ============================================================
+
+# Model class names: real codes in various casings, aliases mapping to the
+# same code, an unknown name and an empty name.
+NAMES: Dict[int, str] = {i: code for i, code in enumerate(REPORT_TYPE_META)}
+NAMES.update({11: "garbage", 12: " Faded_Signage ", 13: "unknown_thing", 14: ""})
+NUM_CLASSES = 16  # 15 has no name -> raw label "15"
+FOCUS_CLASSES = [2, 11, 8, 12, 5]  # GARBAGE / FADED_SIGNAGE / POTHOLES heavy
+
+
+def random_detections(rng: random.Random) -> Tuple[np.ndarray, int, int]:
+    width, height = rng.choice([(640, 480), (480, 640), (1000, 750), (1, 1)])
+    n = rng.choice([0, 1, 2, 3, 5, 8, 20, 60])
+    conf_levels = [0.0005, 0.1, 0.25, 0.5, 0.5, 0.9]
+    rows = []
+    for _ in range(n):
+        cls = rng.choice(FOCUS_CLASSES) if rng.random() < 0.6 else rng.randrange(NUM_CLASSES)
+        x1 = rng.uniform(-20, width)
+        y1 = rng.uniform(-20, height)
+        # occasionally inverted or identical boxes
+        x2 = x1 + rng.choice([rng.uniform(-5, width), 10.0, 0.0])
+        y2 = y1 + rng.choice([rng.uniform(-5, height), 10.0, 0.0])
+        conf = rng.choice(conf_levels) if rng.random() < 0.5 else rng.random()
+        rows.append([x1, y1, x2, y2, conf, float(cls)])
+    det = np.asarray(rows, dtype=np.float32).reshape(-1, 6)
+    return det, width, height
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cases", type=int, default=20000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    # Post-processing does not touch the model, so skip __init__
+    clf = ReportClassifierService.__new__(ReportClassifierService)
+
+    for case in range(args.cases):
+        det, width, height = random_detections(rng)
+        expected = legacy_aggregate_predictions(
+            legacy_extract_predictions(clf._normalize_label_to_code, det, NAMES, width, height)
+        )
+        actual = clf._aggregate_predictions(clf._extract_predictions(det, NAMES, width, height))
+        if expected != actual:
+            print(
+                json.dumps(
+                    {
+                        "case": case,
+                        "expected": expected,
+                        "actual": actual,
+                        "size": [width, height],
+                        "det": det.tolist(),
+                    }
+                )
+            )
+            sys.exit(1)
+
+    print(f"ok: {args.cases} cases, identical decisions")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+# benchmarks/sweep_threads.py
+"""
+Sweep model thread settings on this machine and recommend the fastest.
+
+Each combination of intra-op threads, inter-op threads and executor width
+(threads calling the model, i.e. ``AI_INFERENCE_WORKERS``) runs in its own
+``benchmarks.bench_classifier`` subprocess, because torch's thread pools
+are process-wide and the inter-op pool cannot be resized once used:
+
+    python -m benchmarks.sweep_threads --images ./samples \
+        --intra 1,2,4,8 --inter 1,2 --width 1,2,4 --repeat 3
+
+Combinations whose total threads (intra x width) exceed ``--max-oversub``
+times the CPU count are skipped. Pass ``--workers N`` when N API worker
+processes share the host: the CPU budget per process is divided by N.
+The recommendation is the highest images/sec, ties broken by p95.
+"""
+from __future__ import annotations
+
+import argparse
+import itertools
+import json
+import os
+import subprocess
+import sys
+from typing import Dict, List, Optional
+
+from benchmarks._common import DEFAULT_MODEL_CONF, DEFAULT_MODEL_PATH
+
+
+def _int_list(value: str) -> List[int]:
+    return sorted({int(v) for v in value.split(",") if v.strip()})
+
+
+def _default_intra(cpus: int) -> str:
+    values = {1, cpus}
+    n = 2
+    while n < cpus:
+        values.add(n)
+        n *= 2
+    return ",".join(str(v) for v in sorted(values))
+
+
+def run_combination(args: argparse.Namespace, intra: int, inter: int, width: int) -> Optional[Dict]:
+    cmd = [
+        sys.executable, "-m", "benchmarks.bench_classifier",
+        "--images", args.images,
+        "--model", args.model,
+        "--conf", str(args.conf),
+        "--intra-op", str(intra),
+        "--inter-op", str(inter),
+        "--concurrency", str(width),
+        "--batch-size", str(args.batch_size),
+        "--repeat", str(args.repeat),
+        "--warmup", str(max(args.warmup, width)),
+    ]
+    if args.limit:
+        cmd += ["--limit", str(args.limit)]
+    if args.backend:
+        cmd += ["--backend", args.backend]
+    if args.variant:
+        cmd += ["--variant", args.variant]
+    env = dict(os.environ, OMP_NUM_THREADS=str(intra), MKL_NUM_THREADS=str(intra))
+    proc = subprocess.run(cmd, capture_output=True, text=True, env=env)
+    if proc.returncode != 0:
+        print(f"intra={intra} inter={inter} width={width} failed:\n{proc.stderr[-2000:]}", file=sys.stderr)
+        return None
+    try:
+        report = json.loads(proc.stdout[proc.stdout.index("{"):])
+    except ValueError:
+        return None
+    return {
+        "intra_op": intra,
+        "inter_op": inter,
+        "width": width,
+        "images_per_s": report.get("images_per_s"),
+        "p50_ms": report.get("p50_ms"),
+        "p95_ms": report.get("p95_ms"),
+        "peak_rss_mb": report.get("peak_rss_mb"),
+    }
+
+
+def main() -> None:
+    cpus = os.cpu_count() or 1
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--images", required=True, help="directory of sample images")
+    parser.add_argument("--limit", type=int, default=None)
+    parser.add_argument("--model", default=DEFAULT_MODEL_PATH)
+    parser.add_argument("--conf", type=float, default=DEFAULT_MODEL_CONF)
+    parser.add_argument("--backend", default=None, help="yolov5 / onnx (default AI_MODEL_BACKEND)")
+    parser.add_argument("--variant", default=None, help="fp32 / int8 (default AI_MODEL_VARIANT)")
+    parser.add_argument("--intra", default=None, help="intra-op values, comma separated")
+    parser.add_argument("--inter", default="1,2", help="inter-op values, comma separated")
+    parser.add_argument("--width", default=None, help="executor widths, comma separated")
+    parser.add_argument("--workers", type=int, default=1, help="API worker processes sharing the host")
+    parser.add_argument("--max-oversub", type=float, default=1.0, help="max (intra x width) / CPUs per worker")
+    parser.add_argument("--batch-size", type=int, default=1)
+    parser.add_argument("--repeat", type=int, default=2)
+    parser.add_argument("--warmup", type=int, default=2)
+    parser.add_argument("--output", default=None, help="also write the JSON report here")
+    args = parser.parse_args()
+
+    budget = max(1, cpus // max(1, args.workers))
+    intra_values = _int_list(args.intra or _default_intra(budget))
+    inter_values = _int_list(args.inter)
+    width_values = _int_list(args.width or "1,2,4")
+
+    results: List[Dict] = []
+    skipped: List[Dict] = []
+    for intra, inter, width in itertools.product(intra_values, inter_values, width_values):
+        if intra * width > budget * args.max_oversub:
+            skipped.append({"intra_op": intra, "inter_op": inter, "width": width})
+            continue
+        result = run_combination(args, intra, inter, width)
+        if result is not None:
+            print(json.dumps(result), file=sys.stderr)
+            results.append(result)
+
+    best = None
+    if results:
+        best = max(results, key=lambda r: (r["images_per_s"] or 0.0, -(r["p95_ms"] or 0.0)))
+    report = {
+        "cpus": cpus,
+        "workers": args.workers,
+        "cpu_budget_per_worker": budget,
+        "results": sorted(results, key=lambda r: -(r["images_per_s"] or 0.0)),
+        "skipped": skipped,
+        "recommended": best and {
+            **best,
+            "env": {
+                "AI_INTRA_OP_THREADS": best["intra_op"],
+                "AI_INTER_OP_THREADS": best["inter_op"],
+                "AI_INFERENCE_WORKERS": best["width"],
+            },
+        },
+    }
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as fh:
+            fh.write(text + "\n")
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+# tests/test_backends.py
+"""Inference backend interface, NumPy YOLO post-processing and ONNX/PyTorch parity."""
+import os
+from pathlib import Path
+
+import numpy as np
+import pytest
+from PIL import Image, ImageDraw
+
+from app.ml.backends import (
+    InferenceBackend,
+    letterbox,
+    nms,
+    postprocess_yolo_output,
+    scale_boxes,
+)
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def test_backend_is_abstract():
+    with pytest.raises(TypeError):
+        InferenceBackend()
+
+    class Partial(InferenceBackend):
+        def set_conf(self, conf):
+            pass
+
+    with pytest.raises(TypeError):
+        Partial()
+
+
+def test_nms_keeps_best_of_overlapping_boxes():
+    boxes = np.array([[0, 0, 10, 10], [1, 1, 10, 10], [20, 20, 30, 30]], dtype=np.float32)
+    scores = np.array([0.5, 0.9, 0.4], dtype=np.float32)
+    assert nms(boxes, scores, 0.45).tolist() == [1, 2]
+
+
+def test_postprocess_is_class_aware():
+    # two identical boxes of different classes both survive; same class does not
+    def row(cls, obj):
+        scores = [0.0, 0.0]
+        scores[cls] = 1.0
+        return [50, 50, 20, 20, obj] + scores
+
+    pred = np.array([row(0, 0.9), row(1, 0.8), row(0, 0.7)], dtype=np.float32)
+    det = postprocess_yolo_output(pred, conf_threshold=0.25)
+    assert det.shape == (2, 6)
+    assert sorted(det[:, 5].tolist()) == [0.0, 1.0]
+    np.testing.assert_allclose(det[0, :4], [40, 40, 60, 60])
+
+
+def test_letterbox_round_trip():
+    image = Image.new("RGB", (800, 400))
+    canvas, gain, pad = letterbox(image, 640)
+    assert canvas.shape == (640, 640, 3)
+    original = np.array([[100, 50, 700, 350, 0.9, 3]], dtype=np.float64)
+    boxed = original.copy()
+    boxed[:, [0, 2]] = boxed[:, [0, 2]] * gain + pad[0]
+    boxed[:, [1, 3]] = boxed[:, [1, 3]] * gain + pad[1]
+    np.testing.assert_allclose(scale_boxes(boxed, gain, pad, image.size), original, atol=1e-6)
+
+
+# -------------------------
+# ONNX Runtime vs PyTorch (needs both runtimes and both model files)
+# -------------------------
+
+PT_PATH = ROOT / os.getenv("AI_MODEL_PATH", "app/models/vp.pt")
+ONNX_PATH = PT_PATH.with_suffix(".onnx")
+
+
+def _fixture_images():
+    folder = os.getenv("BASMA_TEST_IMAGES")
+    if folder:
+        from benchmarks._common import list_images, load_images
+
+        return load_images(list_images(folder, limit=20))
+    import io
+
+    blobs = []
+    for seed in range(4):
+        rng = np.random.default_rng(seed)
+        image = Image.fromarray(rng.integers(0, 255, (480, 640, 3), dtype=np.uint8))
+        draw = ImageDraw.Draw(image)
+        for _ in range(3):
+            x, y = rng.integers(0, 500, 2)
+            color = tuple(rng.integers(0, 255, 3).tolist())
+            draw.rectangle([int(x), int(y), int(x) + 120, int(y) + 80], fill=color)
+        buf = io.BytesIO()
+        image.save(buf, format="JPEG")
+        blobs.append(buf.getvalue())
+    return blobs
+
+
+def test_onnx_matches_pytorch():
+    pytest.importorskip("yolov5")
+    pytest.importorskip("onnxruntime")
+    if not PT_PATH.is_file() or not ONNX_PATH.is_file():
+        pytest.skip(f"needs {PT_PATH.name} and {ONNX_PATH.name} (python -m app.ml.export_onnx)")
+
+    from app.ml.report_classifier import ReportClassifierService
+
+    reference = ReportClassifierService(str(PT_PATH), backend="yolov5", tiled=False)
+    candidate = ReportClassifierService(str(ONNX_PATH), backend="onnx", tiled=False)
+    for blob in _fixture_images():
+        ref_id, ref_conf, _ = reference.predict(blob)
+        cand_id, cand_conf, _ = candidate.predict(blob)
+        assert cand_id == ref_id
+        assert abs(cand_conf - ref_conf) < 0.02
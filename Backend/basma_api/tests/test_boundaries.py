@@ -0,0 +1,71 @@
+# tests/test_boundaries.py
+"""Boundary index: bad files disable it, and unmatched features are retried."""
+import json
+
+from app.services import boundaries
+from app.services.boundaries import BoundaryIndex
+
+SQUARE = [[[35.0, 31.0], [36.0, 31.0], [36.0, 32.0], [35.0, 32.0], [35.0, 31.0]]]
+
+
+def _write(tmp_path, features):
+    path = tmp_path / "boundaries.geojson"
+    path.write_text(json.dumps({"type": "FeatureCollection", "features": features}), encoding="utf-8")
+    return str(path)
+
+
+def test_malformed_geometry_falls_back_to_empty_index(tmp_path, monkeypatch):
+    path = _write(
+        tmp_path,
+        [
+            {
+                "properties": {"level": "district"},
+                "geometry": {"type": "Polygon", "coordinates": [[[35.0]]]},
+            }
+        ],
+    )
+    monkeypatch.setattr(boundaries, "_index", None)
+    monkeypatch.setattr(boundaries, "GEOCODER_BOUNDARIES_PATH", path)
+    index = boundaries.get_boundary_index()
+    assert not index.enabled
+    assert boundaries.get_boundary_index() is index
+
+
+class FakeQuery:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def filter(self, *args):
+        return self
+
+    def first(self):
+        return self.rows[0] if self.rows else None
+
+
+class FakeDB:
+    def __init__(self):
+        self.rows = []
+        self.queries = 0
+
+    def query(self, *args):
+        self.queries += 1
+        return FakeQuery(self.rows)
+
+
+def test_row_id_misses_are_not_memoised(tmp_path):
+    path = _write(
+        tmp_path,
+        [
+            {
+                "properties": {"level": "government", "name_ar": "عمان"},
+                "geometry": {"type": "Polygon", "coordinates": SQUARE},
+            }
+        ],
+    )
+    index = BoundaryIndex(path)
+    db = FakeDB()
+    assert index._row_id(db, 0, None) is None
+    db.rows = [(7,)]  # the governorate row is created later
+    assert index._row_id(db, 0, None) == 7
+    assert index._row_id(db, 0, None) == 7
+    assert db.queries == 2
@@ -0,0 +1,95 @@
+# tests/test_geocoder_resilience.py
+"""The circuit breaker's half-open probe always ends with an outcome or a release."""
+import asyncio
+
+import httpx
+import pytest
+
+from app.services.geocoding import GeocoderUnavailable, GeocodingClient
+from app.services.resilience import CircuitBreaker
+
+
+def _client(handler, **kwargs) -> GeocodingClient:
+    options = dict(
+        url="http://geocoder.test/reverse",
+        rate_limit=0.0,
+        retries=1,
+        retry_backoff=0.0,
+        breaker_failures=1,
+        breaker_reset_seconds=0.05,
+    )
+    options.update(kwargs)
+    geocoder = GeocodingClient(**options)
+    geocoder._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return geocoder
+
+
+def test_rate_limited_retry_does_not_wedge_half_open():
+    status = {"code": 503}
+
+    def handler(request):
+        return httpx.Response(status["code"], json={"display_name": "x"})
+
+    async def scenario():
+        # one token, no waiting: the probe's retry is refused by the bucket
+        geocoder = _client(handler, rate_limit=0.001, rate_burst=1.0, rate_max_wait=0.0)
+        geocoder.breaker.state = CircuitBreaker.OPEN
+        geocoder.breaker._opened_at = 0.0
+        with pytest.raises(GeocoderUnavailable):
+            await geocoder.reverse(31.9, 35.9)
+        assert geocoder.breaker.state == CircuitBreaker.OPEN
+        assert not geocoder.breaker._probe_in_flight
+
+        status["code"] = 200
+        geocoder.bucket = type(geocoder.bucket)(0.0)
+        await asyncio.sleep(0.06)
+        assert (await geocoder.reverse(31.9, 35.9))["display_name"] == "x"
+        assert geocoder.breaker.state == CircuitBreaker.CLOSED
+
+    asyncio.run(scenario())
+
+
+def test_probe_refused_before_sending_is_released():
+    def handler(request):
+        return httpx.Response(200, json={})
+
+    async def scenario():
+        geocoder = _client(handler, rate_limit=0.001, rate_burst=1.0, rate_max_wait=0.0)
+        geocoder.bucket.reserve(0.0)  # bucket now empty
+        geocoder.breaker.state = CircuitBreaker.OPEN
+        geocoder.breaker._opened_at = 0.0
+        with pytest.raises(GeocoderUnavailable, match="rate limited"):
+            await geocoder.reverse(31.9, 35.9)
+        assert geocoder.breaker.state == CircuitBreaker.HALF_OPEN
+        assert not geocoder.breaker.probing
+
+    asyncio.run(scenario())
+
+
+def test_open_circuit_does_not_take_a_token():
+    async def scenario():
+        geocoder = _client(lambda request: httpx.Response(200, json={}), rate_limit=1.0)
+        geocoder.breaker.state = CircuitBreaker.OPEN
+        geocoder.breaker._opened_at = 1e18
+        tokens = geocoder.bucket._tokens
+        with pytest.raises(GeocoderUnavailable, match="circuit open"):
+            await geocoder.reverse(31.9, 35.9)
+        assert geocoder.bucket._tokens == tokens
+
+    asyncio.run(scenario())
+
+
+def test_non_transport_http_error_counts_as_failure():
+    def handler(request):
+        raise httpx.DecodingError("bad gzip")
+
+    async def scenario():
+        geocoder = _client(handler)
+        geocoder.breaker.state = CircuitBreaker.OPEN
+        geocoder.breaker._opened_at = 0.0
+        with pytest.raises(GeocoderUnavailable):
+            await geocoder.reverse(31.9, 35.9)
+        assert geocoder.breaker.state == CircuitBreaker.OPEN
+        assert not geocoder.breaker._probe_in_flight
+
+    asyncio.run(scenario())
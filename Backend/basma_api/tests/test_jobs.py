@@ -0,0 +1,60 @@
+# tests/test_jobs.py
+"""Analyze job state: lifecycle, heartbeat and jobs abandoned by a dead worker."""
+import asyncio
+
+from app.ml.jobs import ABANDONED_ERROR, DONE, FAILED, JobRunner, JobStore
+
+
+def test_job_lifecycle(tmp_path):
+    async def scenario():
+        store = JobStore(str(tmp_path / "jobs.sqlite3"), ttl_seconds=3600, stale_seconds=60)
+        runner = JobRunner(store, concurrency=1, max_queued=4)
+        job = await store.create()
+
+        async def work():
+            await asyncio.sleep(0.05)
+            return {"report_type_id": 3}
+
+        runner.submit(job["id"], work)
+        while runner.stats()["active"]:
+            await asyncio.sleep(0.01)
+        return await store.get(job["id"])
+
+    job = asyncio.run(scenario())
+    assert job["status"] == DONE
+    assert job["result"] == {"report_type_id": 3}
+
+
+def test_abandoned_job_is_failed(tmp_path):
+    async def scenario():
+        store = JobStore(str(tmp_path / "jobs.sqlite3"), ttl_seconds=3600, stale_seconds=0.2)
+        # accepted by a worker that then died: nobody touches the row again
+        job = await store.create()
+        await asyncio.sleep(0.3)
+        return await store.get(job["id"])
+
+    job = asyncio.run(scenario())
+    assert job["status"] == FAILED
+    assert job["error"] == ABANDONED_ERROR
+
+
+def test_heartbeat_keeps_long_job_alive(tmp_path):
+    async def scenario():
+        store = JobStore(str(tmp_path / "jobs.sqlite3"), ttl_seconds=3600, stale_seconds=0.3)
+        runner = JobRunner(store, concurrency=1, max_queued=4, heartbeat_seconds=0.05)
+        job = await store.create()
+
+        async def work():
+            await asyncio.sleep(0.8)
+            return {}
+
+        runner.submit(job["id"], work)
+        await asyncio.sleep(0.5)
+        during = await store.get(job["id"])
+        while runner.stats()["active"]:
+            await asyncio.sleep(0.01)
+        return during, await store.get(job["id"])
+
+    during, after = asyncio.run(scenario())
+    assert during["status"] == "running"
+    assert after["status"] == DONE
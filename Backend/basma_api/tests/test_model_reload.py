@@ -0,0 +1,54 @@
+# tests/test_model_reload.py
+"""Model reload only accepts operator-placed files, and the worker needs its token."""
+import pytest
+from fastapi.testclient import TestClient
+
+from app.ml import worker_server
+from app.ml.model_registry import ModelRegistry
+
+
+@pytest.fixture
+def registry(tmp_path):
+    model_dir = tmp_path / "models"
+    model_dir.mkdir()
+    (model_dir / "v2.pt").write_bytes(b"weights")
+    default = tmp_path / "vp.pt"
+    default.write_bytes(b"weights")
+    (tmp_path / "evil.pt").write_bytes(b"pickle")
+    return ModelRegistry(factory=lambda path: object(), model_path=str(default), model_dir=str(model_dir))
+
+
+def test_check_path_accepts_model_path_and_model_dir(registry, tmp_path):
+    assert registry.check_path(str(tmp_path / "vp.pt")) == str((tmp_path / "vp.pt").resolve())
+    assert registry.check_path(str(tmp_path / "models" / "v2.pt")).endswith("v2.pt")
+
+
+@pytest.mark.parametrize(
+    "path",
+    ["evil.pt", "models/../evil.pt", "models/missing.pt", "models", "/etc/passwd"],
+)
+def test_check_path_rejects_everything_else(registry, tmp_path, path):
+    with pytest.raises(ValueError):
+        registry.check_path(str(tmp_path / path))
+
+
+def test_reload_rejects_path_before_loading(registry, tmp_path):
+    with pytest.raises(ValueError):
+        registry.reload(str(tmp_path / "evil.pt"))
+    assert registry.reloads == 0 and registry.failures == 0
+
+
+def test_worker_reload_requires_token(monkeypatch):
+    client = TestClient(worker_server.app)
+    monkeypatch.setattr(worker_server, "AI_WORKER_TOKEN", None)
+    assert client.post("/model/reload").status_code == 403
+
+    monkeypatch.setattr(worker_server, "AI_WORKER_TOKEN", "s3cret")
+    assert client.post("/model/reload").status_code == 401
+    assert client.post("/model/reload", headers={"X-Worker-Token": "nope"}).status_code == 401
+    resp = client.post(
+        "/model/reload",
+        params={"path": "/etc/passwd"},
+        headers={"X-Worker-Token": "s3cret"},
+    )
+    assert resp.status_code == 400
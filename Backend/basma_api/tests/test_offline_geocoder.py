@@ -0,0 +1,89 @@
+# tests/test_offline_geocoder.py
+"""Offline geocoder: grid search radius, distance threshold and incremental refresh."""
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from app import models
+from app.services.offline_geocoder import LocationIndex, haversine_m
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    for model in (models.Government, models.District, models.Area, models.Location):
+        model.__table__.create(engine)
+    with Session(engine) as session:
+        session.add(models.Government(id=1, name_ar="عمان"))
+        session.add(models.District(id=1, government_id=1, name_ar="قصبة عمان"))
+        session.add(models.Area(id=1, district_id=1, name_ar="العبدلي", name_en="Abdali"))
+        session.commit()
+        yield session
+
+
+def _location(db, location_id, lat, lon):
+    db.add(
+        models.Location(
+            id=location_id,
+            area_id=1,
+            name_ar=f"موقع {location_id}",
+            latitude=Decimal(str(lat)),
+            longitude=Decimal(str(lon)),
+        )
+    )
+    db.commit()
+
+
+def test_neighbouring_cell_within_range(db):
+    # location and query sit on opposite sides of a cell corner (0.01° grid)
+    _location(db, 1, 31.99995, 35.99995)
+    index = LocationIndex(max_distance_m=150)
+    assert index._cell(31.99995, 35.99995) != index._cell(32.0004, 36.0004)
+    found = index.nearest(db, 32.0004, 36.0004)
+    assert found is not None
+    assert found[1].location_id == 1
+    assert found[0] == pytest.approx(haversine_m(32.0004, 36.0004, 31.99995, 35.99995))
+
+
+def test_longitude_cells_widen_with_latitude(db):
+    # at 60°N a 0.01° longitude cell is ~557 m wide, so a 1 km radius has to
+    # scan two cells east/west; the match here is two columns away (~568 m)
+    _location(db, 1, 60.0, 10.0099)
+    index = LocationIndex(max_distance_m=1000)
+    assert index._cell(60.0, 10.0201)[1] - index._cell(60.0, 10.0099)[1] == 2
+    found = index.nearest(db, 60.0, 10.0201)
+    assert found is not None
+    assert found[0] < 1000
+
+
+def test_beyond_threshold_uses_remote_geocoder(db):
+    _location(db, 1, 31.95, 35.9)
+    index = LocationIndex(max_distance_m=150)
+    # ~145 m north: in range
+    assert index.nearest(db, 31.9513, 35.9) is not None
+    # ~156 m north: out of range, the caller falls back to the remote geocoder
+    assert haversine_m(31.9514, 35.9, 31.95, 35.9) > 150
+    assert index.nearest(db, 31.9514, 35.9) is None
+    assert index.resolve(db, 31.9514, 35.9) is None
+    assert index.stats()["fallbacks"] == 2
+
+
+def test_refresh_picks_up_new_rows_incrementally(db):
+    _location(db, 1, 31.95, 35.9)
+    index = LocationIndex(max_distance_m=150, refresh_seconds=3600)
+    assert index.nearest(db, 31.97, 35.9) is None
+    assert index.stats()["entries"] == 1
+
+    _location(db, 7, 31.97, 35.9)
+    # within refresh_seconds the new row is not loaded yet
+    assert index.nearest(db, 31.97, 35.9) is None
+
+    index.refresh(db, force=True)
+    assert index._last_id == 7
+    assert index.stats()["entries"] == 2
+    found = index.nearest(db, 31.97, 35.9)
+    assert found is not None and found[1].location_id == 7
+    gov, dist, area, location = index.resolve(db, 31.97, 35.9)
+    assert (gov.id, dist.id, area.id, location.id) == (1, 1, 1, 7)
@@ -0,0 +1,41 @@
+# tests/test_postprocess.py
+"""NumPy post-processing must decide exactly like the original per-box loops."""
+import random
+
+import numpy as np
+import pytest
+
+from app.ml.report_classifier import ReportClassifierService
+from benchmarks.postprocess_equivalence import (
+    NAMES,
+    legacy_aggregate_predictions,
+    legacy_extract_predictions,
+    random_detections,
+)
+
+
+@pytest.fixture(scope="module")
+def clf() -> ReportClassifierService:
+    # post-processing does not touch the model, so skip __init__
+    return ReportClassifierService.__new__(ReportClassifierService)
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_vectorized_matches_legacy(clf, seed):
+    rng = random.Random(seed)
+    for _ in range(2000):
+        det, width, height = random_detections(rng)
+        expected = legacy_aggregate_predictions(
+            legacy_extract_predictions(clf._normalize_label_to_code, det, NAMES, width, height)
+        )
+        actual = clf._aggregate_predictions(clf._extract_predictions(det, NAMES, width, height))
+        assert actual == expected, det.tolist()
+
+
+def test_empty_detections(clf):
+    det = np.zeros((0, 6), dtype=np.float32)
+    assert clf._aggregate_predictions(clf._extract_predictions(det, NAMES, 640, 480)) == (
+        "OTHERS",
+        0.0,
+        None,
+    )
@@ -0,0 +1,83 @@
+# tests/test_singleflight.py
+"""SingleFlight: coalescing, leader cancellation and retry after a failure."""
+import asyncio
+
+import pytest
+
+from app.services.singleflight import SingleFlight
+
+
+def test_concurrent_callers_share_one_call():
+    async def scenario():
+        flights = SingleFlight()
+        calls = 0
+        release = asyncio.Event()
+
+        async def lookup():
+            nonlocal calls
+            calls += 1
+            await release.wait()
+            return {"cell": "sv8wr"}
+
+        waiters = [asyncio.ensure_future(flights.do("sv8wr", lookup)) for _ in range(5)]
+        await asyncio.sleep(0)
+        release.set()
+        results = await asyncio.gather(*waiters)
+        return calls, results, flights.stats()
+
+    calls, results, stats = asyncio.run(scenario())
+    assert calls == 1
+    assert results == [{"cell": "sv8wr"}] * 5
+    assert stats["leaders"] == 1
+    assert stats["coalesced"] == 4
+    assert stats["in_flight"] == 0
+
+
+def test_cancelling_the_leader_does_not_cancel_followers():
+    async def scenario():
+        flights = SingleFlight()
+        release = asyncio.Event()
+
+        async def lookup():
+            await release.wait()
+            return "address"
+
+        leader = asyncio.ensure_future(flights.do("cell", lookup))
+        await asyncio.sleep(0)
+        follower = asyncio.ensure_future(flights.do("cell", lookup))
+        await asyncio.sleep(0)
+        leader.cancel()
+        await asyncio.sleep(0)
+        release.set()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return await follower, flights.stats()
+
+    result, stats = asyncio.run(scenario())
+    assert result == "address"
+    assert stats["leaders"] == 1
+    assert stats["coalesced"] == 1
+
+
+def test_failed_flight_is_forgotten():
+    async def scenario():
+        flights = SingleFlight()
+        attempts = 0
+
+        async def lookup():
+            nonlocal attempts
+            attempts += 1
+            await asyncio.sleep(0)
+            if attempts == 1:
+                raise RuntimeError("geocoder down")
+            return "address"
+
+        first = [asyncio.ensure_future(flights.do("cell", lookup)) for _ in range(2)]
+        outcomes = await asyncio.gather(*first, return_exceptions=True)
+        assert all(isinstance(o, RuntimeError) for o in outcomes)
+        assert flights.stats()["in_flight"] == 0
+        return await flights.do("cell", lookup), attempts
+
+    result, attempts = asyncio.run(scenario())
+    assert result == "address"
+    assert attempts == 2
@@ -0,0 +1,58 @@
+# tests/test_tiling.py
+"""Only images at least AI_TILE_MIN_SIDE on their long side go through tiles."""
+import io
+from typing import List
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from app.ml import report_classifier
+from app.ml.backends import InferenceBackend
+from app.ml.report_classifier import ReportClassifierService
+
+
+class CountingBackend(InferenceBackend):
+    names = {0: "GARBAGE"}
+
+    def __init__(self) -> None:
+        self.calls: List[int] = []
+
+    def set_conf(self, conf):
+        pass
+
+    def infer(self, images, size=640):
+        self.calls.append(len(images))
+        return [np.zeros((0, 6)) for _ in images]
+
+
+def _jpeg(width: int, height: int) -> bytes:
+    buf = io.BytesIO()
+    Image.new("RGB", (width, height), (90, 90, 90)).save(buf, format="JPEG")
+    return buf.getvalue()
+
+
+@pytest.fixture
+def clf(monkeypatch):
+    monkeypatch.setattr(report_classifier, "AI_TILE_MIN_SIDE", 1600)
+    monkeypatch.setattr(report_classifier, "AI_TILE_SIZE", 640)
+    service = ReportClassifierService.__new__(ReportClassifierService)
+    service.backend = CountingBackend()
+    service.tiled = True
+    return service
+
+
+@pytest.mark.parametrize("fast_decode", [True, False])
+def test_below_min_side_is_not_tiled(clf, monkeypatch, fast_decode):
+    monkeypatch.setattr(report_classifier, "AI_FAST_DECODE", fast_decode)
+    image, tiled = clf._load_image(_jpeg(1200, 900))
+    assert not tiled
+    clf._infer([image], [tiled])
+    assert clf.backend.calls == [1]
+
+
+def test_large_image_is_tiled(clf):
+    image, tiled = clf._load_image(_jpeg(2000, 1500))
+    assert tiled
+    clf._infer([image], [tiled])
+    assert clf.backend.calls[0] > 1
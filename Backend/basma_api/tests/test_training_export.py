@@ -0,0 +1,84 @@
+# tests/test_training_export.py
+"""Training export failure path: a row whose copy keeps failing is given up, not spun on."""
+import errno
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app import models
+from app.ml import training_export
+from app.ml.training_export import FAILED, PENDING, PROCESSED, TrainingExporter
+
+
+@pytest.fixture
+def queue(tmp_path, monkeypatch):
+    # SQLite ignores FOR UPDATE SKIP LOCKED, which is all the claim query needs here
+    engine = create_engine(f"sqlite:///{tmp_path / 'queue.sqlite3'}")
+    models.MLTrainingQueue.__table__.create(engine)
+    Session = sessionmaker(bind=engine)
+    monkeypatch.setattr(training_export, "SessionLocal", Session)
+
+    image = tmp_path / "photo.jpg"
+    image.write_bytes(b"jpeg")
+    monkeypatch.setattr(training_export, "local_static_path", lambda url: image)
+
+    sleeps = []
+    monkeypatch.setattr(training_export.time, "sleep", sleeps.append)
+
+    db = Session()
+    db.add(models.MLTrainingQueue(id=1, report_id=10, image_url="/static/uploads/a.jpg", report_type_id=1))
+    db.commit()
+    db.close()
+
+    def processed():
+        db = Session()
+        try:
+            return db.get(models.MLTrainingQueue, 1).processed
+        finally:
+            db.close()
+
+    return processed, sleeps
+
+
+def test_persistent_copy_error_marks_row_failed(tmp_path, monkeypatch, queue):
+    processed, sleeps = queue
+
+    def disk_full(src, dst):
+        raise OSError(errno.ENOSPC, "No space left on device")
+
+    monkeypatch.setattr(training_export.shutil, "copyfile", disk_full)
+    exporter = TrainingExporter(str(tmp_path / "out"), batch_size=10, max_attempts=3, retry_delay=7.0)
+    state = exporter.run()
+
+    assert processed() == FAILED
+    assert state["failed"] == 1
+    assert state["exported"] == 0
+    assert state["attempts"] == {}
+    # two batches settled nothing and were each followed by the retry pause
+    assert sleeps == [7.0, 7.0]
+
+
+def test_attempts_counted_until_copy_succeeds(tmp_path, monkeypatch, queue):
+    processed, sleeps = queue
+    real_copy = training_export.shutil.copyfile
+    calls = []
+
+    def flaky(src, dst):
+        calls.append(dst)
+        if len(calls) == 1:
+            raise OSError(errno.EACCES, "Permission denied")
+        return real_copy(src, dst)
+
+    monkeypatch.setattr(training_export.shutil, "copyfile", flaky)
+    exporter = TrainingExporter(str(tmp_path / "out"), batch_size=10, max_attempts=3, retry_delay=7.0)
+    exporter._prepare_dirs()
+
+    assert exporter.run_batch() == (1, 0)
+    assert exporter.state["attempts"] == {"1": 1}
+    assert processed() == PENDING
+
+    assert exporter.run_batch() == (1, 1)
+    assert exporter.state["attempts"] == {}
+    assert processed() == PROCESSED
+    assert sleeps == []
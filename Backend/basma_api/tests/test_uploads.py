@@ -0,0 +1,35 @@
+# tests/test_uploads.py
+"""Uploads: an interrupted upload leaves no partial file in static/uploads."""
+import asyncio
+
+import pytest
+
+from app.controllers import uploads_controller
+from app.controllers.uploads_controller import save_upload
+
+
+class BrokenUpload:
+    """UploadFile stand-in whose stream fails after the first chunk."""
+
+    filename = "photo.jpg"
+    content_type = "image/jpeg"
+
+    def __init__(self):
+        self.reads = 0
+
+    async def read(self, size=-1):
+        self.reads += 1
+        if self.reads == 1:
+            return b"\xff\xd8" + b"0" * 1024
+        raise ConnectionResetError("client disconnected")
+
+
+def test_partial_upload_is_removed(tmp_path, monkeypatch):
+    uploads = tmp_path / "static" / "uploads"
+    uploads.mkdir(parents=True)
+    monkeypatch.setattr(uploads_controller, "STATIC_DIR", tmp_path / "static")
+    monkeypatch.setattr(uploads_controller, "UPLOADS_DIR", uploads)
+
+    with pytest.raises(ConnectionResetError):
+        asyncio.run(save_upload(BrokenUpload(), keep_bytes=True))
+    assert list(uploads.iterdir()) == []